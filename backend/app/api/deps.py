@@ -7,7 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
 from app.models import Assistant
-from app.services import AssistantService, RAGPipeline, get_openai_client, get_vector_store
+from app.services import (
+    AssistantService,
+    BulkImporter,
+    IngestionQueue,
+    RAGPipeline,
+    get_ingestion_queue,
+    get_openai_client,
+    get_vector_store,
+)
 from app.services.openai_client import OpenAIClient
 from app.services.vector_store import VectorStore
 
@@ -28,18 +36,31 @@ async def get_openai_service() -> OpenAIClient:
     return await get_openai_client()
 
 
+async def get_ingestion_service() -> IngestionQueue:
+    return get_ingestion_queue()
+
+
 async def get_rag_pipeline(
     vector_store: VectorStore = Depends(get_vector_service),
     openai_client: OpenAIClient = Depends(get_openai_service),
+    ingestion_queue: IngestionQueue = Depends(get_ingestion_service),
 ) -> RAGPipeline:
-    return RAGPipeline(vector_store, openai_client)
+    return RAGPipeline(vector_store, openai_client, ingestion_queue=ingestion_queue)
 
 
 async def get_assistant_service(
     db: AsyncSession = Depends(get_db),
     rag_pipeline: RAGPipeline = Depends(get_rag_pipeline),
+    ingestion_queue: IngestionQueue = Depends(get_ingestion_service),
 ) -> AssistantService:
-    return AssistantService(db, rag_pipeline)
+    return AssistantService(db, rag_pipeline, ingestion_queue)
+
+
+async def get_bulk_importer(
+    db: AsyncSession = Depends(get_db),
+    rag_pipeline: RAGPipeline = Depends(get_rag_pipeline),
+) -> BulkImporter:
+    return BulkImporter(db, rag_pipeline)
 
 
 async def get_assistant(
@@ -1,8 +1,9 @@
-from app.api.routes import assistants, chat, knowledge, sessions
+from app.api.routes import assistants, chat, knowledge, metrics, sessions
 
 __all__ = [
     "assistants",
     "chat",
     "knowledge",
+    "metrics",
     "sessions",
 ]
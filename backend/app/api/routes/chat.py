@@ -1,20 +1,58 @@
 from __future__ import annotations
 
+import json
+import logging
 import uuid
+from collections.abc import AsyncIterator
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_assistant, get_db, get_openai_service, get_rag_pipeline
+from app.db import session as db_session
 from app.models import Assistant
 from app.schemas import ChatResponse, ChatTurn
 from app.services.conversation import ConversationService
 from app.services.openai_client import OpenAIClient
 from app.services.rag import RAGPipeline
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_turn(
+    assistant: Assistant,
+    rag: RAGPipeline,
+    openai: OpenAIClient,
+    payload: ChatTurn,
+    session_id: uuid.UUID | None = None,
+) -> AsyncIterator[str]:
+    # Request-scoped dependencies are closed before a StreamingResponse body runs,
+    # so the stream owns its own database session. Starlette cancels this generator
+    # when the client disconnects, which closes the upstream model stream too.
+    async with db_session.SessionLocal() as db:
+        service = ConversationService(db, assistant, rag, openai)
+        try:
+            if session_id is None:
+                session = await service.create_session()
+            else:
+                session = await service.load_session(session_id)
+            async for event, data in service.stream_chat(session, payload):
+                yield format_sse(event, data)
+            await db.commit()
+        except Exception:
+            logger.exception("Streaming chat turn failed")
+            await db.rollback()
+            yield format_sse("error", {"detail": "Chat turn failed"})
+
+
 @router.post("/assistants/{assistant_id}/sessions/{session_id}", response_model=ChatResponse)
 async def chat_existing_session(
     payload: ChatTurn,
@@ -47,3 +85,31 @@ async def chat_new_session(
     response = await service.chat(session, payload)
     await db.commit()
     return response
+
+
+@router.post("/assistants/{assistant_id}/sessions/{session_id}/stream")
+async def chat_existing_session_stream(
+    payload: ChatTurn,
+    assistant: Assistant = Depends(get_assistant),
+    session_id: uuid.UUID = Path(..., description="Conversation session identifier"),
+    db: AsyncSession = Depends(get_db),
+    rag: RAGPipeline = Depends(get_rag_pipeline),
+    openai: OpenAIClient = Depends(get_openai_service),
+) -> StreamingResponse:
+    try:
+        await ConversationService(db, assistant, rag, openai).load_session(session_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found") from exc
+    return StreamingResponse(
+        stream_turn(assistant, rag, openai, payload, session_id), media_type="text/event-stream"
+    )
+
+
+@router.post("/assistants/{assistant_id}/stream")
+async def chat_new_session_stream(
+    payload: ChatTurn,
+    assistant: Assistant = Depends(get_assistant),
+    rag: RAGPipeline = Depends(get_rag_pipeline),
+    openai: OpenAIClient = Depends(get_openai_service),
+) -> StreamingResponse:
+    return StreamingResponse(stream_turn(assistant, rag, openai, payload), media_type="text/event-stream")
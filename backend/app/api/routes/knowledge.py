@@ -1,22 +1,39 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import uuid
 
-from app.api.deps import get_assistant, get_assistant_service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from starlette.datastructures import UploadFile
+
+from app.api.deps import get_assistant, get_assistant_service, get_bulk_importer, get_rag_pipeline
 from app.models import Assistant
-from app.schemas import KnowledgeDocumentCreate, KnowledgeDocumentRead
+from app.schemas import (
+    BulkImportResult,
+    IngestionJobRead,
+    KnowledgeDocumentCreate,
+    KnowledgeDocumentRead,
+    KnowledgeDocumentSummary,
+    KnowledgeDocumentUpdate,
+    RetrievalQuery,
+    RetrievedChunk,
+)
 from app.services.assistants import AssistantService
+from app.services.bulk_import import BulkImporter
+from app.services.rag import RAGPipeline
+
+UPLOAD_READ_SIZE = 64 * 1024
 
 router = APIRouter(prefix="/assistants/{assistant_id}/knowledge", tags=["knowledge"])
 
 
-@router.get("/", response_model=list[KnowledgeDocumentRead])
+@router.get("/", response_model=list[KnowledgeDocumentSummary])
 async def list_documents(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     assistant: Assistant = Depends(get_assistant),
     service: AssistantService = Depends(get_assistant_service),
-) -> list[KnowledgeDocumentRead]:
-    documents = await service.list_documents(assistant)
-    return [KnowledgeDocumentRead.model_validate(doc) for doc in documents]
+) -> list[KnowledgeDocumentSummary]:
+    return await service.list_documents(assistant, limit=limit, offset=offset)
 
 
 @router.post("/", response_model=KnowledgeDocumentRead, status_code=201)
@@ -27,3 +44,117 @@ async def create_document(
 ) -> KnowledgeDocumentRead:
     document = await service.add_document(assistant, payload)
     return KnowledgeDocumentRead.model_validate(document)
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import(
+    request: Request,
+    assistant: Assistant = Depends(get_assistant),
+    importer: BulkImporter = Depends(get_bulk_importer),
+) -> BulkImportResult:
+    """Import NDJSON documents sent as the raw body or as a multipart ``file`` field."""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        # Starlette spools multipart files to disk past 1 MB, so the upload is never fully in memory.
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Missing 'file' field")
+        try:
+            return await importer.run(assistant, _read_upload(upload))
+        finally:
+            await form.close()
+    return await importer.run(assistant, request.stream())
+
+
+async def _read_upload(upload: UploadFile):
+    while chunk := await upload.read(UPLOAD_READ_SIZE):
+        yield chunk
+
+
+@router.post("/search", response_model=list[RetrievedChunk])
+async def search_knowledge(
+    payload: RetrievalQuery,
+    assistant: Assistant = Depends(get_assistant),
+    rag: RAGPipeline = Depends(get_rag_pipeline),
+) -> list[RetrievedChunk]:
+    """Run the assistant's retrieval for ``query`` and return the scored chunks, for debugging."""
+    return await rag.retrieve(
+        assistant.id,
+        payload.query,
+        limit=payload.limit,
+        hybrid=assistant.hybrid_retrieval,
+        vector_weight=assistant.vector_weight,
+        lexical_weight=assistant.lexical_weight,
+    )
+
+
+@router.get("/jobs/", response_model=list[IngestionJobRead])
+async def list_jobs(
+    status_filter: str | None = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    assistant: Assistant = Depends(get_assistant),
+    service: AssistantService = Depends(get_assistant_service),
+) -> list[IngestionJobRead]:
+    jobs = await service.list_jobs(assistant, status=status_filter, limit=limit, offset=offset)
+    return [IngestionJobRead.model_validate(job) for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobRead)
+async def get_job(
+    job_id: uuid.UUID,
+    assistant: Assistant = Depends(get_assistant),
+    service: AssistantService = Depends(get_assistant_service),
+) -> IngestionJobRead:
+    try:
+        job = await service.get_job(assistant, job_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found") from exc
+    return IngestionJobRead.model_validate(job)
+
+
+@router.get("/{document_id}", response_model=KnowledgeDocumentRead)
+async def get_document(
+    document_id: uuid.UUID,
+    assistant: Assistant = Depends(get_assistant),
+    service: AssistantService = Depends(get_assistant_service),
+) -> KnowledgeDocumentRead:
+    try:
+        document = await service.get_document(assistant, document_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found") from exc
+    return KnowledgeDocumentRead.model_validate(document)
+
+
+@router.put("/{document_id}", response_model=KnowledgeDocumentRead)
+async def update_document(
+    document_id: uuid.UUID,
+    payload: KnowledgeDocumentUpdate,
+    assistant: Assistant = Depends(get_assistant),
+    service: AssistantService = Depends(get_assistant_service),
+) -> KnowledgeDocumentRead:
+    try:
+        document = await service.get_document(assistant, document_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found") from exc
+    document = await service.update_document(assistant, document, payload)
+    return KnowledgeDocumentRead.model_validate(document)
+
+
+@router.delete(
+    "/{document_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+    response_model=None,
+)
+async def delete_document(
+    document_id: uuid.UUID,
+    assistant: Assistant = Depends(get_assistant),
+    service: AssistantService = Depends(get_assistant_service),
+) -> Response:
+    try:
+        document = await service.get_document(assistant, document_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found") from exc
+    await service.delete_document(assistant, document)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_ingestion_service, get_openai_service
+from app.services.ingestion import IngestionQueue
+from app.services.lexical_index import get_lexical_index
+from app.services.openai_client import OpenAIClient
+from app.services.response_cache import get_response_cache
+from app.services.summarizer import get_conversation_summarizer
+from app.services.timing import chat_stage_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/")
+async def get_metrics(
+    openai: OpenAIClient = Depends(get_openai_service),
+    ingestion: IngestionQueue = Depends(get_ingestion_service),
+) -> dict[str, Any]:
+    return {
+        "openai": openai.metrics(),
+        "chat_stages": chat_stage_metrics.snapshot(),
+        "ingestion": ingestion.stats(),
+        "lexical_index": get_lexical_index().stats(),
+        "response_cache": get_response_cache().stats(),
+        "summarizer": get_conversation_summarizer().stats(),
+    }
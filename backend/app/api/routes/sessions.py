@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from app.api.deps import get_assistant, get_assistant_service
 from app.models import Assistant
@@ -13,8 +13,14 @@ router = APIRouter(prefix="/assistants/{assistant_id}/sessions", tags=["sessions
 
 
 @router.get("/", response_model=list[ConversationSessionRead])
-async def list_sessions(assistant: Assistant = Depends(get_assistant)) -> list[ConversationSessionRead]:
-    return [ConversationSessionRead.model_validate(session) for session in assistant.sessions]
+async def list_sessions(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    assistant: Assistant = Depends(get_assistant),
+    service: AssistantService = Depends(get_assistant_service),
+) -> list[ConversationSessionRead]:
+    sessions = await service.list_sessions(assistant, limit=limit, offset=offset)
+    return [ConversationSessionRead.model_validate(session) for session in sessions]
 
 
 @router.post("/", response_model=ConversationSessionRead, status_code=201)
@@ -13,12 +13,87 @@ class Settings(BaseSettings):
     postgres_user: str = "vardast"
     postgres_password: str = "vardast"
     postgres_db: str = "vardast"
+    vector_store_backend: str = "qdrant"
+    local_vector_store_path: str = "data/vectors"
     qdrant_host: str = "qdrant"
     qdrant_port: int = 6333
+    qdrant_grpc_port: int = 6334
+    qdrant_prefer_grpc: bool = False
+    qdrant_timeout: int = 10
+    qdrant_upsert_batch_size: int = 256
+    qdrant_partitioning: str = "payload"
+    # Comma-separated assistant ids that get a collection of their own.
+    qdrant_dedicated_assistants: str = ""
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    qdrant_hnsw_per_tenant: bool = False
+    # 0 keeps Qdrant's default search-time ef.
+    qdrant_search_ef: int = 0
+    qdrant_exact_search: bool = False
+    qdrant_quantization: str = "none"
+    qdrant_quantization_always_ram: bool = True
+    qdrant_vectors_on_disk: bool = False
+    qdrant_rescore: bool = True
+    qdrant_oversampling: float = 2.0
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o-mini"
     openai_fallback_model: str = "gpt-4o-mini"
+    openai_single_flight: bool = True
     embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: int = 1536
+    # Send ``dimensions`` to the embeddings API (text-embedding-3 models) to get shorter vectors.
+    embedding_request_dimensions: bool = False
+    embedding_batch_size: int = 64
+    embedding_microbatch_enabled: bool = True
+    embedding_microbatch_max_size: int = 32
+    embedding_microbatch_max_wait_ms: float = 5.0
+    local_embedding_idf: bool = False
+    embedding_cache_enabled: bool = True
+    embedding_cache_memory_entries: int = 10_000
+    embedding_cache_persistent: bool = True
+    embedding_cache_max_rows: int = 500_000
+    chunk_size: int = 1000
+    chunk_overlap: int = 150
+    ingestion_concurrency: int = 4
+    ingestion_max_attempts: int = 3
+    bulk_import_batch_size: int = 500
+    hybrid_rrf_k: int = 60
+    hybrid_candidates: int = 20
+    lexical_index_refresh_seconds: float = 300.0
+    retrieval_rerank_enabled: bool = True
+    retrieval_overfetch: int = 4
+    retrieval_mmr_lambda: float = 0.7
+    retrieval_lexical_rescore_weight: float = 0.0
+    # Optional cosine floor for vector hits; unset keeps every candidate.
+    retrieval_min_score: float | None = None
+    response_cache_similarity: float = 0.95
+    response_cache_ttl_seconds: float = 3600.0
+    response_cache_max_entries: int = 5000
+    history_window: int = 10
+    conversation_summary_enabled: bool = True
+    # Compact once this many unsummarized messages have accumulated beyond ``history_window``.
+    conversation_summary_trigger: int = 20
+    conversation_summary_batch_size: int = 50
+    conversation_summary_max_tokens: int = 400
+    chat_history_timeout: float = 5.0
+    chat_retrieval_timeout: float = 10.0
+    prompt_token_budget: int = 8000
+    prompt_budget_system_share: float = 0.2
+    prompt_budget_knowledge_share: float = 0.5
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry: float = 30.0
+    openai_http2: bool = False
+    openai_max_concurrency: int = 16
+    openai_min_concurrency: int = 1
+    openai_max_retries: int = 4
+    openai_backoff_base_seconds: float = 0.5
+    openai_backoff_max_seconds: float = 30.0
+    openai_hedging_enabled: bool = False
+    openai_hedge_percentile: float = 95.0
+    openai_hedge_min_delay_seconds: float = 1.0
+    openai_circuit_failure_threshold: int = 5
+    openai_circuit_recovery_seconds: float = 30.0
     allowed_origins: List[str] = ["*"]
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
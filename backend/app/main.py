@@ -5,10 +5,14 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import assistants, chat, knowledge, sessions
+from app.api.routes import assistants, chat, knowledge, metrics, sessions
 from app.core.config import get_settings
 from app.db.base import Base
 from app.db.session import engine
+from app.services.ingestion import get_ingestion_queue
+from app.services.openai_client import close_openai_client, get_openai_client
+from app.services.summarizer import get_conversation_summarizer
+from app.services.vector_store import close_vector_store, init_vector_store
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -33,10 +37,24 @@ def create_application() -> FastAPI:
     app.include_router(knowledge.router, prefix=settings.api_v1_str)
     app.include_router(sessions.router, prefix=settings.api_v1_str)
     app.include_router(chat.router, prefix=settings.api_v1_str)
+    app.include_router(metrics.router, prefix=settings.api_v1_str)
 
     @app.on_event("startup")
     async def startup_event() -> None:  # pragma: no cover - executed by FastAPI
         await init_models()
+        await get_openai_client()
+        await init_vector_store()
+        await get_ingestion_queue().start()
+        # Without an API key completions are stubbed, so there is nothing worth summarizing.
+        if settings.conversation_summary_enabled and settings.openai_api_key:
+            await get_conversation_summarizer().start()
+
+    @app.on_event("shutdown")
+    async def shutdown_event() -> None:  # pragma: no cover - executed by FastAPI
+        await get_ingestion_queue().stop()
+        await get_conversation_summarizer().stop()
+        await close_openai_client()
+        await close_vector_store()
 
     return app
 
@@ -1,8 +1,12 @@
 from app.models.assistant import Assistant, ConversationSession, KnowledgeDocument, Message
+from app.models.embedding_cache import EmbeddingCacheEntry
+from app.models.ingestion import IngestionJob
 
 __all__ = [
     "Assistant",
     "ConversationSession",
+    "EmbeddingCacheEntry",
+    "IngestionJob",
     "KnowledgeDocument",
     "Message",
 ]
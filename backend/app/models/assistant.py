@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -19,22 +19,34 @@ class Assistant(Base):
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     system_prompt: Mapped[str | None] = mapped_column(Text, nullable=True)
+    hybrid_retrieval: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    vector_weight: Mapped[float] = mapped_column(Float, default=1.0, nullable=False)
+    lexical_weight: Mapped[float] = mapped_column(Float, default=1.0, nullable=False)
+    response_cache_enabled: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Bumped whenever the assistant's searchable knowledge changes; part of the response cache key.
+    knowledge_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False
     )
 
+    # Collections are never loaded implicitly: queries opt in with loader options
+    # and deletes rely on the ON DELETE CASCADE foreign keys.
     knowledge_documents: Mapped[list["KnowledgeDocument"]] = relationship(
-        back_populates="assistant", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="assistant", cascade="all, delete-orphan", lazy="raise", passive_deletes=True
     )
     sessions: Mapped[list["ConversationSession"]] = relationship(
-        back_populates="assistant", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="assistant", cascade="all, delete-orphan", lazy="raise", passive_deletes=True
     )
 
 
 class KnowledgeDocument(Base):
     __tablename__ = "knowledge_documents"
 
+    STATUS_PENDING = "pending"
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     assistant_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("assistants.id", ondelete="CASCADE"), nullable=False
@@ -42,9 +54,13 @@ class KnowledgeDocument(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     vector_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # SHA-256 of the indexed title and content; an update with the same hash is not re-embedded.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    chunk_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default=STATUS_PENDING, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
 
-    assistant: Mapped[Assistant] = relationship(back_populates="knowledge_documents")
+    assistant: Mapped[Assistant] = relationship(back_populates="knowledge_documents", lazy="raise")
 
 
 class ConversationSession(Base):
@@ -55,16 +71,28 @@ class ConversationSession(Base):
         UUID(as_uuid=True), ForeignKey("assistants.id", ondelete="CASCADE"), nullable=False
     )
     title: Mapped[str] = mapped_column(String(255), nullable=False, default="New Session")
+    # Running summary of the oldest turns, extended by the background summarizer. Messages up to
+    # (``summarized_until``, ``summarized_until_id``) in (created_at, id) order are folded into it
+    # and no longer sent with the prompt.
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    summarized_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    summarized_until_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    summarized_messages: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
 
-    assistant: Mapped[Assistant] = relationship(back_populates="sessions")
+    assistant: Mapped[Assistant] = relationship(back_populates="sessions", lazy="raise")
     messages: Mapped[list["Message"]] = relationship(
-        back_populates="session", cascade="all, delete-orphan", order_by="Message.created_at", lazy="selectin"
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="Message.created_at",
+        lazy="raise",
+        passive_deletes=True,
     )
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("ix_messages_session_id_created_at", "session_id", "created_at"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id: Mapped[uuid.UUID] = mapped_column(
@@ -74,4 +102,4 @@ class Message(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
 
-    session: Mapped[ConversationSession] = relationship(back_populates="messages")
+    session: Mapped[ConversationSession] = relationship(back_populates="messages", lazy="raise")
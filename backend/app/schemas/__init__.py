@@ -2,26 +2,42 @@ from app.schemas.assistant import (
     AssistantCreate,
     AssistantRead,
     AssistantUpdate,
+    BulkImportError,
+    BulkImportResult,
     ChatResponse,
     ChatTurn,
     ConversationSessionCreate,
     ConversationSessionRead,
+    IngestionJobRead,
     KnowledgeDocumentCreate,
     KnowledgeDocumentRead,
+    KnowledgeDocumentSummary,
+    KnowledgeDocumentUpdate,
     MessageCreate,
     MessageRead,
+    PromptTokenBreakdown,
+    RetrievalQuery,
+    RetrievedChunk,
 )
 
 __all__ = [
     "AssistantCreate",
     "AssistantRead",
     "AssistantUpdate",
+    "BulkImportError",
+    "BulkImportResult",
     "ChatResponse",
     "ChatTurn",
     "ConversationSessionCreate",
     "ConversationSessionRead",
+    "IngestionJobRead",
     "KnowledgeDocumentCreate",
     "KnowledgeDocumentRead",
+    "KnowledgeDocumentSummary",
+    "KnowledgeDocumentUpdate",
     "MessageCreate",
     "MessageRead",
+    "PromptTokenBreakdown",
+    "RetrievalQuery",
+    "RetrievedChunk",
 ]
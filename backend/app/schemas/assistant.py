@@ -9,6 +9,10 @@ class AssistantBase(BaseModel):
     name: str = Field(..., max_length=200)
     description: Optional[str] = None
     system_prompt: Optional[str] = None
+    hybrid_retrieval: bool = False
+    vector_weight: float = Field(1.0, ge=0)
+    lexical_weight: float = Field(1.0, ge=0)
+    response_cache_enabled: bool = False
 
 
 class AssistantCreate(AssistantBase):
@@ -19,10 +23,15 @@ class AssistantUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=200)
     description: Optional[str] = None
     system_prompt: Optional[str] = None
+    hybrid_retrieval: Optional[bool] = None
+    vector_weight: Optional[float] = Field(None, ge=0)
+    lexical_weight: Optional[float] = Field(None, ge=0)
+    response_cache_enabled: Optional[bool] = None
 
 
 class AssistantRead(AssistantBase):
     id: uuid.UUID
+    knowledge_version: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -31,7 +40,7 @@ class AssistantRead(AssistantBase):
 
 
 class KnowledgeDocumentBase(BaseModel):
-    title: str
+    title: str = Field(..., max_length=255)
     content: str
 
 
@@ -39,15 +48,86 @@ class KnowledgeDocumentCreate(KnowledgeDocumentBase):
     pass
 
 
+class KnowledgeDocumentUpdate(BaseModel):
+    title: Optional[str] = Field(None, max_length=255)
+    content: Optional[str] = None
+
+
 class KnowledgeDocumentRead(KnowledgeDocumentBase):
     id: uuid.UUID
     created_at: datetime
     assistant_id: uuid.UUID
+    chunk_count: int = 0
+    status: str = "ready"
+
+    class Config:
+        from_attributes = True
+
+
+class KnowledgeDocumentSummary(BaseModel):
+    id: uuid.UUID
+    assistant_id: uuid.UUID
+    title: str
+    preview: str
+    content_length: int
+    chunk_count: int = 0
+    status: str = "ready"
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class IngestionJobRead(BaseModel):
+    id: uuid.UUID
+    assistant_id: uuid.UUID
+    document_id: uuid.UUID
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+class BulkImportError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    received: int = 0
+    imported: int = 0
+    failed: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    docs_per_second: float = 0.0
+    errors: list[BulkImportError] = Field(default_factory=list)
+
+
+class RetrievalQuery(BaseModel):
+    query: str
+    limit: int = Field(5, ge=1, le=50)
+
+
+class RetrievedChunk(BaseModel):
+    id: str
+    document_id: Optional[str] = None
+    title: Optional[str] = None
+    content: str
+    score: float
+    vector_rank: Optional[int] = None
+    vector_score: Optional[float] = None
+    lexical_rank: Optional[int] = None
+    lexical_score: Optional[float] = None
+    rerank_score: Optional[float] = None
+
+
 class ConversationSessionBase(BaseModel):
     title: Optional[str] = None
 
@@ -59,6 +139,8 @@ class ConversationSessionCreate(ConversationSessionBase):
 class ConversationSessionRead(ConversationSessionBase):
     id: uuid.UUID
     assistant_id: uuid.UUID
+    summary: Optional[str] = None
+    summarized_messages: int = 0
     created_at: datetime
 
     class Config:
@@ -87,7 +169,25 @@ class ChatTurn(BaseModel):
     user_message: str
 
 
+class PromptTokenBreakdown(BaseModel):
+    budget: int
+    system: int
+    knowledge: int
+    history: int
+    user: int
+    total: int
+    summary: int = 0
+    context_chunks_used: int
+    context_chunks_dropped: int
+    history_messages_used: int
+    history_messages_dropped: int
+    exact: bool = False
+
+
 class ChatResponse(BaseModel):
     assistant_message: str
     session: ConversationSessionRead
     messages: list[MessageRead]
+    token_breakdown: Optional[PromptTokenBreakdown] = None
+    stage_timings_ms: Optional[dict[str, float]] = None
+    cache_hit: bool = False
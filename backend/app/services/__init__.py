@@ -1,17 +1,37 @@
 from app.services.assistants import AssistantService
+from app.services.bulk_import import BulkImporter
 from app.services.conversation import ConversationService
-from app.services.openai_client import OpenAIClient, get_openai_client
+from app.services.ingestion import IngestionQueue, get_ingestion_queue
+from app.services.local_vector_store import LocalVectorStore
+from app.services.openai_client import OpenAIClient, close_openai_client, get_openai_client
 from app.services.prompt_builder import PromptBuilder
 from app.services.rag import RAGPipeline
-from app.services.vector_store import VectorStore, get_vector_store
+from app.services.summarizer import ConversationSummarizer, get_conversation_summarizer
+from app.services.vector_store import (
+    QdrantVectorStore,
+    VectorStore,
+    close_vector_store,
+    get_vector_store,
+    init_vector_store,
+)
 
 __all__ = [
     "AssistantService",
+    "BulkImporter",
     "ConversationService",
+    "ConversationSummarizer",
+    "IngestionQueue",
+    "LocalVectorStore",
     "OpenAIClient",
     "PromptBuilder",
+    "QdrantVectorStore",
     "RAGPipeline",
     "VectorStore",
+    "close_openai_client",
+    "close_vector_store",
+    "get_conversation_summarizer",
+    "get_ingestion_queue",
     "get_openai_client",
     "get_vector_store",
+    "init_vector_store",
 ]
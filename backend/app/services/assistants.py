@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+import logging
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Assistant, ConversationSession, KnowledgeDocument
-from app.schemas import AssistantCreate, AssistantUpdate, ConversationSessionCreate, KnowledgeDocumentCreate
-from app.services.rag import RAGPipeline
+from app.models import Assistant, ConversationSession, IngestionJob, KnowledgeDocument
+from app.schemas import (
+    AssistantCreate,
+    AssistantUpdate,
+    ConversationSessionCreate,
+    KnowledgeDocumentCreate,
+    KnowledgeDocumentSummary,
+    KnowledgeDocumentUpdate,
+)
+from app.services.ingestion import IngestionQueue
+from app.services.rag import RAGPipeline, content_hash
+from app.services.response_cache import bump_knowledge_version, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_LENGTH = 200
 
 
 class AssistantService:
-    def __init__(self, db: AsyncSession, rag_pipeline: RAGPipeline) -> None:
+    def __init__(
+        self,
+        db: AsyncSession,
+        rag_pipeline: RAGPipeline,
+        ingestion_queue: IngestionQueue | None = None,
+    ) -> None:
         self.db = db
         self.rag = rag_pipeline
+        self.ingestion_queue = ingestion_queue
 
     async def list_assistants(self) -> list[Assistant]:
         stmt = select(Assistant).order_by(Assistant.created_at.desc())
@@ -35,24 +55,126 @@ class AssistantService:
             setattr(assistant, field, value)
         await self.db.commit()
         await self.db.refresh(assistant)
+        get_response_cache().invalidate(assistant.id)
         return assistant
 
     async def delete_assistant(self, assistant: Assistant) -> None:
         await self.db.delete(assistant)
         await self.db.commit()
+        get_response_cache().invalidate(assistant.id)
+        try:
+            await self.rag.remove_assistant(assistant.id)
+        except Exception:
+            # The rows are gone; leftover points are purged by the vector reconciliation command.
+            logger.exception("Failed to delete vectors of assistant %s", assistant.id)
 
     async def add_document(self, assistant: Assistant, payload: KnowledgeDocumentCreate) -> KnowledgeDocument:
+        """Store the document and ingest it in the background when a queue is available."""
         document = KnowledgeDocument(assistant_id=assistant.id, **payload.model_dump())
         self.db.add(document)
         await self.db.flush()
+        if self.ingestion_queue is not None:
+            await self.ingestion_queue.submit(self.db, [document])
+            return document
         await self.rag.ingest_document(self.db, assistant.id, document)
+        document.status = KnowledgeDocument.STATUS_READY
+        await bump_knowledge_version(self.db, assistant.id)
         await self.db.commit()
         await self.db.refresh(document)
         return document
 
-    async def list_documents(self, assistant: Assistant) -> list[KnowledgeDocument]:
-        await self.db.refresh(assistant)
-        return assistant.knowledge_documents
+    async def update_document(
+        self, assistant: Assistant, document: KnowledgeDocument, payload: KnowledgeDocumentUpdate
+    ) -> KnowledgeDocument:
+        """Apply the changes and re-index only if the indexed text actually changed."""
+        for field, value in payload.model_dump(exclude_unset=True, exclude_none=True).items():
+            setattr(document, field, value)
+        if (
+            document.status == KnowledgeDocument.STATUS_READY
+            and document.content_hash == content_hash(document.title, document.content)
+        ):
+            await self.db.commit()
+            await self.db.refresh(document)
+            return document
+
+        # The old points stay until re-ingestion overwrites them (ids are per chunk index) and
+        # trims the leftover tail, so a failed re-index leaves the previous version searchable.
+        await bump_knowledge_version(self.db, assistant.id)
+        if self.ingestion_queue is not None:
+            await self.ingestion_queue.submit(self.db, [document])
+            return document
+        try:
+            await self.rag.ingest_document(self.db, assistant.id, document)
+        except Exception:
+            await self.db.rollback()
+            raise
+        document.status = KnowledgeDocument.STATUS_READY
+        await self.db.commit()
+        await self.db.refresh(document)
+        return document
+
+    async def delete_document(self, assistant: Assistant, document: KnowledgeDocument) -> None:
+        await self.db.delete(document)
+        await bump_knowledge_version(self.db, assistant.id)
+        await self.db.commit()
+        try:
+            await self.rag.remove_documents(assistant.id, [document.id])
+        except Exception:
+            logger.exception("Failed to delete vectors of document %s", document.id)
+
+    async def list_jobs(
+        self, assistant: Assistant, status: str | None = None, limit: int = 100, offset: int = 0
+    ) -> list[IngestionJob]:
+        stmt = select(IngestionJob).where(IngestionJob.assistant_id == assistant.id)
+        if status is not None:
+            stmt = stmt.where(IngestionJob.status == status)
+        stmt = stmt.order_by(IngestionJob.created_at.desc()).limit(limit).offset(offset)
+        return list((await self.db.execute(stmt)).scalars().all())
+
+    async def get_job(self, assistant: Assistant, job_id: uuid.UUID) -> IngestionJob:
+        stmt = select(IngestionJob).where(IngestionJob.id == job_id, IngestionJob.assistant_id == assistant.id)
+        return (await self.db.execute(stmt)).scalar_one()
+
+    async def list_documents(
+        self, assistant: Assistant, limit: int = 100, offset: int = 0
+    ) -> list[KnowledgeDocumentSummary]:
+        # Listings never pull full document bodies, only a short preview computed in SQL.
+        stmt = (
+            select(
+                KnowledgeDocument.id,
+                KnowledgeDocument.assistant_id,
+                KnowledgeDocument.title,
+                func.substr(KnowledgeDocument.content, 1, PREVIEW_LENGTH).label("preview"),
+                func.length(KnowledgeDocument.content).label("content_length"),
+                KnowledgeDocument.chunk_count,
+                KnowledgeDocument.status,
+                KnowledgeDocument.created_at,
+            )
+            .where(KnowledgeDocument.assistant_id == assistant.id)
+            .order_by(KnowledgeDocument.created_at, KnowledgeDocument.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = (await self.db.execute(stmt)).mappings().all()
+        return [KnowledgeDocumentSummary.model_validate(dict(row)) for row in rows]
+
+    async def get_document(self, assistant: Assistant, document_id: uuid.UUID) -> KnowledgeDocument:
+        stmt = select(KnowledgeDocument).where(
+            KnowledgeDocument.id == document_id, KnowledgeDocument.assistant_id == assistant.id
+        )
+        return (await self.db.execute(stmt)).scalar_one()
+
+    async def list_sessions(
+        self, assistant: Assistant, limit: int = 100, offset: int = 0
+    ) -> list[ConversationSession]:
+        stmt = (
+            select(ConversationSession)
+            .where(ConversationSession.assistant_id == assistant.id)
+            .order_by(ConversationSession.created_at.desc(), ConversationSession.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return list((await self.db.execute(stmt)).scalars().all())
 
     async def create_session(
         self, assistant: Assistant, payload: ConversationSessionCreate
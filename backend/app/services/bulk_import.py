@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from types import SimpleNamespace
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models import Assistant, KnowledgeDocument
+from app.models.assistant import utcnow
+from app.schemas import BulkImportError, BulkImportResult, KnowledgeDocumentCreate
+from app.services.rag import RAGPipeline, content_hash
+from app.services.response_cache import bump_knowledge_version
+
+logger = logging.getLogger(__name__)
+
+# Only the first few rejected lines are echoed back; the rest are just counted.
+MAX_REPORTED_ERRORS = 20
+
+# Longer lines are skipped (and reported) instead of being buffered without bound.
+MAX_LINE_BYTES = 8 * 1024 * 1024
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """Split a byte stream into numbered lines, holding at most one partial line.
+
+    Only the unterminated tail of the stream is buffered. A line longer than
+    ``max_line_bytes`` is discarded as it arrives and yielded as ``None``.
+    """
+    tail = bytearray()
+    oversized = False
+    line_number = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) >= 0:
+            line_number += 1
+            piece = chunk[start:end]
+            if oversized or len(tail) + len(piece) > max_line_bytes:
+                yield line_number, None
+            else:
+                yield line_number, bytes(tail) + piece
+            tail.clear()
+            oversized = False
+            start = end + 1
+        if not oversized:
+            if len(tail) + len(chunk) - start > max_line_bytes:
+                oversized = True
+                tail.clear()
+            else:
+                tail += chunk[start:]
+    if oversized:
+        yield line_number + 1, None
+    elif tail:
+        yield line_number + 1, bytes(tail)
+
+
+class BulkImporter:
+    """Import NDJSON knowledge documents (``{"title": ..., "content": ...}`` per line).
+
+    Documents are parsed as the body arrives and flushed every ``batch_size``
+    lines: the batch's rows are written as ``pending`` with a single
+    executemany INSERT, the batch is embedded and upserted to the vector store
+    together, and the rows are then marked ``ready`` (or ``failed``).
+    Only one batch is held in memory at a time.
+    """
+
+    def __init__(self, db: AsyncSession, rag_pipeline: RAGPipeline, batch_size: int | None = None) -> None:
+        self.db = db
+        self.rag = rag_pipeline
+        self.batch_size = batch_size or get_settings().bulk_import_batch_size
+
+    async def run(self, assistant: Assistant, chunks: AsyncIterable[bytes]) -> BulkImportResult:
+        started = time.perf_counter()
+        result = BulkImportResult()
+        batch: list[KnowledgeDocumentCreate] = []
+        async for line_number, line in iter_lines(chunks):
+            if line is not None and not line.strip():
+                continue
+            result.received += 1
+            if line is None:
+                self._reject(result, line_number, f"Line exceeds {MAX_LINE_BYTES} bytes")
+                continue
+            try:
+                batch.append(KnowledgeDocumentCreate.model_validate_json(line))
+            except ValidationError as exc:
+                self._reject(result, line_number, str(exc.errors()[0]["msg"]))
+                continue
+            if len(batch) >= self.batch_size:
+                await self._flush(assistant, batch, result)
+                batch = []
+        if batch:
+            await self._flush(assistant, batch, result)
+
+        result.elapsed_seconds = round(time.perf_counter() - started, 3)
+        if result.elapsed_seconds > 0:
+            result.docs_per_second = round(result.imported / result.elapsed_seconds, 1)
+        logger.info(
+            "Bulk import for assistant %s: %d imported, %d failed, %d rejected in %.2fs (%.1f docs/s)",
+            assistant.id,
+            result.imported,
+            result.failed,
+            result.rejected,
+            result.elapsed_seconds,
+            result.docs_per_second,
+        )
+        return result
+
+    @staticmethod
+    def _reject(result: BulkImportResult, line_number: int, error: str) -> None:
+        result.rejected += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(BulkImportError(line=line_number, error=error))
+
+    async def _flush(
+        self, assistant: Assistant, batch: list[KnowledgeDocumentCreate], result: BulkImportResult
+    ) -> None:
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "assistant_id": assistant.id,
+                "title": payload.title,
+                "content": payload.content,
+                "vector_id": None,
+                "chunk_count": 0,
+                "content_hash": None,
+                "status": KnowledgeDocument.STATUS_PENDING,
+                "created_at": utcnow(),
+            }
+            for payload in batch
+        ]
+        # Rows go in first, so a batch that cannot be stored never leaves points behind.
+        try:
+            await self.db.execute(insert(KnowledgeDocument), rows)
+            await self.db.commit()
+        except SQLAlchemyError:
+            await self.db.rollback()
+            logger.exception("Bulk import batch of %d documents could not be stored", len(rows))
+            result.failed += len(rows)
+            return
+        try:
+            chunk_counts = await self.rag.ingest_documents(assistant.id, [SimpleNamespace(**row) for row in rows])
+        except Exception:
+            # Rows are kept as failed (vector_id unset) so bootstrap can retry them later.
+            logger.exception("Bulk import batch of %d documents failed to index", len(rows))
+            result.failed += len(rows)
+            changes = [{"id": row["id"], "status": KnowledgeDocument.STATUS_FAILED} for row in rows]
+        else:
+            changes = [
+                {
+                    "id": row["id"],
+                    "vector_id": str(row["id"]),
+                    "chunk_count": chunk_counts.get(row["id"], 0),
+                    "content_hash": content_hash(row["title"], row["content"]),
+                    "status": KnowledgeDocument.STATUS_READY,
+                }
+                for row in rows
+            ]
+            result.imported += len(rows)
+            result.chunks += sum(chunk_counts.values())
+        await self.db.execute(update(KnowledgeDocument), changes)
+        await bump_knowledge_version(self.db, assistant.id)
+        await self.db.commit()
+        result.batches += 1
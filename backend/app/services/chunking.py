@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+class TextChunker:
+    """Split text into overlapping chunks on paragraph and sentence boundaries."""
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 150) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be between 0 and chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split(self, text: str) -> list[str]:
+        chunks: list[str] = []
+        current: list[tuple[str, str]] = []
+        for separator, unit in self._units(text):
+            if current and len(self._join(current + [(separator, unit)])) > self.chunk_size:
+                chunks.append(self._join(current))
+                current = self._overlap_tail(current)
+                if current and len(self._join(current + [(separator, unit)])) > self.chunk_size:
+                    current = []
+            current.append((separator, unit))
+        if current:
+            chunks.append(self._join(current))
+        return chunks
+
+    def _units(self, text: str) -> list[tuple[str, str]]:
+        """Yield (separator, text) pieces no longer than chunk_size."""
+        units: list[tuple[str, str]] = []
+        for paragraph in _PARAGRAPH_BOUNDARY.split(text):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            separator = "\n\n"
+            pieces = [paragraph] if len(paragraph) <= self.chunk_size else _SENTENCE_BOUNDARY.split(paragraph)
+            for piece in pieces:
+                for part in self._hard_split(piece):
+                    units.append((separator, part))
+                    separator = " "
+        return units
+
+    def _hard_split(self, sentence: str) -> list[str]:
+        if len(sentence) <= self.chunk_size:
+            return [sentence]
+        parts: list[str] = []
+        current = ""
+        for word in sentence.split(" "):
+            while len(word) > self.chunk_size:
+                if current:
+                    parts.append(current)
+                    current = ""
+                parts.append(word[: self.chunk_size])
+                word = word[self.chunk_size :]
+            candidate = f"{current} {word}" if current else word
+            if len(candidate) > self.chunk_size:
+                parts.append(current)
+                candidate = word
+            current = candidate
+        if current:
+            parts.append(current)
+        return parts
+
+    def _overlap_tail(self, units: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        tail: list[tuple[str, str]] = []
+        for unit in reversed(units):
+            if len(self._join([unit] + tail)) > self.chunk_overlap:
+                break
+            tail.insert(0, unit)
+        return tail
+
+    @staticmethod
+    def _join(units: list[tuple[str, str]]) -> str:
+        if not units:
+            return ""
+        text = units[0][1]
+        for separator, unit in units[1:]:
+            text += separator + unit
+        return text
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import uuid
+from collections.abc import AsyncIterator
+from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.db import session as db_session
 from app.models import Assistant, ConversationSession, Message
-from app.schemas import ChatResponse, ChatTurn, ConversationSessionRead, MessageRead
+from app.schemas import ChatResponse, ChatTurn, ConversationSessionRead, MessageRead, PromptTokenBreakdown
 from app.services.openai_client import OpenAIClient
 from app.services.prompt_builder import PromptBuilder
 from app.services.rag import RAGPipeline
+from app.services.response_cache import SemanticResponseCache, get_response_cache, response_fingerprint
+from app.services.summarizer import ConversationSummarizer, get_conversation_summarizer, unsummarized_filter
+from app.services.timing import StageTimings
+
+logger = logging.getLogger(__name__)
 
 
 class ConversationService:
@@ -19,11 +30,21 @@ class ConversationService:
         assistant: Assistant,
         rag_pipeline: RAGPipeline,
         openai_client: OpenAIClient,
+        response_cache: SemanticResponseCache | None = None,
+        summarizer: ConversationSummarizer | None = None,
     ) -> None:
         self.db = db
         self.assistant = assistant
         self.rag = rag_pipeline
         self.openai = openai_client
+        self.response_cache = response_cache or get_response_cache()
+        self.summarizer = summarizer or get_conversation_summarizer()
+        settings = get_settings()
+        self.summary_enabled = settings.conversation_summary_enabled
+        self.summary_trigger = settings.conversation_summary_trigger
+        self.history_window = settings.history_window
+        self.history_timeout = settings.chat_history_timeout
+        self.retrieval_timeout = settings.chat_retrieval_timeout
 
     async def load_session(self, session_id: uuid.UUID) -> ConversationSession:
         stmt = select(ConversationSession).where(ConversationSession.id == session_id)
@@ -31,34 +52,169 @@ class ConversationService:
         session = result.scalar_one()
         if session.assistant_id != self.assistant.id:
             raise ValueError("Session does not belong to this assistant")
-        await self.db.refresh(session)
         return session
 
     async def create_session(self, title: str | None = None) -> ConversationSession:
         session = ConversationSession(assistant_id=self.assistant.id, title=title or "New Session")
         self.db.add(session)
         await self.db.flush()
-        await self.db.refresh(session)
         return session
 
     async def add_message(self, session: ConversationSession, role: str, content: str) -> Message:
         message = Message(session_id=session.id, role=role, content=content)
         self.db.add(message)
         await self.db.flush()
-        await self.db.refresh(message)
         return message
 
     async def chat(self, session: ConversationSession, payload: ChatTurn) -> ChatResponse:
         user_message = payload.user_message
-        await self.db.refresh(session)
-        history = session.messages
-        context = await self.rag.retrieve_context(self.assistant.id, user_message)
-        prompt = PromptBuilder(self.assistant, history, context).build(user_message)
-        assistant_response = await self.openai.complete(prompt)
+        timings = StageTimings()
+        cached, query_vector = await self._lookup_cached_response(user_message, timings)
+        if cached is not None:
+            return await self._finish_turn(session, user_message, cached, timings=timings, cache_hit=True)
+        messages, breakdown = await self._build_prompt(session, user_message, timings)
+        with timings.stage("completion"):
+            assistant_response = await self.openai.complete(messages)
+        self._store_cached_response(query_vector, assistant_response)
+        return await self._finish_turn(session, user_message, assistant_response, breakdown, timings)
+
+    async def stream_chat(self, session: ConversationSession, payload: ChatTurn) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Yield ``(event, data)`` pairs: the session, each token, then the persisted turn.
+
+        Messages are only written once the model stream completes, so a
+        cancelled stream leaves the session unchanged.
+        """
+        user_message = payload.user_message
+        timings = StageTimings()
+        cached, query_vector = await self._lookup_cached_response(user_message, timings)
+        if cached is not None:
+            yield "session", ConversationSessionRead.model_validate(session).model_dump(mode="json")
+            yield "token", {"content": cached}
+            response = await self._finish_turn(session, user_message, cached, timings=timings, cache_hit=True)
+            yield "done", response.model_dump(mode="json")
+            return
+        messages, breakdown = await self._build_prompt(session, user_message, timings)
+        yield "session", ConversationSessionRead.model_validate(session).model_dump(mode="json")
+
+        tokens: list[str] = []
+        with timings.stage("completion"):
+            with timings.stage("first_token"):
+                stream = self.openai.stream_complete(messages)
+                first = await anext(stream, None)
+            if first is not None:
+                tokens.append(first)
+                yield "token", {"content": first}
+                async for token in stream:
+                    tokens.append(token)
+                    yield "token", {"content": token}
+
+        assistant_response = "".join(tokens).strip()
+        self._store_cached_response(query_vector, assistant_response)
+        response = await self._finish_turn(session, user_message, assistant_response, breakdown, timings)
+        yield "done", response.model_dump(mode="json")
+
+    async def _lookup_cached_response(
+        self, user_message: str, timings: StageTimings
+    ) -> tuple[str | None, list[float] | None]:
+        """Return a cached answer for a similar question, and the question's embedding for storing."""
+        if not self.assistant.response_cache_enabled:
+            return None, None
+        with timings.stage("cache_lookup"):
+            query_vector = (await self.openai.embed([user_message]))[0]
+            cached = self.response_cache.get(self.assistant.id, response_fingerprint(self.assistant), query_vector)
+        return cached, query_vector
+
+    def _store_cached_response(self, query_vector: list[float] | None, response: str) -> None:
+        if query_vector is not None and response:
+            self.response_cache.set(self.assistant.id, response_fingerprint(self.assistant), query_vector, response)
+
+    async def load_history(
+        self, session: ConversationSession, limit: int | None = None, db: AsyncSession | None = None
+    ) -> list[Message]:
+        """Return the newest ``limit`` messages not yet in the session summary, in chronological order."""
+        db = db or self.db
+        stmt = (
+            select(Message)
+            .where(*unsummarized_filter(session))
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit or self.history_window)
+        )
+        messages = list((await db.execute(stmt)).scalars().all())
+        messages.reverse()
+        return messages
 
-        user_msg = await self.add_message(session, "user", user_message)
-        assistant_msg = await self.add_message(session, "assistant", assistant_response)
-        await self.db.refresh(session)
+    def history_limit(self, session: ConversationSession) -> int:
+        """Messages to send as history: the configured window, widened while a compaction is due.
+
+        While the summarizer has the session queued or is folding it, the
+        turns between the summary and the window are kept too, so nothing
+        drops out of the prompt before it is in the summary.
+        """
+        if self.summary_enabled and self.summarizer.is_pending(session.id):
+            return self.history_window + self.summary_trigger
+        return self.history_window
+
+    async def _load_recent_history(
+        self, session: ConversationSession, limit: int, timings: StageTimings
+    ) -> list[Message]:
+        async def load() -> list[Message]:
+            # A separate session: cancelling a timed-out query must not break ``self.db``,
+            # which still has to persist the turn.
+            async with db_session.SessionLocal() as db:
+                return await self.load_history(session, limit, db=db)
+
+        try:
+            return await timings.run("history", load(), self.history_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("History loading exceeded %.1fs; answering without history", self.history_timeout)
+            return []
+
+    async def _build_prompt(
+        self, session: ConversationSession, user_message: str, timings: StageTimings
+    ) -> tuple[list[dict[str, str]], PromptTokenBreakdown | None]:
+        # History comes from Postgres and context from the embedder + Qdrant; neither
+        # depends on the other, so both run at once.
+        history_limit = self.history_limit(session)
+        history, context = await asyncio.gather(
+            self._load_recent_history(session, history_limit, timings),
+            self._retrieve_context(user_message, timings),
+        )
+        with timings.stage("prompt"):
+            builder = PromptBuilder(
+                self.assistant, history, context, history_limit=history_limit, summary=session.summary
+            )
+            messages = builder.build_messages(user_message)
+        return messages, builder.token_breakdown
+
+    async def _retrieve_context(self, user_message: str, timings: StageTimings) -> list[str]:
+        retrieval = self.rag.retrieve_context(
+            self.assistant.id,
+            user_message,
+            hybrid=self.assistant.hybrid_retrieval,
+            vector_weight=self.assistant.vector_weight,
+            lexical_weight=self.assistant.lexical_weight,
+        )
+        try:
+            return await timings.run("retrieval", retrieval, self.retrieval_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Context retrieval exceeded %.1fs; answering without knowledge", self.retrieval_timeout)
+            return []
+
+    async def _finish_turn(
+        self,
+        session: ConversationSession,
+        user_message: str,
+        assistant_response: str,
+        token_breakdown: PromptTokenBreakdown | None = None,
+        timings: StageTimings | None = None,
+        cache_hit: bool = False,
+    ) -> ChatResponse:
+        timings = timings or StageTimings()
+        with timings.stage("persist"):
+            user_msg = await self.add_message(session, "user", user_message)
+            assistant_msg = await self.add_message(session, "assistant", assistant_response)
+        if self.summary_enabled:
+            self.summarizer.schedule(session.id)
 
         return ChatResponse(
             assistant_message=assistant_response,
@@ -67,4 +223,7 @@ class ConversationService:
                 MessageRead.model_validate(user_msg),
                 MessageRead.model_validate(assistant_msg),
             ],
+            token_breakdown=token_breakdown,
+            stage_timings_ms=timings.as_ms(),
+            cache_hit=cache_hit,
         )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: list[str], future: asyncio.Future, enqueued_at: float) -> None:
+        self.texts = texts
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into shared upstream calls.
+
+    Requests are queued until either ``max_batch_size`` texts are waiting or
+    ``max_wait`` seconds have passed since the first one arrived; the batch is
+    then embedded with a single call and the vectors are handed back to each
+    caller in order. Requests that already fill a batch bypass the queue.
+    """
+
+    def __init__(self, embed_fn: EmbedFn, max_batch_size: int = 32, max_wait: float = 0.005) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self._embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: list[_PendingRequest] = []
+        self._pending_texts = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._batches = 0
+        self._texts = 0
+        self._requests = 0
+        self._max_batch = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        if len(texts) >= self.max_batch_size:
+            self._record_batch(len(texts), [0.0])
+            return await self._embed_fn(texts)
+
+        loop = asyncio.get_running_loop()
+        if self._pending_texts + len(texts) > self.max_batch_size:
+            self._flush()
+        request = _PendingRequest(texts, loop.create_future(), time.perf_counter())
+        self._pending.append(request)
+        self._pending_texts += len(texts)
+        if self._pending_texts >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await request.future
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "requests": self._requests,
+            "texts": self._texts,
+            "mean_batch_size": self._texts / self._batches if self._batches else 0.0,
+            "max_batch_size": self._max_batch,
+            "mean_wait_ms": 1000 * self._wait_total / self._requests if self._requests else 0.0,
+            "max_wait_ms": 1000 * self._wait_max,
+            "queued_texts": self._pending_texts,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_texts = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[_PendingRequest]) -> None:
+        started = time.perf_counter()
+        texts = [text for request in batch for text in request.texts]
+        self._record_batch(len(texts), [started - request.enqueued_at for request in batch])
+        try:
+            vectors = await self._embed_fn(texts)
+        except Exception as exc:
+            logger.error("Embedding batch of %d texts failed: %s", len(texts), exc)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+        offset = 0
+        for request in batch:
+            if not request.future.done():
+                request.future.set_result(vectors[offset : offset + len(request.texts)])
+            offset += len(request.texts)
+
+    def _record_batch(self, size: int, waits: list[float]) -> None:
+        self._batches += 1
+        self._texts += size
+        self._requests += len(waits)
+        self._max_batch = max(self._max_batch, size)
+        self._wait_total += sum(waits)
+        self._wait_max = max(self._wait_max, *waits)
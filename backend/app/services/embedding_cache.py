@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from array import array
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db import session as db_session
+from app.models import EmbeddingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by (model, sha256(text)).
+
+    Lookups hit an in-process LRU first and fall back to the
+    ``embedding_cache`` table. Database errors are logged and treated as
+    misses so a cache outage never blocks embedding. Both tiers keep vectors
+    as packed float32 ``array('f')`` (about 6 KB for 1536 dimensions instead
+    of roughly 49 KB as a list of floats); callers get plain lists back.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_entries: int = 10_000,
+        persistent: bool = True,
+        max_rows: int = 500_000,
+        evict_every: int = 1_000,
+    ) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self.max_rows = max_rows
+        self.evict_every = evict_every
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._writes_since_evict = 0
+        self._memory_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    async def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        keys = [text_hash(text) for text in texts]
+        results: list[list[float] | None] = [self._memory_get(key) for key in keys]
+        self._memory_hits += sum(1 for result in results if result is not None)
+
+        missing = {keys[i] for i, result in enumerate(results) if result is None}
+        if missing and self.persistent:
+            stored = await self._load(missing)
+            for i, key in enumerate(keys):
+                if results[i] is None and key in stored:
+                    results[i] = stored[key].tolist()
+                    self._persistent_hits += 1
+            for key, vector in stored.items():
+                self._memory_put(key, vector)
+
+        self._misses += sum(1 for result in results if result is None)
+        return results
+
+    async def set_many(self, texts: list[str], vectors: list[list[float]]) -> None:
+        entries = {text_hash(text): array("f", vector) for text, vector in zip(texts, vectors)}
+        for key, vector in entries.items():
+            self._memory_put(key, vector)
+        if self.persistent and entries:
+            await self._store(entries)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._memory_hits + self._persistent_hits + self._misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self._memory_hits,
+            "persistent_hits": self._persistent_hits,
+            "misses": self._misses,
+            "hit_rate": (lookups - self._misses) / lookups if lookups else 0.0,
+            "memory_evictions": self._evictions,
+        }
+
+    def _memory_get(self, key: str) -> list[float] | None:
+        vector = self._memory.get(key)
+        if vector is None:
+            return None
+        self._memory.move_to_end(key)
+        return vector.tolist()
+
+    def _memory_put(self, key: str, vector: array) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    async def _load(self, keys: set[str]) -> dict[str, array]:
+        stmt = select(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.vector).where(
+            EmbeddingCacheEntry.model == self.model,
+            EmbeddingCacheEntry.text_hash.in_(keys),
+        )
+        try:
+            async with db_session.SessionLocal() as session:
+                rows = (await session.execute(stmt)).all()
+        except SQLAlchemyError as exc:
+            logger.warning("Embedding cache lookup failed: %s", exc)
+            return {}
+        return {key: array("f", blob) for key, blob in rows}
+
+    async def _store(self, entries: dict[str, array]) -> None:
+        try:
+            async with db_session.SessionLocal() as session:
+                existing_stmt = select(EmbeddingCacheEntry.text_hash).where(
+                    EmbeddingCacheEntry.model == self.model,
+                    EmbeddingCacheEntry.text_hash.in_(entries.keys()),
+                )
+                existing = set((await session.execute(existing_stmt)).scalars().all())
+                new_rows = [
+                    EmbeddingCacheEntry(
+                        model=self.model,
+                        text_hash=key,
+                        dimensions=len(vector),
+                        vector=vector.tobytes(),
+                    )
+                    for key, vector in entries.items()
+                    if key not in existing
+                ]
+                session.add_all(new_rows)
+                await session.commit()
+                self._writes_since_evict += len(new_rows)
+                if self._writes_since_evict >= self.evict_every:
+                    self._writes_since_evict = 0
+                    await self._evict_persistent(session)
+        except SQLAlchemyError as exc:
+            # Concurrent writers may race on the same key; losing a cache write is harmless.
+            logger.warning("Embedding cache write failed: %s", exc)
+
+    async def _evict_persistent(self, session) -> None:
+        cutoff_stmt = (
+            select(EmbeddingCacheEntry.created_at)
+            .order_by(EmbeddingCacheEntry.created_at.desc())
+            .offset(self.max_rows)
+            .limit(1)
+        )
+        cutoff = (await session.execute(cutoff_stmt)).scalar_one_or_none()
+        if cutoff is None:
+            return
+        await session.execute(delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.created_at <= cutoff))
+        await session.commit()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.models import IngestionJob, KnowledgeDocument
+from app.models.assistant import utcnow
+from app.services.openai_client import get_openai_client
+from app.services.rag import RAGPipeline
+from app.services.response_cache import bump_knowledge_version
+from app.services.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+PipelineFactory = Callable[[], Awaitable[RAGPipeline]]
+
+
+async def _default_pipeline() -> RAGPipeline:
+    return RAGPipeline(await get_vector_store(), await get_openai_client())
+
+
+class IngestionQueue:
+    """In-process worker pool that ingests knowledge documents in the background.
+
+    Jobs live in the ``ingestion_jobs`` table; the asyncio queue only carries
+    job ids. On start, jobs left ``pending`` or ``running`` by a previous
+    process are picked up again, so accepted documents survive restarts.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        pipeline_factory: PipelineFactory = _default_pipeline,
+    ) -> None:
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.pipeline_factory = pipeline_factory
+        self._queue: asyncio.Queue[uuid.UUID] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._completed = 0
+        self._failed = 0
+        self._retried = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(), name=f"ingestion-{i}") for i in range(self.concurrency)]
+        await self.recover()
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def recover(self) -> int:
+        """Re-enqueue jobs that were accepted but never finished."""
+        async with db_session.SessionLocal() as db:
+            await db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.status == IngestionJob.STATUS_RUNNING)
+                .values(status=IngestionJob.STATUS_PENDING)
+            )
+            await db.commit()
+            stmt = (
+                select(IngestionJob.id)
+                .where(IngestionJob.status == IngestionJob.STATUS_PENDING)
+                .order_by(IngestionJob.created_at)
+            )
+            job_ids = list((await db.execute(stmt)).scalars().all())
+        for job_id in job_ids:
+            self.enqueue(job_id)
+        if job_ids:
+            logger.info("Recovered %d pending ingestion jobs", len(job_ids))
+        return len(job_ids)
+
+    async def submit(self, db: AsyncSession, documents: Iterable[KnowledgeDocument]) -> list[IngestionJob]:
+        """Create jobs for ``documents``, commit ``db`` and hand the jobs to the workers."""
+        documents = list(documents)
+        jobs = [
+            IngestionJob(id=uuid.uuid4(), assistant_id=document.assistant_id, document_id=document.id)
+            for document in documents
+        ]
+        for document in documents:
+            document.status = KnowledgeDocument.STATUS_PENDING
+        db.add_all(jobs)
+        await db.commit()
+        for job in jobs:
+            self.enqueue(job.id)
+        return jobs
+
+    def enqueue(self, job_id: uuid.UUID) -> None:
+        if self._queue is None:
+            # Not started (e.g. scripts); the job stays pending and is recovered on next start.
+            logger.warning("Ingestion queue not running; job %s left pending", job_id)
+            return
+        self._queue.put_nowait(job_id)
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "completed": self._completed,
+            "failed": self._failed,
+            "retried": self._retried,
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                await self._process(job_id)
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("Ingestion job %s crashed", job_id)
+            finally:
+                queue.task_done()
+
+    async def _process(self, job_id: uuid.UUID) -> None:
+        async with db_session.SessionLocal() as db:
+            job = await db.get(IngestionJob, job_id)
+            if job is None or job.status not in (IngestionJob.STATUS_PENDING, IngestionJob.STATUS_RUNNING):
+                return
+            document = await db.get(KnowledgeDocument, job.document_id)
+            if document is None:
+                job.status = IngestionJob.STATUS_FAILED
+                job.error = "Document no longer exists"
+                job.finished_at = utcnow()
+                await db.commit()
+                return
+
+            job.status = IngestionJob.STATUS_RUNNING
+            job.attempts += 1
+            job.started_at = utcnow()
+            await db.commit()
+
+            try:
+                pipeline = await self.pipeline_factory()
+                await pipeline.ingest_document(db, job.assistant_id, document)
+            except Exception as exc:
+                await db.rollback()
+                await db.refresh(job)
+                await db.refresh(document)
+                await self._record_failure(db, job, document, exc)
+                return
+
+            document.status = KnowledgeDocument.STATUS_READY
+            job.status = IngestionJob.STATUS_COMPLETED
+            job.error = None
+            job.finished_at = utcnow()
+            await bump_knowledge_version(db, job.assistant_id)
+            await db.commit()
+            self._completed += 1
+
+    async def _record_failure(
+        self, db: AsyncSession, job: IngestionJob, document: KnowledgeDocument, exc: Exception
+    ) -> None:
+        job.error = str(exc)[:2000]
+        if job.attempts < self.max_attempts:
+            logger.warning("Ingestion job %s failed (attempt %d): %s", job.id, job.attempts, exc)
+            job.status = IngestionJob.STATUS_PENDING
+            await db.commit()
+            self._retried += 1
+            self.enqueue(job.id)
+            return
+        logger.error("Ingestion job %s failed permanently: %s", job.id, exc)
+        job.status = IngestionJob.STATUS_FAILED
+        job.finished_at = utcnow()
+        document.status = KnowledgeDocument.STATUS_FAILED
+        await db.commit()
+        self._failed += 1
+
+
+_queue: IngestionQueue | None = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    global _queue
+    if _queue is None:
+        settings = get_settings()
+        _queue = IngestionQueue(
+            concurrency=settings.ingestion_concurrency,
+            max_attempts=settings.ingestion_max_attempts,
+        )
+    return _queue
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# (point id, indexed text, payload); point ids match the vector store's chunk ids.
+LexicalPoint = tuple[str, str, dict]
+Loader = Callable[[], Awaitable[list[LexicalPoint]]]
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over the chunks of one assistant."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self.lengths: dict[str, int] = {}
+        self.point_terms: dict[str, list[str]] = {}
+        self.payloads: dict[str, dict] = {}
+        self.total_length = 0
+        self.loaded_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, points: list[LexicalPoint]) -> None:
+        with self.lock:
+            for point_id, text, payload in points:
+                self._remove(point_id)
+                terms = Counter(tokenize(text))
+                for term, frequency in terms.items():
+                    self.postings[term][point_id] = frequency
+                length = sum(terms.values())
+                self.lengths[point_id] = length
+                self.point_terms[point_id] = list(terms)
+                self.payloads[point_id] = payload
+                self.total_length += length
+
+    def remove_documents(self, document_ids: set[str]) -> None:
+        with self.lock:
+            for point_id in [pid for pid, payload in self.payloads.items() if payload["document_id"] in document_ids]:
+                self._remove(point_id)
+
+    def remove_points(self, point_ids: list[str]) -> None:
+        with self.lock:
+            for point_id in point_ids:
+                self._remove(point_id)
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        with self.lock:
+            if not self.lengths:
+                return []
+            count = len(self.lengths)
+            average_length = self.total_length / count or 1.0
+            scores: dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for point_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[point_id] / average_length)
+                    scores[point_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [{"id": point_id, "score": score, "payload": self.payloads[point_id]} for point_id, score in ranked]
+
+    def _remove(self, point_id: str) -> None:
+        length = self.lengths.pop(point_id, None)
+        if length is None:
+            return
+        self.payloads.pop(point_id, None)
+        self.total_length -= length
+        for term in self.point_terms.pop(point_id, []):
+            del self.postings[term][point_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+
+class LexicalIndex:
+    """In-process BM25 indexes, one per assistant, built lazily from stored documents.
+
+    An assistant's index is loaded on its first hybrid query and kept current by
+    ingestion in this process. Other processes ingest independently, so an index
+    older than ``refresh_seconds`` is rebuilt in a background task while queries
+    keep using the stale one. Changes made during the rebuild are replayed on
+    the new index before it replaces the old one.
+    """
+
+    def __init__(self, refresh_seconds: float = 300.0) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._indexes: dict[uuid.UUID, BM25Index] = {}
+        self._load_locks: dict[uuid.UUID, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._refresh_tasks: dict[uuid.UUID, asyncio.Task] = {}
+        self._refresh_changes: dict[uuid.UUID, list[Callable[[BM25Index], None]]] = {}
+
+    async def ensure_loaded(self, assistant_id: uuid.UUID, loader: Loader) -> BM25Index:
+        index = self._indexes.get(assistant_id)
+        if index is not None:
+            if self._is_stale(index):
+                self._schedule_refresh(assistant_id, loader)
+            return index
+        async with self._load_locks[assistant_id]:
+            index = self._indexes.get(assistant_id)
+            if index is None:
+                index = await self._load(loader)
+                self._indexes[assistant_id] = index
+        return index
+
+    async def search(self, assistant_id: uuid.UUID, query: str, limit: int, loader: Loader) -> list[dict]:
+        index = await self.ensure_loaded(assistant_id, loader)
+        return await asyncio.to_thread(index.search, query, limit)
+
+    def add(self, assistant_id: uuid.UUID, points: list[LexicalPoint]) -> None:
+        """Index freshly ingested chunks; assistants not loaded yet pick them up on first query."""
+        if points:
+            self._apply(assistant_id, lambda index: index.add(points))
+
+    def remove_documents(self, assistant_id: uuid.UUID, document_ids: list[uuid.UUID]) -> None:
+        ids = {str(document_id) for document_id in document_ids}
+        self._apply(assistant_id, lambda index: index.remove_documents(ids))
+
+    def remove_points(self, assistant_id: uuid.UUID, point_ids: list[str]) -> None:
+        self._apply(assistant_id, lambda index: index.remove_points(point_ids))
+
+    def drop(self, assistant_id: uuid.UUID) -> None:
+        # A refresh still running for the assistant sees it is gone and discards its result.
+        self._indexes.pop(assistant_id, None)
+
+    async def wait_for_refreshes(self) -> None:
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks.values(), return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "assistants": len(self._indexes),
+            "chunks": sum(len(index) for index in self._indexes.values()),
+            "refreshing": len(self._refresh_tasks),
+        }
+
+    def _apply(self, assistant_id: uuid.UUID, change: Callable[[BM25Index], None]) -> None:
+        index = self._indexes.get(assistant_id)
+        if index is None:
+            return
+        change(index)
+        changes = self._refresh_changes.get(assistant_id)
+        if changes is not None:
+            changes.append(change)
+
+    def _schedule_refresh(self, assistant_id: uuid.UUID, loader: Loader) -> None:
+        if assistant_id in self._refresh_tasks:
+            return
+        self._refresh_changes[assistant_id] = []
+        self._refresh_tasks[assistant_id] = asyncio.create_task(
+            self._refresh(assistant_id, loader), name=f"lexical-refresh-{assistant_id}"
+        )
+
+    async def _refresh(self, assistant_id: uuid.UUID, loader: Loader) -> None:
+        try:
+            index = await self._load(loader)
+            if assistant_id in self._indexes:
+                for change in self._refresh_changes[assistant_id]:
+                    change(index)
+                self._indexes[assistant_id] = index
+        except Exception:
+            logger.exception("Refreshing the lexical index of assistant %s failed", assistant_id)
+            stale = self._indexes.get(assistant_id)
+            if stale is not None:
+                # Keep serving the old index and retry after another refresh period.
+                stale.loaded_at = time.monotonic()
+        finally:
+            self._refresh_tasks.pop(assistant_id, None)
+            self._refresh_changes.pop(assistant_id, None)
+
+    @staticmethod
+    async def _load(loader: Loader) -> BM25Index:
+        index = BM25Index()
+        points = await loader()
+        await asyncio.to_thread(index.add, points)
+        return index
+
+    def _is_stale(self, index: BM25Index) -> bool:
+        return time.monotonic() - index.loaded_at > self.refresh_seconds
+
+
+_index: LexicalIndex | None = None
+
+
+def get_lexical_index() -> LexicalIndex:
+    global _index
+    if _index is None:
+        _index = LexicalIndex(refresh_seconds=get_settings().lexical_index_refresh_seconds)
+    return _index
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import re
+import threading
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Character n-gram sizes hashed per text. Grams span the single space kept
+# between words, so short words and word boundaries get their own features.
+NGRAM_RANGE = (3, 5)
+
+_PRIME = np.uint64(1099511628211)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder based on hashed character n-grams.
+
+    Text is lowercased and reduced to word tokens. Every character n-gram is
+    hashed into one of ``dimensions`` buckets with a hash-derived sign, counts
+    are dampened with ``log1p`` and the vector is L2-normalized, so texts
+    sharing words and subwords get a high cosine similarity. All texts in a
+    batch are hashed together in NumPy, without per-gram Python work.
+
+    With ``use_idf`` buckets are additionally weighted by inverse document
+    frequency, learned from the texts embedded with ``learn=True`` (ingested
+    chunks) in this process. Query embeddings only read the statistics, so the
+    same query always gets the same vector between ingestions. Vectors stored
+    earlier still drift from later queries as the statistics grow, so it is off
+    by default.
+    """
+
+    def __init__(self, dimensions: int = 1536, use_idf: bool = False) -> None:
+        self.dimensions = dimensions
+        self.use_idf = use_idf
+        self._document_frequency = np.zeros(dimensions, dtype=np.float64)
+        self._documents = 0
+        self._lock = threading.Lock()
+
+    def embed(self, texts: list[str], learn: bool = False) -> list[list[float]]:
+        return self.embed_array(texts, learn).tolist()
+
+    def embed_array(self, texts: list[str], learn: bool = False) -> np.ndarray:
+        """Embed ``texts``; ``learn`` adds them to the IDF statistics first (ingestion only)."""
+        counts = self._hashed_counts(texts)
+        weights = np.sign(counts) * np.log1p(np.abs(counts))
+        if self.use_idf:
+            weights *= self._idf(counts, learn)
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (weights / norms).astype(np.float32)
+
+    def _hashed_counts(self, texts: list[str]) -> np.ndarray:
+        normalized = [" " + " ".join(_TOKEN_RE.findall(text.lower())) + " " for text in texts]
+        codes = np.frombuffer("".join(normalized).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        rows = np.repeat(np.arange(len(texts)), [len(text) for text in normalized])
+        dims = np.uint64(self.dimensions)
+
+        flat_indices, signs = [], []
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+            count = len(codes) - n + 1
+            if count <= 0:
+                continue
+            hashes = np.full(count, n, dtype=np.uint64)
+            for offset in range(n):
+                hashes = hashes * _PRIME + codes[offset : offset + count]
+            hashes ^= hashes >> np.uint64(33)
+            hashes *= _MIX
+            hashes ^= hashes >> np.uint64(33)
+            # Drop grams that straddle two texts of the batch.
+            same_text = rows[:count] == rows[n - 1 : n - 1 + count]
+            hashes = hashes[same_text]
+            flat_indices.append(rows[:count][same_text] * self.dimensions + (hashes % dims).astype(np.int64))
+            signs.append(1.0 - 2.0 * (hashes >> np.uint64(63)).astype(np.float64))
+
+        size = len(texts) * self.dimensions
+        if not flat_indices:
+            return np.zeros((len(texts), self.dimensions))
+        counts = np.bincount(np.concatenate(flat_indices), weights=np.concatenate(signs), minlength=size)
+        return counts.reshape(len(texts), self.dimensions)
+
+    def _idf(self, counts: np.ndarray, learn: bool) -> np.ndarray:
+        with self._lock:
+            if learn:
+                self._document_frequency += (counts != 0).sum(axis=0)
+                self._documents += len(counts)
+            return np.log((1 + self._documents) / (1 + self._document_frequency)) + 1.0
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from app.services.vector_store import ChunkPoint, VectorStore
+
+logger = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 1024
+# The metadata log is folded into meta.json once it is larger than the snapshot (and at least this big),
+# so a mutation appends only its own changes and full rewrites stay amortized.
+META_COMPACT_MIN_BYTES = 1 << 20
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _remove_index(directory: Path, index: _AssistantIndex | None) -> None:
+    with index.lock if index is not None else nullcontext():
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class _AssistantIndex:
+    """Unit-normalized float32 rows for one assistant.
+
+    Vectors live in ``vectors.npy``, preallocated with spare capacity and
+    memory-mapped so upserts write rows in place. Point ids and payloads are
+    kept in a ``meta.json`` snapshot plus an append-only log of the upserts and
+    deletes made since (``meta.<generation>.log``, named by the snapshot it
+    belongs to); loading replays the log over the snapshot.
+    Calls are serialized by ``lock`` because the store runs them in worker
+    threads.
+    """
+
+    def __init__(self, directory: Path, dimensions: int) -> None:
+        self.directory = directory
+        self.dimensions = dimensions
+        self.ids: list[str] = []
+        self.payloads: list[dict] = []
+        self.positions: dict[str, int] = {}
+        self.vectors: np.memmap | None = None
+        self.lock = threading.Lock()
+        self._snapshot_bytes: int | None = None
+        self._log_bytes = 0
+        self._generation = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, directory: Path) -> _AssistantIndex | None:
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        index = cls(directory, meta["dimensions"])
+        index.ids = meta["ids"]
+        index.payloads = meta["payloads"]
+        index.positions = {point_id: position for position, point_id in enumerate(index.ids)}
+        index.vectors = open_memmap(directory / "vectors.npy", mode="r+")
+        index._snapshot_bytes = meta_path.stat().st_size
+        index._generation = meta.get("generation", 0)
+        log_path = index._log_path
+        if log_path.exists():
+            data = log_path.read_bytes()
+            index._log_bytes = len(data)
+            for line in data.splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A write cut short by a crash; fold what was read so later appends start clean.
+                    logger.warning("Ignoring a truncated record in %s", log_path)
+                    index._compact()
+                    break
+                index._replay(record)
+        return index
+
+    def upsert(self, points: list[ChunkPoint]) -> None:
+        matrix = _normalize(np.asarray([vector for _, vector, _ in points], dtype=np.float32))
+        self._check_dimensions(matrix.shape[1])
+        with self.lock:
+            new_ids = {point_id for point_id, _, _ in points if point_id not in self.positions}
+            self._reserve(self.size + len(new_ids))
+            rows = np.empty(len(points), dtype=np.intp)
+            for row, (point_id, _, payload) in enumerate(points):
+                rows[row] = self._place(point_id, payload)
+            self.vectors[rows] = matrix
+            self._persist({"upsert": [[point_id, payload] for point_id, _, payload in points]})
+
+    def delete_documents(self, document_ids: set[str]) -> int:
+        return self._delete_where(lambda point_id, payload: payload["document_id"] in document_ids)
+
+    def delete_points(self, point_ids: set[str]) -> int:
+        return self._delete_where(lambda point_id, payload: point_id in point_ids)
+
+    def _delete_where(self, predicate: Callable[[str, dict], bool]) -> int:
+        with self.lock:
+            keep = [
+                position
+                for position, (point_id, payload) in enumerate(zip(self.ids, self.payloads))
+                if not predicate(point_id, payload)
+            ]
+            removed = self.size - len(keep)
+            if not removed:
+                return 0
+            kept = set(keep)
+            removed_ids = [point_id for position, point_id in enumerate(self.ids) if position not in kept]
+            if keep:
+                self.vectors[: len(keep)] = self.vectors[keep]
+            self._retain(keep)
+            self._persist({"delete": removed_ids})
+            return removed
+
+    def document_counts(self) -> dict[str, int]:
+        with self.lock:
+            return dict(Counter(payload["document_id"] for payload in self.payloads))
+
+    def search(self, vector: list[float], limit: int, with_vectors: bool = False) -> list[dict]:
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        self._check_dimensions(query.shape[0])
+        with self.lock:
+            if not self.size or limit <= 0:
+                return []
+            scores = self.vectors[: self.size] @ query
+            k = min(limit, self.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = [
+                {"id": self.ids[position], "score": float(scores[position]), "payload": self.payloads[position]}
+                for position in top
+            ]
+            if with_vectors:
+                for result, row in zip(results, self.vectors[top].tolist()):
+                    result["vector"] = row
+            return results
+
+    def _check_dimensions(self, dimensions: int) -> None:
+        if dimensions != self.dimensions:
+            raise ValueError(f"Index at {self.directory} stores {self.dimensions}-dim vectors, got {dimensions}")
+
+    def _reserve(self, needed: int) -> None:
+        capacity = 0 if self.vectors is None else self.vectors.shape[0]
+        if needed <= capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, capacity * 2, needed)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / "vectors.npy.tmp"
+        grown = open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dimensions))
+        if self.vectors is not None and self.size:
+            grown[: self.size] = self.vectors[: self.size]
+        grown.flush()
+        os.replace(tmp_path, self.directory / "vectors.npy")
+        self.vectors = grown
+
+    def _place(self, point_id: str, payload: dict) -> int:
+        position = self.positions.get(point_id)
+        if position is None:
+            position = self.positions[point_id] = len(self.ids)
+            self.ids.append(point_id)
+            self.payloads.append(payload)
+        else:
+            self.payloads[position] = payload
+        return position
+
+    def _retain(self, keep: list[int]) -> None:
+        self.ids = [self.ids[position] for position in keep]
+        self.payloads = [self.payloads[position] for position in keep]
+        self.positions = {point_id: position for position, point_id in enumerate(self.ids)}
+
+    def _replay(self, record: dict) -> None:
+        # Mirrors upsert/_delete_where so positions match the rows already in vectors.npy.
+        for point_id, payload in record.get("upsert", []):
+            self._place(point_id, payload)
+        if "delete" in record:
+            removed = set(record["delete"])
+            self._retain([position for position, point_id in enumerate(self.ids) if point_id not in removed])
+
+    def _persist(self, record: dict) -> None:
+        if self.vectors is not None:
+            self.vectors.flush()
+        if self._snapshot_bytes is None:
+            self._compact()
+            return
+        line = (json.dumps(record) + "\n").encode()
+        with open(self._log_path, "ab") as log:
+            log.write(line)
+        self._log_bytes += len(line)
+        if self._log_bytes > max(META_COMPACT_MIN_BYTES, self._snapshot_bytes):
+            self._compact()
+
+    @property
+    def _log_path(self) -> Path:
+        return self.directory / f"meta.{self._generation}.log"
+
+    def _compact(self) -> None:
+        """Write the full metadata to ``meta.json`` and start a new, empty log."""
+        previous_log = self._log_path
+        self._generation += 1
+        meta = {
+            "dimensions": self.dimensions,
+            "generation": self._generation,
+            "ids": self.ids,
+            "payloads": self.payloads,
+        }
+        data = json.dumps(meta).encode()
+        tmp_path = self.directory / "meta.json.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.directory / "meta.json")
+        # The new snapshot names a new log, so a crash before this unlink never replays old records twice.
+        previous_log.unlink(missing_ok=True)
+        self._snapshot_bytes = len(data)
+        self._log_bytes = 0
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store for development and small single-node deployments.
+
+    Each assistant gets its own directory under ``path`` holding a memory-mapped
+    float32 matrix, and search is a brute-force cosine scan with ``argpartition``
+    top-k, which stays fast up to a few hundred thousand chunks per assistant.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._vector_size: int | None = None
+        self._indexes: dict[uuid.UUID, _AssistantIndex] = {}
+        self._indexes_lock = threading.Lock()
+
+    @property
+    def vector_size(self) -> int | None:
+        return self._vector_size
+
+    async def ensure_collection(self, vector_size: int = 1536) -> None:
+        if self._vector_size == vector_size:
+            return
+        await asyncio.to_thread(self.path.mkdir, parents=True, exist_ok=True)
+        self._vector_size = vector_size
+
+    async def _upsert_points(self, assistant_id: uuid.UUID, points: list[ChunkPoint]) -> None:
+        index = await asyncio.to_thread(self._index, assistant_id, len(points[0][1]))
+        await asyncio.to_thread(index.upsert, points)
+
+    async def search(
+        self, assistant_id: uuid.UUID, vector: list[float], limit: int = 5, with_vectors: bool = False
+    ) -> list[dict]:
+        index = await asyncio.to_thread(self._index, assistant_id)
+        if index is None:
+            return []
+        return await asyncio.to_thread(index.search, vector, limit, with_vectors)
+
+    async def delete_documents(self, assistant_id: uuid.UUID, document_ids: list[uuid.UUID]) -> None:
+        index = await asyncio.to_thread(self._index, assistant_id)
+        if index is None or not document_ids:
+            return
+        await asyncio.to_thread(index.delete_documents, {str(document_id) for document_id in document_ids})
+
+    async def delete_points(self, assistant_id: uuid.UUID, point_ids: list[str]) -> None:
+        index = await asyncio.to_thread(self._index, assistant_id)
+        if index is None or not point_ids:
+            return
+        await asyncio.to_thread(index.delete_points, set(point_ids))
+
+    async def delete_assistant(self, assistant_id: uuid.UUID) -> None:
+        with self._indexes_lock:
+            index = self._indexes.pop(assistant_id, None)
+        await asyncio.to_thread(_remove_index, self.path / str(assistant_id), index)
+
+    async def document_point_counts(self) -> dict[tuple[str, str], int]:
+        def scan() -> dict[tuple[str, str], int]:
+            counts: dict[tuple[str, str], int] = {}
+            if not self.path.is_dir():
+                return counts
+            for directory in sorted(self.path.iterdir()):
+                try:
+                    assistant_id = uuid.UUID(directory.name)
+                except ValueError:
+                    continue
+                index = self._index(assistant_id)
+                if index is not None:
+                    for document_id, count in index.document_counts().items():
+                        counts[(str(assistant_id), document_id)] = count
+            return counts
+
+        return await asyncio.to_thread(scan)
+
+    def _index(self, assistant_id: uuid.UUID, dimensions: int | None = None) -> _AssistantIndex | None:
+        """Return the loaded index, opening it from disk or creating it when ``dimensions`` is given."""
+        with self._indexes_lock:
+            index = self._indexes.get(assistant_id)
+            if index is None:
+                directory = self.path / str(assistant_id)
+                index = _AssistantIndex.load(directory)
+                if index is None and dimensions is not None:
+                    index = _AssistantIndex(directory, dimensions)
+                if index is not None:
+                    self._indexes[assistant_id] = index
+            return index
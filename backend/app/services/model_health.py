@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a model whose circuit breaker is open."""
+
+
+def is_model_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` says the model is unhealthy, rather than the request being invalid.
+
+    Transport errors, timeouts and 5xx count against the breaker (and an open
+    circuit sends the request on to the fallback model). 4xx responses
+    (context length exceeded, bad parameters) are the caller's and would fail
+    on any model. Rate limiting (429, or any response carrying Retry-After) is
+    handled by the scheduler's backoff and says nothing about model health.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        response = exc.response
+        rate_limited = response.status_code == 429 or any(
+            header in response.headers for header in ("retry-after", "retry-after-ms")
+        )
+        return response.status_code >= 500 and not rate_limited
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, CircuitOpenError))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream model.
+
+    ``closed``: calls pass; ``failure_threshold`` failures in a row open it.
+    ``open``: calls are rejected until ``recovery_seconds`` have passed.
+    ``half_open``: a single probe call is let through; its success closes the
+    circuit and its failure opens it again.
+    """
+
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = self.STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._transitions: dict[str, int] = {}
+        self._rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may start now; in ``half_open`` this reserves the probe."""
+        if self.state == self.STATE_OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_seconds:
+                self._rejected += 1
+                return False
+            self._transition(self.STATE_HALF_OPEN)
+        if self.state == self.STATE_HALF_OPEN:
+            if self._probe_in_flight:
+                self._rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != self.STATE_CLOSED:
+            self._transition(self.STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.STATE_HALF_OPEN or (
+            self.state == self.STATE_CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._transition(self.STATE_OPEN)
+
+    def release(self) -> None:
+        """Forget a call that was cancelled before it finished, freeing the probe."""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "transitions": dict(self._transitions),
+            "rejected": self._rejected,
+        }
+
+    def _transition(self, state: str) -> None:
+        key = f"{self.state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        log = logger.warning if state == self.STATE_OPEN else logger.info
+        log("Circuit for %s: %s -> %s (%d consecutive failures)", self.name, self.state, state, self._failures)
+        self.state = state
+
+
+class LatencyWindow:
+    """Latencies of the last ``size`` successful calls, for percentile estimates."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """The ``q``-th percentile in seconds, or None until ``min_samples`` are recorded."""
+        if len(self._samples) < self.min_samples:
+            return None
+        return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+    def stats(self) -> dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "samples": len(self._samples),
+            "p50_ms": round(1000 * p50, 1) if p50 is not None else None,
+            "p95_ms": round(1000 * p95, 1) if p95 is not None else None,
+        }
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
 from app.core.config import get_settings
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import EmbeddingCache
+from app.services.local_embedder import HashingEmbedder
+from app.services.model_health import CircuitBreaker, CircuitOpenError, LatencyWindow, is_model_failure
+from app.services.prompt_builder import DEFAULT_SYSTEM_PROMPT
+from app.services.request_scheduler import PRIORITY_INTERACTIVE, RequestScheduler
+from app.services.single_flight import SingleFlight, payload_key
+from app.services.tokenizer import get_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +29,11 @@ class OpenAIClient:
         self.settings = get_settings()
         if not self.settings.openai_api_key:
             logger.warning("OPENAI_API_KEY not configured; responses will be stubbed.")
+        self._limits = httpx.Limits(
+            max_connections=self.settings.openai_max_connections,
+            max_keepalive_connections=self.settings.openai_max_keepalive_connections,
+            keepalive_expiry=self.settings.openai_keepalive_expiry,
+        )
         self._http_client = httpx.AsyncClient(
             base_url="https://api.openai.com/v1",
             headers={
@@ -24,60 +41,395 @@ class OpenAIClient:
                 "Content-Type": "application/json",
             },
             timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=self._limits,
+            http2=self.settings.openai_http2,
         )
-
-    async def complete(self, prompt: str, **kwargs: Any) -> str:
+        self._requests_total = 0
+        self._requests_in_flight = 0
+        self._scheduler = RequestScheduler(
+            max_concurrency=self.settings.openai_max_concurrency,
+            min_concurrency=self.settings.openai_min_concurrency,
+            max_retries=self.settings.openai_max_retries,
+            backoff_base=self.settings.openai_backoff_base_seconds,
+            backoff_max=self.settings.openai_backoff_max_seconds,
+        )
+        self._batcher: EmbeddingBatcher | None = None
+        if self.settings.openai_api_key and self.settings.embedding_microbatch_enabled:
+            self._batcher = EmbeddingBatcher(
+                self._embed_upstream,
+                max_batch_size=self.settings.embedding_microbatch_max_size,
+                max_wait=self.settings.embedding_microbatch_max_wait_ms / 1000,
+            )
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[str, LatencyWindow] = {}
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._usage = {"responses": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+        self._single_flight = SingleFlight() if self.settings.openai_single_flight else None
+        self._local_embedder: HashingEmbedder | None = None
         if not self.settings.openai_api_key:
-            return "OpenAI API key missing. This is a stubbed response based on the prompt."
+            self._local_embedder = HashingEmbedder(
+                self.settings.embedding_dimensions, use_idf=self.settings.local_embedding_idf
+            )
+        self._cache: EmbeddingCache | None = None
+        if self.settings.openai_api_key and self.settings.embedding_cache_enabled:
+            self._cache = EmbeddingCache(
+                self._embedding_cache_key(),
+                max_entries=self.settings.embedding_cache_memory_entries,
+                persistent=self.settings.embedding_cache_persistent,
+                max_rows=self.settings.embedding_cache_max_rows,
+            )
+
+    async def _post(
+        self, url: str, payload: dict[str, Any], priority: int = PRIORITY_INTERACTIVE, tokens: int = 0
+    ) -> httpx.Response:
+        async def send() -> httpx.Response:
+            self._requests_total += 1
+            self._requests_in_flight += 1
+            try:
+                return await self._http_client.post(url, json=payload)
+            finally:
+                self._requests_in_flight -= 1
+
+        return await self._scheduler.send(send, priority, tokens)
+
+    @staticmethod
+    def _estimate_tokens(texts: list[str], completion_tokens: int = 0) -> int:
+        # Charged against the tokens-per-minute budget before the real usage is known.
+        tokenizer = get_tokenizer()
+        return sum(tokenizer.count(text) for text in texts) + completion_tokens
+
+    STUB_RESPONSE = "OpenAI API key missing. This is a stubbed response based on the prompt."
+
+    def _chat_payload(self, prompt: str | list[dict[str, str]], **kwargs: Any) -> dict[str, Any]:
+        """Build a chat request from a plain prompt or a ready ``messages`` array.
 
-        payload = {
-            "model": self.settings.openai_model,
-            "messages": [
-                {"role": "system", "content": "You are a helpful assistant."},
+        Callers that pass messages (see ``PromptBuilder.build_messages``) keep
+        their stable system prompt first, which lets the provider reuse its
+        prompt cache across turns.
+        """
+        if isinstance(prompt, str):
+            messages = [
+                {"role": "system", "content": DEFAULT_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
-            ],
-        }
+            ]
+        else:
+            messages = list(prompt)
+        payload = {"model": self.settings.openai_model, "messages": messages}
         payload.update(kwargs)
+        return payload
+
+    async def complete(
+        self, prompt: str | list[dict[str, str]], priority: int = PRIORITY_INTERACTIVE, **kwargs: Any
+    ) -> str:
+        """Complete ``prompt``; background work such as summarization passes ``PRIORITY_BACKGROUND``."""
+        if not self.settings.openai_api_key:
+            return self.STUB_RESPONSE
 
+        payload = self._chat_payload(prompt, **kwargs)
+        if self._single_flight is None:
+            return await self._complete(payload, priority)
+        # Identical concurrent prompts (e.g. a popular FAQ) share one upstream call.
+        return await self._single_flight.do(payload_key(payload), lambda: self._complete(payload, priority))
+
+    def _chat_tokens(self, payload: dict[str, Any]) -> int:
+        contents = [message.get("content") or "" for message in payload["messages"]]
+        return self._estimate_tokens(contents, payload.get("max_tokens") or 0)
+
+    async def _complete(self, payload: dict[str, Any], priority: int = PRIORITY_INTERACTIVE) -> str:
+        """Complete with the primary model, hedging to or falling back on the fallback model.
+
+        With hedging enabled, the fallback request starts once the primary has
+        been running longer than its recent p95 latency; whichever answers
+        first wins and the other is cancelled. Otherwise the fallback is only
+        tried after the primary fails. Models whose circuit is open are skipped.
+        Errors caused by the request itself and rate limiting that outlasted the
+        scheduler's retries (see ``is_model_failure``) are raised as they are,
+        without trying the fallback model.
+        """
+        primary = payload["model"]
+        fallback = self.settings.openai_fallback_model
+        if fallback == primary:
+            return await self._complete_with(primary, payload, priority)
+
+        deadline = self._hedge_deadline(primary) if self.settings.openai_hedging_enabled else None
+        primary_task = asyncio.ensure_future(self._complete_with(primary, payload, priority))
+        fallback_task: asyncio.Future | None = None
         try:
-            response = await self._http_client.post("/chat/completions", json=payload)
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"].strip()
-        except httpx.HTTPError as exc:
-            logger.error("Primary model request failed: %s", exc)
-            if self.settings.openai_fallback_model == self.settings.openai_model:
-                raise
-            payload["model"] = self.settings.openai_fallback_model
-            response = await self._http_client.post("/chat/completions", json=payload)
+            await asyncio.wait({primary_task}, timeout=deadline)
+            if primary_task.done():
+                if primary_task.exception() is None:
+                    return primary_task.result()
+                if not is_model_failure(primary_task.exception()):
+                    raise primary_task.exception()
+                logger.error("Primary model request failed: %s", primary_task.exception())
+            else:
+                self._hedges += 1
+                logger.info("Primary model slower than %.2fs; hedging to %s", deadline, fallback)
+            fallback_task = asyncio.ensure_future(self._complete_with(fallback, payload, priority))
+            pending = {task for task in (primary_task, fallback_task) if not task.done()}
+            error = primary_task.exception() if primary_task.done() else None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is fallback_task and not primary_task.done():
+                            self._hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                    if not is_model_failure(error):
+                        raise error
+            raise error
+        finally:
+            for task in (primary_task, fallback_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _complete_with(
+        self, model: str, payload: dict[str, Any], priority: int = PRIORITY_INTERACTIVE
+    ) -> str:
+        breaker = self._breaker(model)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for model {model}")
+        started = time.perf_counter()
+        try:
+            response = await self._post(
+                "/chat/completions", {**payload, "model": model}, priority, self._chat_tokens(payload)
+            )
             response.raise_for_status()
             data = response.json()
-            return data["choices"][0]["message"]["content"].strip()
+            content = data["choices"][0]["message"]["content"].strip()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as exc:
+            if is_model_failure(exc):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        breaker.record_success()
+        self._latency(model).record(time.perf_counter() - started)
+        self._record_usage(data.get("usage"))
+        return content
+
+    def _record_usage(self, usage: dict[str, Any] | None) -> None:
+        """Accumulate token usage, including prompt tokens served from the provider's prompt cache."""
+        if not usage:
+            return
+        self._usage["responses"] += 1
+        self._usage["prompt_tokens"] += usage.get("prompt_tokens") or 0
+        self._usage["completion_tokens"] += usage.get("completion_tokens") or 0
+        self._usage["cached_tokens"] += (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+    def usage_stats(self) -> dict[str, Any]:
+        prompt_tokens = self._usage["prompt_tokens"]
+        return {
+            **self._usage,
+            "cached_ratio": round(self._usage["cached_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0,
+        }
 
-    async def embed(self, texts: list[str]) -> list[list[float]]:
+    def _hedge_deadline(self, model: str) -> float:
+        observed = self._latency(model).percentile(self.settings.openai_hedge_percentile)
+        return max(self.settings.openai_hedge_min_delay_seconds, observed or 0.0)
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(
+                model,
+                failure_threshold=self.settings.openai_circuit_failure_threshold,
+                recovery_seconds=self.settings.openai_circuit_recovery_seconds,
+            )
+        return self._breakers[model]
+
+    def _latency(self, model: str) -> LatencyWindow:
+        return self._latencies.setdefault(model, LatencyWindow())
+
+    async def stream_complete(self, prompt: str | list[dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """Yield completion tokens as they arrive.
+
+        Closing the generator (e.g. when the HTTP client disconnects) closes the
+        upstream response, which aborts generation on the provider side. Streams
+        are not hedged; the fallback model is used when the primary's circuit is
+        open or it fails before the first token.
+        """
         if not self.settings.openai_api_key:
-            logger.info("Using deterministic stub embeddings for %d texts", len(texts))
-            return [self._fallback_embedding(t) for t in texts]
+            yield self.STUB_RESPONSE
+            return
+
+        payload = self._chat_payload(prompt, stream=True, **kwargs)
+        # Ask for a final usage chunk so cached prompt tokens are counted for streams too.
+        payload.setdefault("stream_options", {"include_usage": True})
+        models = list(dict.fromkeys((payload["model"], self.settings.openai_fallback_model)))
+        for index, model in enumerate(models):
+            breaker = self._breaker(model)
+            if not breaker.allow():
+                logger.warning("Circuit open for %s; skipping", model)
+                continue
+            payload["model"] = model
+            streamed = False
+            try:
+                async for token in self._stream_chat(payload):
+                    streamed = True
+                    yield token
+            except httpx.HTTPError as exc:
+                if not is_model_failure(exc):
+                    breaker.release()
+                    raise
+                breaker.record_failure()
+                # Only retry when nothing has been streamed yet; a partial answer cannot be resumed.
+                if streamed or index == len(models) - 1:
+                    raise
+                logger.error("Primary model stream failed: %s", exc)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            return
+        raise CircuitOpenError(f"Circuit open for models {', '.join(models)}")
 
-        payload = {
+    async def _stream_chat(self, payload: dict[str, Any]) -> AsyncIterator[str]:
+        tokens = self._chat_tokens(payload)
+        attempt = 0
+        while True:
+            # The slot is held for the whole stream; retries only happen before any token is read.
+            async with self._scheduler.slot(PRIORITY_INTERACTIVE, tokens):
+                self._requests_total += 1
+                self._requests_in_flight += 1
+                try:
+                    async with self._http_client.stream("POST", "/chat/completions", json=payload) as response:
+                        self._scheduler.observe(response)
+                        if self._scheduler.should_retry(response, attempt):
+                            delay = self._scheduler.retry_delay(response, attempt)
+                            logger.warning("Upstream returned %d; retrying in %.2fs", response.status_code, delay)
+                        else:
+                            response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:") :].strip()
+                                if data == "[DONE]":
+                                    break
+                                chunk = json.loads(data)
+                                self._record_usage(chunk.get("usage"))
+                                choices = chunk.get("choices") or []
+                                token = choices[0].get("delta", {}).get("content") if choices else None
+                                if token:
+                                    yield token
+                            return
+                finally:
+                    self._requests_in_flight -= 1
+            self._scheduler.record_retry()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def embed(
+        self, texts: list[str], priority: int = PRIORITY_INTERACTIVE, documents: bool = False
+    ) -> list[list[float]]:
+        """Embed ``texts``; ingestion passes ``PRIORITY_BACKGROUND`` so chat requests go first.
+
+        ``documents`` marks chunks being indexed; only those update the local
+        embedder's IDF statistics, so query embeddings never change them.
+        """
+        if self._local_embedder is not None:
+            # CPU-bound; keep large ingestion batches off the event loop.
+            return await asyncio.to_thread(self._local_embedder.embed, texts, documents)
+        if self._cache is None:
+            return await self._embed_uncached(texts, priority)
+
+        vectors = await self._cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            fresh = dict(zip(missing, await self._embed_uncached(missing, priority)))
+            await self._cache.set_many(list(fresh), list(fresh.values()))
+            vectors = [vector if vector is not None else fresh[text] for text, vector in zip(texts, vectors)]
+        return vectors
+
+    async def _embed_uncached(self, texts: list[str], priority: int = PRIORITY_INTERACTIVE) -> list[list[float]]:
+        # Background batches are already large; only interactive calls are micro-batched.
+        if self._batcher is not None and priority == PRIORITY_INTERACTIVE:
+            return await self._batcher.embed(texts)
+        return await self._embed_upstream(texts, priority)
+
+    async def _embed_upstream(self, texts: list[str], priority: int = PRIORITY_INTERACTIVE) -> list[list[float]]:
+        payload: dict[str, Any] = {
             "model": self.settings.embedding_model,
             "input": texts,
         }
+        if self.settings.embedding_request_dimensions:
+            payload["dimensions"] = self.settings.embedding_dimensions
 
-        response = await self._http_client.post("/embeddings", json=payload)
+        response = await self._post("/embeddings", payload, priority, self._estimate_tokens(texts))
         response.raise_for_status()
         data = response.json()
         return [item["embedding"] for item in data["data"]]
 
+    def _embedding_cache_key(self) -> str:
+        # Shortened embeddings differ from full-size ones, so they are cached separately.
+        if self.settings.embedding_request_dimensions:
+            return f"{self.settings.embedding_model}:{self.settings.embedding_dimensions}"
+        return self.settings.embedding_model
+
     async def aclose(self) -> None:
         await self._http_client.aclose()
 
-    @staticmethod
-    def _fallback_embedding(text: str) -> list[float]:
-        # Simple hashing-based embedding for offline mode
-        seed = sum(ord(ch) for ch in text)
-        return [(seed % (i + 13)) / 13.0 for i in range(1536)]
+    @property
+    def is_closed(self) -> bool:
+        return self._http_client.is_closed
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "pool": self.pool_stats(),
+            "scheduler": self._scheduler.stats(),
+            "embedding_batcher": self._batcher.stats() if self._batcher else None,
+            "embedding_cache": self._cache.stats() if self._cache else None,
+            "single_flight": self._single_flight.stats() if self._single_flight else None,
+            "hedging": {
+                "enabled": self.settings.openai_hedging_enabled,
+                "hedged": self._hedges,
+                "fallback_wins": self._hedge_wins,
+            },
+            "usage": self.usage_stats(),
+            "models": {
+                model: {"circuit": self._breaker(model).stats(), "latency": self._latency(model).stats()}
+                for model in dict.fromkeys((self.settings.openai_model, self.settings.openai_fallback_model))
+            },
+        }
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Snapshot of the shared connection pool for monitoring."""
+        # httpx does not expose its pool publicly; read the httpcore pool defensively.
+        pool = getattr(getattr(self._http_client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "max_connections": self._limits.max_connections,
+            "max_keepalive_connections": self._limits.max_keepalive_connections,
+            "keepalive_expiry": self._limits.keepalive_expiry,
+            "http2": self.settings.openai_http2,
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "requests_in_flight": self._requests_in_flight,
+            "requests_total": self._requests_total,
+            "closed": self.is_closed,
+        }
+
+
+_client: OpenAIClient | None = None
 
 
 async def get_openai_client() -> OpenAIClient:
-    return OpenAIClient()
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = OpenAIClient()
+    return _client
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -2,27 +2,158 @@ from __future__ import annotations
 
 from typing import Iterable
 
+from app.core.config import get_settings
 from app.models import Assistant, Message
+from app.schemas import PromptTokenBreakdown
+from app.services.tokenizer import Tokenizer, get_tokenizer
+
+# Chunks trimmed below this many tokens are dropped rather than sent as fragments.
+MIN_CHUNK_TOKENS = 32
+
+# System message used when the assistant has no system prompt of its own.
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
 
 
 class PromptBuilder:
-    def __init__(self, assistant: Assistant, history: Iterable[Message], context_chunks: list[str]) -> None:
+    def __init__(
+        self,
+        assistant: Assistant,
+        history: Iterable[Message],
+        context_chunks: list[str],
+        history_limit: int = 10,
+        token_budget: int | None = None,
+        tokenizer: Tokenizer | None = None,
+        summary: str | None = None,
+    ) -> None:
+        settings = get_settings()
         self.assistant = assistant
         self.history = list(history)
         self.context_chunks = context_chunks
+        self.summary = summary
+        self.history_limit = history_limit
+        self.token_budget = token_budget or settings.prompt_token_budget
+        self.system_share = settings.prompt_budget_system_share
+        self.knowledge_share = settings.prompt_budget_knowledge_share
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.token_breakdown: PromptTokenBreakdown | None = None
 
-    def build(self, user_message: str) -> str:
-        segments: list[str] = []
+    def build_messages(self, user_message: str) -> list[dict[str, str]]:
+        """Assemble a chat ``messages`` array within ``token_budget``.
+
+        Order: the assistant's system prompt, the running summary of older
+        turns, the history as real ``user``/``assistant`` turns, then the
+        retrieved knowledge in a system message right before the new question.
+        Only the system prompt is a guaranteed stable prefix for the provider's
+        prompt cache: the summary changes on each compaction, and once the
+        history window is full every turn shifts it by dropping the oldest
+        messages. Until then the history only grows, so more of it is reused.
+
+        The user message is always kept. The remaining budget is split between
+        system prompt, knowledge and history; whatever a section leaves unused
+        rolls over to the next one. Context chunks are assumed ranked best-first,
+        so the lowest-ranked are trimmed or dropped first. The summary of older
+        turns is paid for out of the history share before the newest turns.
+        """
+        system, summary, knowledge, history, user = self._assemble(user_message)
+        messages = [{"role": "system", "content": system or DEFAULT_SYSTEM_PROMPT}]
+        if summary:
+            messages.append({"role": "system", "content": f"{SUMMARY_HEADER}\n{summary}"})
+        messages.extend({"role": message.role, "content": message.content} for message in history)
+        if knowledge:
+            messages.append({"role": "system", "content": "\n\n".join(["Relevant Knowledge Snippets:", *knowledge])})
+        messages.append({"role": "user", "content": user})
+        return messages
+
+    def _assemble(self, user_message: str) -> tuple[str, str, list[str], list[Message], str]:
+        """Fit each section into the budget and record ``token_breakdown``.
+
+        Each section is costed as a labelled text segment plus a separator,
+        which roughly matches the per-message framing of the chat format.
+        """
+        user_segment = self.tokenizer.truncate(f"User: {user_message}", self.token_budget)
+        user = user_segment.removeprefix("User: ")
+        closing_segment = "Assistant:"
+        user_tokens = self._cost(user_segment) + self._cost(closing_segment)
+        remaining = max(self.token_budget - user_tokens, 0)
+
+        system = ""
+        system_tokens = 0
+        system_allowance = int(remaining * self.system_share)
         if self.assistant.system_prompt:
-            segments.append(f"System Instructions:\n{self.assistant.system_prompt}\n")
-        if self.context_chunks:
-            segments.append("Relevant Knowledge Snippets:")
-            for idx, chunk in enumerate(self.context_chunks, start=1):
-                segments.append(f"[{idx}] {chunk}")
-        if self.history:
-            segments.append("Conversation History:")
-            for message in self.history[-10:]:
-                segments.append(f"{message.role.title()}: {message.content}")
-        segments.append(f"User: {user_message}")
-        segments.append("Assistant:")
-        return "\n\n".join(segments)
+            header = "System Instructions:\n"
+            system = self.tokenizer.truncate(self.assistant.system_prompt, system_allowance - self._cost(header))
+            if system:
+                system_tokens = self._cost(f"{header}{system}\n")
+
+        knowledge_allowance = int(remaining * self.knowledge_share) + (system_allowance - system_tokens)
+        knowledge, knowledge_tokens = self._fit_knowledge(knowledge_allowance)
+
+        history_allowance = remaining - system_tokens - knowledge_tokens
+        summary, summary_tokens = self._fit_summary(history_allowance)
+        history, history_tokens = self._fit_history(history_allowance - summary_tokens)
+
+        window = min(len(self.history), self.history_limit)
+        self.token_breakdown = PromptTokenBreakdown(
+            budget=self.token_budget,
+            system=system_tokens,
+            knowledge=knowledge_tokens,
+            history=history_tokens,
+            user=user_tokens,
+            summary=summary_tokens,
+            total=system_tokens + knowledge_tokens + summary_tokens + history_tokens + user_tokens,
+            context_chunks_used=len(knowledge),
+            context_chunks_dropped=len(self.context_chunks) - len(knowledge),
+            history_messages_used=len(history),
+            history_messages_dropped=window - len(history),
+            exact=self.tokenizer.exact,
+        )
+        return system, summary, knowledge, history, user
+
+    def _fit_knowledge(self, allowance: int) -> tuple[list[str], int]:
+        header = "Relevant Knowledge Snippets:"
+        if not self.context_chunks or allowance <= self._cost(header):
+            return [], 0
+        segments: list[str] = []
+        used = self._cost(header)
+        for idx, chunk in enumerate(self.context_chunks, start=1):
+            segment = f"[{idx}] {chunk}"
+            cost = self._cost(segment)
+            if used + cost > allowance:
+                trimmed = self.tokenizer.truncate(segment, allowance - used - 1)
+                if self.tokenizer.count(trimmed) >= MIN_CHUNK_TOKENS:
+                    segments.append(trimmed)
+                    used += self._cost(trimmed)
+                break
+            segments.append(segment)
+            used += cost
+        return (segments, used) if segments else ([], 0)
+
+    def _fit_summary(self, allowance: int) -> tuple[str, int]:
+        if not self.summary or allowance <= self._cost(SUMMARY_HEADER):
+            return "", 0
+        summary = self.tokenizer.truncate(self.summary, allowance - self._cost(SUMMARY_HEADER))
+        return (summary, self._cost(f"{SUMMARY_HEADER}\n{summary}")) if summary else ("", 0)
+
+    def _fit_history(self, allowance: int) -> tuple[list[Message], int]:
+        header = "Conversation History:"
+        window = self.history[-self.history_limit :] if self.history_limit > 0 else []
+        if not window or allowance <= self._cost(header):
+            return [], 0
+        used = self._cost(header)
+        kept: list[Message] = []
+        for message in reversed(window):
+            cost = self._cost(f"{message.role.title()}: {message.content}")
+            if used + cost > allowance:
+                break
+            kept.append(message)
+            used += cost
+        if not kept:
+            return [], 0
+        kept.reverse()
+        return kept, used
+
+    def _cost(self, segment: str) -> int:
+        # One extra token for the blank-line separator between segments.
+        return self.tokenizer.count(segment) + 1
@@ -1,53 +1,270 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import uuid
+from typing import TYPE_CHECKING
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.db import session as db_session
 from app.models import KnowledgeDocument
+from app.schemas import RetrievedChunk
+from app.services.chunking import TextChunker
+from app.services.lexical_index import LexicalIndex, LexicalPoint, get_lexical_index
 from app.services.openai_client import OpenAIClient
+from app.services.request_scheduler import PRIORITY_BACKGROUND
+from app.services.reranking import Reranker
 from app.services.vector_store import VectorStore
 
+if TYPE_CHECKING:
+    from app.services.ingestion import IngestionQueue
+
 logger = logging.getLogger(__name__)
 
 
+def content_hash(title: str, content: str) -> str:
+    """Hash of the text a document is indexed from (the title is part of every chunk payload)."""
+    return hashlib.sha256(f"{title}\x00{content}".encode("utf-8")).hexdigest()
+
+
 class RAGPipeline:
-    def __init__(self, vector_store: VectorStore, openai_client: OpenAIClient) -> None:
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        openai_client: OpenAIClient,
+        chunker: TextChunker | None = None,
+        ingestion_queue: IngestionQueue | None = None,
+        lexical_index: LexicalIndex | None = None,
+        reranker: Reranker | None = None,
+    ) -> None:
+        settings = get_settings()
         self.vector_store = vector_store
         self.openai_client = openai_client
+        self.ingestion_queue = ingestion_queue
+        self.lexical_index = lexical_index or get_lexical_index()
+        self.chunker = chunker or TextChunker(settings.chunk_size, settings.chunk_overlap)
+        self.embedding_batch_size = settings.embedding_batch_size
+        self.rrf_k = settings.hybrid_rrf_k
+        self.hybrid_candidates = settings.hybrid_candidates
+        if reranker is None and settings.retrieval_rerank_enabled:
+            reranker = Reranker.from_settings()
+        self.reranker = reranker
 
     async def ingest_document(
         self, session: AsyncSession, assistant_id: uuid.UUID, document: KnowledgeDocument
     ) -> KnowledgeDocument:
-        embeddings = await self.openai_client.embed([document.content])
-        vector_id = await self.vector_store.upsert_document(
+        """Index the document's current text, overwriting its previous chunks in place.
+
+        Point ids are derived from the chunk index, so re-ingesting upserts over
+        the old points; only the tail a shorter text no longer covers is deleted
+        afterwards. Until the new chunks are stored the old ones keep serving.
+        """
+        chunks = self.chunker.split(document.content)
+        embeddings = await self.embed_chunks(chunks)
+        await self.vector_store.upsert_chunks(
             assistant_id=assistant_id,
             document_id=document.id,
-            vector=embeddings[0],
-            payload={"title": document.title, "content": document.content[:1500]},
+            vectors=embeddings,
+            payloads=[{"title": document.title, "content": chunk} for chunk in chunks],
         )
-        document.vector_id = vector_id
+        self.lexical_index.add(assistant_id, self._lexical_points(document.id, document.title, chunks))
+        if (document.chunk_count or 0) > len(chunks):
+            await self.remove_chunks(assistant_id, document.id, len(chunks), document.chunk_count)
+        document.vector_id = str(document.id)
+        document.chunk_count = len(chunks)
+        document.content_hash = content_hash(document.title, document.content)
         await session.flush()
         return document
 
-    async def retrieve_context(self, assistant_id: uuid.UUID, query: str, limit: int = 5) -> list[str]:
+    async def ingest_documents(self, assistant_id: uuid.UUID, documents: list) -> dict[uuid.UUID, int]:
+        """Chunk, embed and upsert many documents together; returns chunk counts by document id.
+
+        ``documents`` only need ``id``, ``title`` and ``content``, so bulk imports
+        can pass plain rows. Chunks from every document share embedding batches
+        and Qdrant upsert requests instead of paying one round trip per document.
+        """
+        chunked = [(document, self.chunker.split(document.content)) for document in documents]
+        embeddings = await self.embed_chunks([chunk for _, chunks in chunked for chunk in chunks])
+        batch: list[tuple[uuid.UUID, list[list[float]], list[dict]]] = []
+        offset = 0
+        for document, chunks in chunked:
+            batch.append(
+                (
+                    document.id,
+                    embeddings[offset : offset + len(chunks)],
+                    [{"title": document.title, "content": chunk} for chunk in chunks],
+                )
+            )
+            offset += len(chunks)
+        await self.vector_store.upsert_documents(assistant_id, batch)
+        lexical_points = [
+            point for document, chunks in chunked for point in self._lexical_points(document.id, document.title, chunks)
+        ]
+        self.lexical_index.add(assistant_id, lexical_points)
+        return {document.id: len(chunks) for document, chunks in chunked}
+
+    async def remove_documents(self, assistant_id: uuid.UUID, document_ids: list[uuid.UUID]) -> None:
+        """Delete the documents' chunks from the vector store and the lexical index."""
+        await self.vector_store.delete_documents(assistant_id, document_ids)
+        self.lexical_index.remove_documents(assistant_id, document_ids)
+
+    async def remove_chunks(self, assistant_id: uuid.UUID, document_id: uuid.UUID, start: int, stop: int) -> None:
+        """Delete the document's chunks with index in ``[start, stop)``."""
+        point_ids = [VectorStore.chunk_point_id(document_id, index) for index in range(start, stop)]
+        await self.vector_store.delete_points(assistant_id, point_ids)
+        self.lexical_index.remove_points(assistant_id, point_ids)
+
+    async def remove_assistant(self, assistant_id: uuid.UUID) -> None:
+        await self.vector_store.delete_assistant(assistant_id)
+        self.lexical_index.drop(assistant_id)
+
+    async def embed_chunks(self, chunks: list[str]) -> list[list[float]]:
+        embeddings: list[list[float]] = []
+        for start in range(0, len(chunks), self.embedding_batch_size):
+            batch = chunks[start : start + self.embedding_batch_size]
+            embeddings.extend(await self.openai_client.embed(batch, priority=PRIORITY_BACKGROUND, documents=True))
+        return embeddings
+
+    async def retrieve_context(
+        self,
+        assistant_id: uuid.UUID,
+        query: str,
+        limit: int = 5,
+        hybrid: bool = False,
+        vector_weight: float = 1.0,
+        lexical_weight: float = 1.0,
+    ) -> list[str]:
+        chunks = await self.retrieve(assistant_id, query, limit, hybrid, vector_weight, lexical_weight)
+        return [chunk.content for chunk in chunks]
+
+    async def retrieve(
+        self,
+        assistant_id: uuid.UUID,
+        query: str,
+        limit: int = 5,
+        hybrid: bool = False,
+        vector_weight: float = 1.0,
+        lexical_weight: float = 1.0,
+    ) -> list[RetrievedChunk]:
+        """Return the best chunks for ``query``, best first.
+
+        With ``hybrid`` the vector search and the BM25 lexical search run
+        concurrently, each over at least ``hybrid_candidates`` results, and are
+        merged with weighted reciprocal rank fusion: ``sum(weight / (rrf_k + rank))``.
+        When a reranker is configured, ``limit * overfetch`` candidates are
+        gathered and it picks the final ``limit`` (or fewer). The per-source
+        ranks and scores are kept on each chunk for debugging.
+        """
+        fetch = limit * self.reranker.overfetch if self.reranker is not None else limit
+        with_vectors = self.reranker is not None
+        if not hybrid:
+            vector_results = await self._vector_search(assistant_id, query, fetch, with_vectors)
+            ranked = [
+                (self._to_chunk(result, score=result["score"], vector=(rank, result["score"])), result.get("vector"))
+                for rank, result in enumerate(vector_results, start=1)
+                if result.get("payload")
+            ]
+        else:
+            candidates = max(fetch, self.hybrid_candidates)
+            vector_results, lexical_results = await asyncio.gather(
+                self._vector_search(assistant_id, query, candidates, with_vectors),
+                self.lexical_index.search(
+                    assistant_id, query, candidates, loader=lambda: self._load_lexical_points(assistant_id)
+                ),
+            )
+            fused: dict[str, dict] = {}
+            for source, weight, results in (
+                ("vector", vector_weight, vector_results),
+                ("lexical", lexical_weight, lexical_results),
+            ):
+                for rank, result in enumerate(results, start=1):
+                    if not result.get("payload"):
+                        continue
+                    entry = fused.setdefault(str(result["id"]), {"result": result, "score": 0.0})
+                    entry["score"] += weight / (self.rrf_k + rank)
+                    entry[source] = (rank, result["score"])
+            ranked = [
+                (
+                    self._to_chunk(entry["result"], entry["score"], entry.get("vector"), entry.get("lexical")),
+                    entry["result"].get("vector"),
+                )
+                for entry in sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:fetch]
+            ]
+
+        if self.reranker is None:
+            return [chunk for chunk, _ in ranked[:limit]]
+        return self.reranker.rerank(query, [chunk for chunk, _ in ranked], [vector for _, vector in ranked], limit)
+
+    async def _vector_search(
+        self, assistant_id: uuid.UUID, query: str, limit: int, with_vectors: bool = False
+    ) -> list[dict]:
         query_embedding = (await self.openai_client.embed([query]))[0]
-        results = await self.vector_store.search(assistant_id, query_embedding, limit=limit)
+        return await self.vector_store.search(assistant_id, query_embedding, limit=limit, with_vectors=with_vectors)
+
+    @staticmethod
+    def _to_chunk(
+        result: dict,
+        score: float,
+        vector: tuple[int, float] | None = None,
+        lexical: tuple[int, float] | None = None,
+    ) -> RetrievedChunk:
+        payload = result["payload"]
+        return RetrievedChunk(
+            id=str(result["id"]),
+            document_id=payload.get("document_id"),
+            title=payload.get("title"),
+            content=payload.get("content", ""),
+            score=score,
+            vector_rank=vector[0] if vector else None,
+            vector_score=vector[1] if vector else None,
+            lexical_rank=lexical[0] if lexical else None,
+            lexical_score=lexical[1] if lexical else None,
+        )
+
+    async def _load_lexical_points(self, assistant_id: uuid.UUID) -> list[LexicalPoint]:
+        stmt = select(KnowledgeDocument.id, KnowledgeDocument.title, KnowledgeDocument.content).where(
+            KnowledgeDocument.assistant_id == assistant_id,
+            KnowledgeDocument.status == KnowledgeDocument.STATUS_READY,
+        )
+        async with db_session.SessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+
+        def chunk_rows() -> list[LexicalPoint]:
+            return [
+                point
+                for row in rows
+                for point in self._lexical_points(row.id, row.title, self.chunker.split(row.content))
+            ]
+
+        return await asyncio.to_thread(chunk_rows)
+
+    @staticmethod
+    def _lexical_points(document_id: uuid.UUID, title: str, chunks: list[str]) -> list[LexicalPoint]:
+        # Same ids and payload fields as the vector store points, so results fuse by id.
         return [
-            result["payload"].get("content", "")
-            for result in results
-            if result.get("payload")
+            (
+                VectorStore.chunk_point_id(document_id, index),
+                f"{title}\n{chunk}",
+                {"document_id": str(document_id), "chunk_index": index, "title": title, "content": chunk},
+            )
+            for index, chunk in enumerate(chunks)
         ]
 
     async def bootstrap_assistant(self, session: AsyncSession, assistant_id: uuid.UUID) -> None:
-        stmt = select(KnowledgeDocument).where(KnowledgeDocument.assistant_id == assistant_id)
-        docs = (await session.execute(stmt)).scalars().all()
+        stmt = select(KnowledgeDocument).where(
+            KnowledgeDocument.assistant_id == assistant_id, KnowledgeDocument.vector_id.is_(None)
+        )
+        docs = list((await session.execute(stmt)).scalars().all())
+        if self.ingestion_queue is not None:
+            await self.ingestion_queue.submit(session, docs)
+            return
         for doc in docs:
-            if doc.vector_id:
-                continue
             try:
                 await self.ingest_document(session, assistant_id, doc)
+                doc.status = KnowledgeDocument.STATUS_READY
             except Exception:  # pragma: no cover - log and continue
                 logger.exception("Failed to ingest document %s", doc.id)
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import heapq
+import itertools
+import logging
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Lower values are dispatched first.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Parse an ``x-ratelimit-reset-*`` duration such as ``"20ms"``, ``"1s"`` or ``"6m0s"``."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers: httpx.Headers) -> float | None:
+    """Seconds to wait according to ``retry-after-ms`` or ``Retry-After`` (seconds or HTTP date)."""
+    if (value := headers.get("retry-after-ms")) is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Budget:
+    """Remaining requests or tokens in the provider's current rate-limit window."""
+
+    __slots__ = ("remaining", "resets_at")
+
+    def __init__(self) -> None:
+        self.remaining: int | None = None
+        self.resets_at = 0.0
+
+    def update(self, remaining: str | None, reset: str | None, now: float) -> None:
+        if remaining is None:
+            return
+        try:
+            self.remaining = int(remaining)
+        except ValueError:
+            return
+        self.resets_at = now + (parse_reset(reset) or 0.0)
+
+    def wait_for(self, cost: int, now: float) -> float:
+        """Seconds until ``cost`` fits in the window; 0 when unknown or already reset."""
+        if self.remaining is None or now >= self.resets_at:
+            return 0.0
+        return self.resets_at - now if self.remaining < cost else 0.0
+
+    def spend(self, cost: int, now: float) -> None:
+        if self.remaining is not None and now < self.resets_at:
+            self.remaining -= cost
+
+
+class RequestScheduler:
+    """Client-side admission control for upstream model requests.
+
+    Requests wait in a priority queue (interactive before background, FIFO
+    within a priority) and are dispatched while three conditions hold:
+
+    - fewer than ``concurrency_limit`` requests are running. The limit is
+      adaptive: it halves on every 429 and grows back by ``1 / limit`` per
+      successful response, between ``min_concurrency`` and ``max_concurrency``;
+    - the request and token budgets last reported in the ``x-ratelimit-*``
+      response headers are not exhausted (each dispatch is charged against
+      them until the next response refreshes them);
+    - no ``Retry-After`` pause is in effect.
+
+    ``send`` retries 429, 5xx and transport errors up to ``max_retries`` times,
+    sleeping for ``Retry-After`` when given and otherwise for an exponential
+    backoff with full jitter.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limit = float(max_concurrency)
+        self._active = 0
+        self._queue: list[tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._requests_budget = _Budget()
+        self._tokens_budget = _Budget()
+        self._paused_until = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+        self._dispatched = 0
+        self._throttled = 0
+        self._retries = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(self.min_concurrency, int(self._limit))
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold one dispatch slot for the duration of the block."""
+        await self._acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._pump()
+
+    async def send(
+        self,
+        request_fn: Callable[[], Awaitable[httpx.Response]],
+        priority: int = PRIORITY_INTERACTIVE,
+        tokens: int = 0,
+    ) -> httpx.Response:
+        """Run ``request_fn`` in a slot, retrying rate-limited and failed attempts."""
+        attempt = 0
+        while True:
+            async with self.slot(priority, tokens):
+                try:
+                    response = await request_fn()
+                except httpx.TransportError as exc:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self.backoff(attempt)
+                    logger.warning("Upstream request failed (%s); retrying in %.2fs", exc, delay)
+                else:
+                    self.observe(response)
+                    if not self.should_retry(response, attempt):
+                        return response
+                    delay = self.retry_delay(response, attempt)
+                    logger.warning("Upstream returned %d; retrying in %.2fs", response.status_code, delay)
+                    await response.aclose()
+            self.record_retry()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def observe(self, response: httpx.Response) -> None:
+        """Update budgets and the concurrency limit from a response."""
+        now = time.monotonic()
+        headers = response.headers
+        self._requests_budget.update(
+            headers.get("x-ratelimit-remaining-requests"), headers.get("x-ratelimit-reset-requests"), now
+        )
+        self._tokens_budget.update(
+            headers.get("x-ratelimit-remaining-tokens"), headers.get("x-ratelimit-reset-tokens"), now
+        )
+        if response.status_code == 429:
+            self._throttled += 1
+            previous = self.concurrency_limit
+            self._limit = max(float(self.min_concurrency), self._limit / 2)
+            if self.concurrency_limit != previous:
+                logger.info("Rate limited upstream; concurrency limit %d -> %d", previous, self.concurrency_limit)
+            retry_after = parse_retry_after(headers)
+            if retry_after:
+                # Hold every queued request, not just the one that was throttled.
+                self._paused_until = max(self._paused_until, now + min(retry_after, self.backoff_max))
+        elif response.status_code < 400:
+            self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+        self._pump()
+
+    def should_retry(self, response: httpx.Response, attempt: int) -> bool:
+        return response.status_code in RETRYABLE_STATUS and attempt < self.max_retries
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = parse_retry_after(response.headers)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return self.backoff(attempt)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def record_retry(self) -> None:
+        self._retries += 1
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        queued = [entry for entry in self._queue if not entry[3].done()]
+        return {
+            "concurrency_limit": self.concurrency_limit,
+            "active": self._active,
+            "queue_depth": len(queued),
+            "queued_interactive": sum(1 for entry in queued if entry[0] == PRIORITY_INTERACTIVE),
+            "queued_background": sum(1 for entry in queued if entry[0] != PRIORITY_INTERACTIVE),
+            "dispatched": self._dispatched,
+            "throttled": self._throttled,
+            "retries": self._retries,
+            "mean_wait_ms": 1000 * self._wait_total / self._dispatched if self._dispatched else 0.0,
+            "max_wait_ms": 1000 * self._wait_max,
+            "remaining_requests": self._requests_budget.remaining if now < self._requests_budget.resets_at else None,
+            "remaining_tokens": self._tokens_budget.remaining if now < self._tokens_budget.resets_at else None,
+            "paused_seconds": round(max(0.0, self._paused_until - now), 3),
+        }
+
+    async def _acquire(self, priority: int, tokens: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = time.perf_counter()
+        heapq.heappush(self._queue, (priority, next(self._sequence), tokens, future))
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted and cancelled in the same step: hand the slot back.
+                self._active -= 1
+                self._pump()
+            raise
+        waited = time.perf_counter() - enqueued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def _pump(self) -> None:
+        """Grant slots to queued requests, highest priority first, while limits allow."""
+        while self._queue and self._active < self.concurrency_limit:
+            _, _, tokens, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            now = time.monotonic()
+            wait = max(
+                self._paused_until - now,
+                self._requests_budget.wait_for(1, now),
+                self._tokens_budget.wait_for(tokens, now),
+            )
+            if wait > 0:
+                self._schedule_pump(wait)
+                return
+            heapq.heappop(self._queue)
+            self._requests_budget.spend(1, now)
+            self._tokens_budget.spend(tokens, now)
+            self._active += 1
+            self._dispatched += 1
+            future.set_result(None)
+
+    def _schedule_pump(self, delay: float) -> None:
+        if self._timer is not None:
+            return
+
+        def fire() -> None:
+            self._timer = None
+            self._pump()
+
+        self._timer = asyncio.get_running_loop().call_later(delay, fire)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.schemas import RetrievedChunk
+from app.services.lexical_index import tokenize
+
+
+def lexical_overlap(query: str, text: str) -> float:
+    """Share of distinct query terms that appear in ``text``."""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return 0.0
+    return len(query_terms & set(tokenize(text))) / len(query_terms)
+
+
+def maximal_marginal_relevance(
+    relevance: np.ndarray, vectors: np.ndarray, limit: int, mmr_lambda: float
+) -> list[int]:
+    """Greedy MMR: pick ``argmax(lambda * relevance - (1 - lambda) * max_sim_to_selected)``.
+
+    ``vectors`` must be unit-normalized rows; all-zero rows (no vector known)
+    count as similar to nothing.
+    """
+    similarity = vectors @ vectors.T
+    selected: list[int] = []
+    redundancy = np.zeros(len(relevance))
+    available = np.ones(len(relevance), dtype=bool)
+    for _ in range(min(limit, len(relevance))):
+        marginal = np.where(available, mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, -np.inf)
+        best = int(np.argmax(marginal))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+
+class Reranker:
+    """Post-retrieval stage: score floor, optional lexical re-scoring, then MMR.
+
+    ``min_score`` is an optional cosine-similarity floor applied to candidates
+    that came from the vector search (None keeps every candidate, including
+    negative similarities); lexical-only hybrid hits matched query terms and
+    are kept. Relevance is the retrieval score scaled to [0, 1] by the best
+    candidate, blended with query-term overlap when ``lexical_weight`` > 0.
+    """
+
+    def __init__(
+        self,
+        mmr_lambda: float = 0.7,
+        lexical_weight: float = 0.0,
+        min_score: float | None = None,
+        overfetch: int = 4,
+    ) -> None:
+        self.mmr_lambda = mmr_lambda
+        self.lexical_weight = lexical_weight
+        self.min_score = min_score
+        self.overfetch = overfetch
+
+    @classmethod
+    def from_settings(cls) -> Reranker:
+        settings = get_settings()
+        return cls(
+            mmr_lambda=settings.retrieval_mmr_lambda,
+            lexical_weight=settings.retrieval_lexical_rescore_weight,
+            min_score=settings.retrieval_min_score,
+            overfetch=settings.retrieval_overfetch,
+        )
+
+    def rerank(
+        self,
+        query: str,
+        candidates: list[RetrievedChunk],
+        vectors: list[list[float] | None],
+        limit: int,
+    ) -> list[RetrievedChunk]:
+        kept = [
+            index
+            for index, chunk in enumerate(candidates)
+            if self.min_score is None or chunk.vector_score is None or chunk.vector_score >= self.min_score
+        ]
+        if not kept:
+            return []
+        candidates = [candidates[index] for index in kept]
+
+        scores = np.array([chunk.score for chunk in candidates], dtype=np.float64)
+        top = scores.max()
+        relevance = scores / top if top > 0 else np.zeros_like(scores)
+        if self.lexical_weight > 0:
+            overlap = np.array([lexical_overlap(query, chunk.content) for chunk in candidates])
+            relevance = (1 - self.lexical_weight) * relevance + self.lexical_weight * overlap
+
+        dimensions = next((len(vectors[index]) for index in kept if vectors[index] is not None), 0)
+        matrix = np.zeros((len(candidates), dimensions), dtype=np.float32)
+        for row, index in enumerate(kept):
+            if vectors[index] is not None:
+                matrix[row] = vectors[index]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+        order = maximal_marginal_relevance(relevance, matrix, limit, self.mmr_lambda)
+        return [
+            candidates[index].model_copy(update={"rerank_score": float(relevance[index])}) for index in order
+        ]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models import Assistant
+
+
+def response_fingerprint(assistant: Assistant) -> str:
+    """Hash of everything besides the question that shapes an answer."""
+    settings = get_settings()
+    parts = [settings.openai_model, assistant.system_prompt or "", str(assistant.knowledge_version)]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+async def bump_knowledge_version(db: AsyncSession, assistant_id: uuid.UUID) -> None:
+    """Mark the assistant's knowledge as changed; cached answers stop matching.
+
+    The bump is part of the caller's transaction, so other processes see the
+    new fingerprint once it commits; this process also drops its entries now.
+    """
+    await db.execute(
+        update(Assistant)
+        .where(Assistant.id == assistant_id)
+        .values(knowledge_version=Assistant.knowledge_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    get_response_cache().invalidate(assistant_id)
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    vector: np.ndarray
+    response: str
+    created_at: float
+
+
+class SemanticResponseCache:
+    """In-process cache of chat answers, matched by question embedding similarity.
+
+    A lookup hits when an unexpired entry of the same assistant and fingerprint
+    has cosine similarity >= ``threshold`` with the new question. Entries are
+    evicted least-recently-used beyond ``max_entries`` and expire after
+    ``ttl_seconds``.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600.0, max_entries: int = 5000) -> None:
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Global recency order for LRU eviction, plus a per-assistant view for lookups.
+        self._lru: OrderedDict[int, uuid.UUID] = OrderedDict()
+        self._by_assistant: dict[uuid.UUID, dict[int, _Entry]] = {}
+        self._next_key = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, assistant_id: uuid.UUID, fingerprint: str, vector: list[float]) -> str | None:
+        entries = self._by_assistant.get(assistant_id, {})
+        now = time.monotonic()
+        for key in [key for key, entry in entries.items() if now - entry.created_at > self.ttl_seconds]:
+            self._remove(key)
+            self._evictions += 1
+        matching = [(key, entry) for key, entry in entries.items() if entry.fingerprint == fingerprint]
+        if matching:
+            scores = np.vstack([entry.vector for _, entry in matching]) @ _unit(vector)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                key, entry = matching[best]
+                self._lru.move_to_end(key)
+                self._hits += 1
+                return entry.response
+        self._misses += 1
+        return None
+
+    def set(self, assistant_id: uuid.UUID, fingerprint: str, vector: list[float], response: str) -> None:
+        key = self._next_key
+        self._next_key += 1
+        entry = _Entry(fingerprint, _unit(vector), response, time.monotonic())
+        self._by_assistant.setdefault(assistant_id, {})[key] = entry
+        self._lru[key] = assistant_id
+        while len(self._lru) > self.max_entries:
+            self._remove(next(iter(self._lru)))
+            self._evictions += 1
+
+    def invalidate(self, assistant_id: uuid.UUID) -> None:
+        for key in self._by_assistant.pop(assistant_id, {}):
+            del self._lru[key]
+
+    def _remove(self, key: int) -> None:
+        assistant_id = self._lru.pop(key)
+        entries = self._by_assistant[assistant_id]
+        del entries[key]
+        if not entries:
+            del self._by_assistant[assistant_id]
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._lru),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+        }
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+_cache: SemanticResponseCache | None = None
+
+
+def get_response_cache() -> SemanticResponseCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = SemanticResponseCache(
+            threshold=settings.response_cache_similarity,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            max_entries=settings.response_cache_max_entries,
+        )
+    return _cache
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def payload_key(payload: dict[str, Any]) -> str:
+    """Stable hash of a JSON request payload."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one underlying call.
+
+    The first caller starts the call as a task; callers arriving while it is
+    in flight await the same task and get the same result or exception. A
+    caller that is cancelled only stops waiting. The shared call is cancelled
+    once no caller is waiting for it any more.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self._calls = 0
+        self._executions = 0
+        self._deduplicated = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self._calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self._executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._deduplicated += 1
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(task) == 1:
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self._calls,
+            "upstream_calls": self._executions,
+            "deduplicated": self._deduplicated,
+            "in_flight": len(self._in_flight),
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._waiters.pop(task, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away.
+            task.exception()
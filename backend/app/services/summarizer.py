@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import and_, func, or_, select, update
+
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.models import ConversationSession, Message
+from app.services.openai_client import OpenAIClient, get_openai_client
+from app.services.request_scheduler import PRIORITY_BACKGROUND
+from app.services.tokenizer import get_tokenizer
+
+logger = logging.getLogger(__name__)
+
+ClientFactory = Callable[[], Awaitable[OpenAIClient]]
+
+# Very long single messages are cut before summarizing so one batch stays within the model's context.
+MAX_MESSAGE_TOKENS = 1000
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the existing summary with the new messages. Keep facts, names, numbers, user preferences, "
+    "decisions and open questions; drop greetings and small talk. Write plain prose in the conversation's "
+    "language, at most {max_tokens} tokens. Reply with the updated summary only."
+)
+
+
+def unsummarized_filter(session: ConversationSession) -> list[Any]:
+    """Conditions selecting the session's messages that are not yet part of its summary.
+
+    The boundary is a ``(created_at, id)`` pair, so messages sharing the last
+    folded message's timestamp are neither skipped nor folded twice.
+    """
+    conditions = [Message.session_id == session.id]
+    if session.summarized_until is not None:
+        conditions.append(
+            or_(
+                Message.created_at > session.summarized_until,
+                and_(Message.created_at == session.summarized_until, Message.id > session.summarized_until_id),
+            )
+        )
+    return conditions
+
+
+class ConversationSummarizer:
+    """Background compaction of long conversations into a running summary.
+
+    Once a session has more than ``history_window + trigger`` messages that are
+    not yet summarized, everything but the newest ``history_window`` is folded
+    into ``ConversationSession.summary`` in batches of ``batch_size`` messages.
+    Each batch extends the previous summary (it is never rebuilt from the full
+    transcript), so the cost per compaction stays constant however long the
+    session grows. The prompt then carries the summary plus the recent turns.
+
+    No database transaction is held across the model call: the batch is read
+    in one short session and the result written in another. The write is
+    conditional on ``summarized_messages`` being unchanged, so concurrent
+    workers (or processes) never fold the same messages twice.
+    """
+
+    def __init__(
+        self,
+        history_window: int = 10,
+        trigger: int = 20,
+        batch_size: int = 50,
+        max_tokens: int = 400,
+        client_factory: ClientFactory = get_openai_client,
+    ) -> None:
+        self.history_window = history_window
+        self.trigger = trigger
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.client_factory = client_factory
+        self._queue: asyncio.Queue[uuid.UUID] | None = None
+        self._pending: set[uuid.UUID] = set()
+        self._active: set[uuid.UUID] = set()
+        self._worker_task: asyncio.Task | None = None
+        self._summarized_messages = 0
+        self._batches = 0
+        self._conflicts = 0
+        self._failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker_task is not None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_task = asyncio.create_task(self._worker(), name="conversation-summarizer")
+
+    async def stop(self) -> None:
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            await asyncio.gather(self._worker_task, return_exceptions=True)
+        self._worker_task = None
+        self._queue = None
+        self._pending.clear()
+
+    def schedule(self, session_id: uuid.UUID) -> None:
+        """Ask for ``session_id`` to be checked; a session already queued is not queued twice."""
+        if self._queue is None or session_id in self._pending:
+            return
+        self._pending.add(session_id)
+        self._queue.put_nowait(session_id)
+
+    def is_pending(self, session_id: uuid.UUID) -> bool:
+        """Whether a compaction of the session is queued or running."""
+        return session_id in self._pending or session_id in self._active
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self._batches,
+            "summarized_messages": self._summarized_messages,
+            "conflicts": self._conflicts,
+            "failed": self._failed,
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            session_id = await queue.get()
+            self._pending.discard(session_id)
+            try:
+                await self.compact(session_id)
+            except Exception:
+                self._failed += 1
+                logger.exception("Summarizing conversation %s failed", session_id)
+            finally:
+                queue.task_done()
+
+    async def compact(self, session_id: uuid.UUID) -> int:
+        """Fold the session's overflow into its summary; returns the number of messages folded."""
+        self._active.add(session_id)
+        try:
+            return await self._compact(session_id)
+        finally:
+            self._active.discard(session_id)
+
+    async def _compact(self, session_id: uuid.UUID) -> int:
+        folded = 0
+        while True:
+            async with db_session.SessionLocal() as db:
+                session = await db.get(ConversationSession, session_id)
+                if session is None:
+                    return folded
+                count_stmt = select(func.count(Message.id)).where(*unsummarized_filter(session))
+                overflow = (await db.execute(count_stmt)).scalar_one() - self.history_window
+                if overflow <= 0 or (folded == 0 and overflow <= self.trigger):
+                    return folded
+                batch_stmt = (
+                    select(Message)
+                    .where(*unsummarized_filter(session))
+                    .order_by(Message.created_at, Message.id)
+                    .limit(min(overflow, self.batch_size))
+                )
+                batch = list((await db.execute(batch_stmt)).scalars().all())
+            # The read session is closed here, so no connection idles in a transaction during the model call.
+            summary = await self._summarize(session.summary, batch)
+            async with db_session.SessionLocal() as db:
+                result = await db.execute(
+                    update(ConversationSession)
+                    .where(
+                        ConversationSession.id == session_id,
+                        ConversationSession.summarized_messages == session.summarized_messages,
+                    )
+                    .values(
+                        summary=summary,
+                        summarized_until=batch[-1].created_at,
+                        summarized_until_id=batch[-1].id,
+                        summarized_messages=session.summarized_messages + len(batch),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            if result.rowcount == 0:
+                # Another worker compacted this session in the meantime; its summary wins.
+                self._conflicts += 1
+                return folded
+            folded += len(batch)
+            self._batches += 1
+            self._summarized_messages += len(batch)
+
+    async def _summarize(self, summary: str | None, messages: list[Message]) -> str:
+        tokenizer = get_tokenizer()
+        transcript = "\n\n".join(
+            f"{message.role.title()}: {tokenizer.truncate(message.content, MAX_MESSAGE_TOKENS)}"
+            for message in messages
+        )
+        prompt = [
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS.format(max_tokens=self.max_tokens)},
+            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"},
+        ]
+        client = await self.client_factory()
+        updated = await client.complete(prompt, priority=PRIORITY_BACKGROUND, max_tokens=self.max_tokens)
+        return tokenizer.truncate(updated.strip(), self.max_tokens)
+
+
+_summarizer: ConversationSummarizer | None = None
+
+
+def get_conversation_summarizer() -> ConversationSummarizer:
+    global _summarizer
+    if _summarizer is None:
+        settings = get_settings()
+        _summarizer = ConversationSummarizer(
+            history_window=settings.history_window,
+            trigger=settings.conversation_summary_trigger,
+            batch_size=settings.conversation_summary_batch_size,
+            max_tokens=settings.conversation_summary_max_tokens,
+        )
+    return _summarizer
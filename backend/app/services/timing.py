@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class StageMetrics:
+    """Process-wide aggregate of stage durations for the metrics endpoint."""
+
+    def __init__(self) -> None:
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        stats = self._stats.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {
+            stage: {
+                "count": int(stats["count"]),
+                "mean_ms": 1000 * stats["total"] / stats["count"],
+                "max_ms": 1000 * stats["max"],
+            }
+            for stage, stats in self._stats.items()
+        }
+
+
+chat_stage_metrics = StageMetrics()
+
+
+class StageTimings:
+    """Wall-clock timings for the stages of a single request."""
+
+    def __init__(self, metrics: StageMetrics | None = chat_stage_metrics) -> None:
+        self.metrics = metrics
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - started)
+
+    async def run(self, name: str, awaitable: Awaitable[T], timeout: float | None = None) -> T:
+        """Await ``awaitable`` as stage ``name``; raises ``asyncio.TimeoutError`` past ``timeout``."""
+        with self.stage(name):
+            return await asyncio.wait_for(awaitable, timeout)
+
+    def as_ms(self) -> dict[str, float]:
+        return {name: round(1000 * seconds, 3) for name, seconds in self.durations.items()}
+
+    def _record(self, name: str, seconds: float) -> None:
+        self.durations[name] = seconds
+        if self.metrics is not None:
+            self.metrics.record(name, seconds)
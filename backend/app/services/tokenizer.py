@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+import math
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Mirrors the shape of the cl100k pre-tokenizer closely enough for budgeting:
+# words, numbers, single punctuation marks and runs of whitespace.
+_PIECE = re.compile(r"\s*[A-Za-z]+|\s*\d{1,3}|\s*[^\sA-Za-z\d]|\s+")
+_CHARS_PER_TOKEN = 5
+
+
+class Tokenizer:
+    """Count and truncate text in model tokens without network access.
+
+    Counts are exact with ``tiktoken`` (listed in requirements) once its
+    encoding data is downloaded or cached. Without it, counting falls back to
+    an offline estimate that splits on word/punctuation boundaries and charges
+    long words one token per five characters, so exact counting is optional.
+
+    Special-token markers such as ``<|endoftext|>`` in user text or documents
+    are encoded as plain text rather than rejected.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base") -> None:
+        self._encoding = None
+        try:
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as exc:  # ImportError, or encoding data not cached offline
+            logger.info("tiktoken unavailable (%s); using heuristic token counts", exc)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return sum(self._piece_cost(match.group()) for match in _PIECE.finditer(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self._encoding.decode(tokens[:max_tokens])
+        used = 0
+        for match in _PIECE.finditer(text):
+            cost = self._piece_cost(match.group())
+            if used + cost > max_tokens:
+                return text[: match.start()]
+            used += cost
+        return text
+
+    @staticmethod
+    def _piece_cost(piece: str) -> int:
+        stripped = piece.strip()
+        if not stripped:
+            return 1
+        return max(1, math.ceil(len(stripped) / _CHARS_PER_TOKEN))
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Tokenizer:
+    return Tokenizer()
@@ -1,62 +1,360 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
+from abc import ABC, abstractmethod
 
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models as qdrant_models
+from qdrant_client.http.exceptions import UnexpectedResponse
 
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
-class VectorStore:
+# (point id, vector, payload) as handed to a backend's ``_upsert_points``.
+ChunkPoint = tuple[str, list[float], dict]
+
+
+class VectorStore(ABC):
+    """Storage for chunk embeddings, scoped per assistant.
+
+    Every chunk is one point with id ``chunk_point_id(document_id, index)`` and a
+    payload carrying ``assistant_id``, ``document_id`` and ``chunk_index`` next to
+    the caller's fields. ``search`` returns dicts with ``id``, ``score`` (cosine
+    similarity) and ``payload``, plus the stored ``vector`` when ``with_vectors``.
+    """
+
+    @property
+    @abstractmethod
+    def vector_size(self) -> int | None:
+        """Vector size of the validated store, or None before the first check."""
+
+    @abstractmethod
+    async def ensure_collection(self, vector_size: int = 1536) -> None:
+        ...
+
+    @abstractmethod
+    async def search(
+        self, assistant_id: uuid.UUID, vector: list[float], limit: int = 5, with_vectors: bool = False
+    ) -> list[dict]:
+        ...
+
+    @abstractmethod
+    async def delete_documents(self, assistant_id: uuid.UUID, document_ids: list[uuid.UUID]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_points(self, assistant_id: uuid.UUID, point_ids: list[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_assistant(self, assistant_id: uuid.UUID) -> None:
+        ...
+
+    @abstractmethod
+    async def document_point_counts(self) -> dict[tuple[str, str], int]:
+        """Number of stored points per ``(assistant_id, document_id)``, for reconciliation."""
+
+    @abstractmethod
+    async def _upsert_points(self, assistant_id: uuid.UUID, points: list[ChunkPoint]) -> None:
+        ...
+
+    async def aclose(self) -> None:
+        return None
+
+    async def upsert_chunks(
+        self,
+        assistant_id: uuid.UUID,
+        document_id: uuid.UUID,
+        vectors: list[list[float]],
+        payloads: list[dict],
+    ) -> list[str]:
+        """Store one point per chunk, keyed back to the owning document."""
+        return await self.upsert_documents(assistant_id, [(document_id, vectors, payloads)])
+
+    async def upsert_documents(
+        self,
+        assistant_id: uuid.UUID,
+        documents: list[tuple[uuid.UUID, list[list[float]], list[dict]]],
+    ) -> list[str]:
+        """Store the chunks of many documents in one call."""
+        points = [
+            (
+                self.chunk_point_id(document_id, index),
+                vector,
+                {
+                    "assistant_id": str(assistant_id),
+                    "document_id": str(document_id),
+                    "chunk_index": index,
+                    **payload,
+                },
+            )
+            for document_id, vectors, payloads in documents
+            for index, (vector, payload) in enumerate(zip(vectors, payloads))
+        ]
+        if not points:
+            return []
+        await self.ensure_collection(len(points[0][1]))
+        await self._upsert_points(assistant_id, points)
+        return [point_id for point_id, _, _ in points]
+
+    @staticmethod
+    def chunk_point_id(document_id: uuid.UUID, chunk_index: int) -> str:
+        return str(uuid.uuid5(document_id, f"chunk-{chunk_index}"))
+
+
+class QdrantVectorStore(VectorStore):
+    """Qdrant backend.
+
+    Assistants share ``COLLECTION_NAME`` by default and are separated by an
+    ``assistant_id`` payload filter backed by keyword payload indexes. With
+    ``QDRANT_PARTITIONING=shard_key`` the shared collection uses custom
+    sharding with one shard key per assistant, so each query only touches that
+    tenant's shard. Assistants listed in ``QDRANT_DEDICATED_ASSISTANTS`` (large
+    tenants) get a collection of their own instead.
+
+    Shard keys and dedicated collections are created by upserts only; searches
+    and deletes for a tenant that has none yet find nothing. When an assistant
+    is moved to a dedicated collection, its points in the shared collection are
+    no longer counted by ``document_point_counts``, so the reconciler
+    (``python -m app.services.vector_sync``) re-ingests its documents into the
+    new collection, and the shared copies are dropped as soon as that
+    collection exists.
+    """
+
     COLLECTION_NAME = "assistant_documents"
+    PAYLOAD_INDEXES = ("assistant_id", "document_id")
+    # Document ids per delete-by-filter request, and points per scroll page.
+    DELETE_BATCH_SIZE = 1000
+    SCROLL_PAGE_SIZE = 1000
 
     def __init__(self) -> None:
         settings = get_settings()
-        self.client = AsyncQdrantClient(host=settings.qdrant_host, port=settings.qdrant_port)
+        self.client = AsyncQdrantClient(
+            host=settings.qdrant_host,
+            port=settings.qdrant_port,
+            grpc_port=settings.qdrant_grpc_port,
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            timeout=settings.qdrant_timeout,
+        )
+        self.upsert_batch_size = settings.qdrant_upsert_batch_size
+        if settings.qdrant_partitioning not in ("payload", "shard_key"):
+            raise ValueError(f"Unknown Qdrant partitioning {settings.qdrant_partitioning!r}")
+        self.shard_by_assistant = settings.qdrant_partitioning == "shard_key"
+        self.dedicated_assistants = {
+            uuid.UUID(value.strip()) for value in settings.qdrant_dedicated_assistants.split(",") if value.strip()
+        }
+        self.hnsw_config = qdrant_models.HnswConfigDiff(
+            # Per-tenant graphs only (m=0, payload_m=m) when every search is filtered by assistant.
+            m=0 if settings.qdrant_hnsw_per_tenant else settings.qdrant_hnsw_m,
+            payload_m=settings.qdrant_hnsw_m if settings.qdrant_hnsw_per_tenant else None,
+            ef_construct=settings.qdrant_hnsw_ef_construct,
+        )
+        if settings.qdrant_quantization not in ("none", "int8"):
+            raise ValueError(f"Unknown Qdrant quantization {settings.qdrant_quantization!r}")
+        self.vectors_on_disk = settings.qdrant_vectors_on_disk
+        self.quantization_config = None
+        quantization_search = None
+        if settings.qdrant_quantization == "int8":
+            self.quantization_config = qdrant_models.ScalarQuantization(
+                scalar=qdrant_models.ScalarQuantizationConfig(
+                    type=qdrant_models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=settings.qdrant_quantization_always_ram,
+                )
+            )
+            # Search the int8 copies for oversampling * limit candidates, then rescore them with the originals.
+            quantization_search = qdrant_models.QuantizationSearchParams(
+                rescore=settings.qdrant_rescore, oversampling=settings.qdrant_oversampling
+            )
+        self.search_params = qdrant_models.SearchParams(
+            hnsw_ef=settings.qdrant_search_ef or None,
+            exact=settings.qdrant_exact_search,
+            quantization=quantization_search,
+        )
+        self._vector_size: int | None = None
+        self._dedicated_sizes: dict[str, int] = {}
+        self._shard_keys: set[str] = set()
+        self._collection_lock = asyncio.Lock()
+
+    @property
+    def vector_size(self) -> int | None:
+        """Vector size of the validated collection, or None before the first check."""
+        return self._vector_size
 
     async def ensure_collection(self, vector_size: int = 1536) -> None:
-        exists = await self.client.collection_exists(self.COLLECTION_NAME)
-        if not exists:
-            logger.info("Creating Qdrant collection %s", self.COLLECTION_NAME)
-            await self.client.create_collection(
-                self.COLLECTION_NAME,
-                vectors_config=qdrant_models.VectorParams(size=vector_size, distance=qdrant_models.Distance.COSINE),
+        if self._vector_size == vector_size:
+            return
+        async with self._collection_lock:
+            if self._vector_size == vector_size:
+                return
+            await self._ensure(self.COLLECTION_NAME, vector_size, sharded=self.shard_by_assistant)
+            self._vector_size = vector_size
+
+    async def _ensure(self, name: str, vector_size: int, sharded: bool = False) -> None:
+        collections = await self.client.get_collections()
+        names = {collection.name for collection in collections.collections}
+        if name not in names:
+            logger.info("Creating Qdrant collection %s", name)
+            await self._create_collection(name, vector_size, sharded)
+            return
+        params = await self._collection_params(name)
+        existing_size = getattr(params.vectors, "size", None)
+        if existing_size is not None and existing_size != vector_size:
+            raise ValueError(
+                f"Collection {name} stores {existing_size}-dim vectors, "
+                f"got {vector_size}; call recreate_collection() to change the schema"
+            )
+        custom = params.sharding_method == qdrant_models.ShardingMethod.CUSTOM
+        if custom != sharded:
+            raise ValueError(
+                f"Collection {name} uses {'custom' if custom else 'auto'} sharding, which does not match "
+                f"QDRANT_PARTITIONING={'shard_key' if sharded else 'payload'}; "
+                "call recreate_collection() to change the schema"
             )
+        # Collections created before the indexes existed get them now; creating an index is idempotent.
+        await self._create_payload_indexes(name)
+        if self.quantization_config is not None:
+            # Qdrant builds the quantized copies in the background.
+            await self.client.update_collection(name, quantization_config=self.quantization_config)
 
-    async def upsert_document(self, assistant_id: uuid.UUID, document_id: uuid.UUID, vector: list[float], payload: dict) -> str:
-        await self.ensure_collection(len(vector))
-        point_id = str(document_id)
-        await self.client.upsert(
-            collection_name=self.COLLECTION_NAME,
-            points=[
-                qdrant_models.PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload={"assistant_id": str(assistant_id), **payload},
-                )
-            ],
-        )
-        return point_id
-
-    async def search(self, assistant_id: uuid.UUID, vector: list[float], limit: int = 5) -> list[dict]:
-        await self.ensure_collection(len(vector))
-        search_result = await self.client.search(
-            collection_name=self.COLLECTION_NAME,
-            query_vector=vector,
-            limit=limit,
-            filter=qdrant_models.Filter(
-                must=[
-                    qdrant_models.FieldCondition(
-                        key="assistant_id", match=qdrant_models.MatchValue(value=str(assistant_id))
-                    )
-                ]
+    async def recreate_collection(self, vector_size: int) -> None:
+        """Drop and recreate the shared collection for a new vector schema."""
+        async with self._collection_lock:
+            logger.warning("Recreating Qdrant collection %s with size %d", self.COLLECTION_NAME, vector_size)
+            await self.client.delete_collection(self.COLLECTION_NAME)
+            await self._create_collection(self.COLLECTION_NAME, vector_size, self.shard_by_assistant)
+            self._shard_keys.clear()
+            self._vector_size = vector_size
+
+    async def _create_collection(self, name: str, vector_size: int, sharded: bool = False) -> None:
+        await self.client.create_collection(
+            name,
+            vectors_config=qdrant_models.VectorParams(
+                size=vector_size, distance=qdrant_models.Distance.COSINE, on_disk=self.vectors_on_disk or None
             ),
+            hnsw_config=self.hnsw_config,
+            quantization_config=self.quantization_config,
+            sharding_method=qdrant_models.ShardingMethod.CUSTOM if sharded else None,
         )
-        return [
+        await self._create_payload_indexes(name)
+
+    async def _create_payload_indexes(self, name: str) -> None:
+        for field_name in self.PAYLOAD_INDEXES:
+            await self.client.create_payload_index(
+                name, field_name=field_name, field_schema=qdrant_models.PayloadSchemaType.KEYWORD
+            )
+
+    async def _collection_params(self, name: str) -> qdrant_models.CollectionParams:
+        info = await self.client.get_collection(name)
+        return info.config.params
+
+    def _collection_for(self, assistant_id: uuid.UUID) -> str:
+        if assistant_id in self.dedicated_assistants:
+            return f"{self.COLLECTION_NAME}__{assistant_id.hex}"
+        return self.COLLECTION_NAME
+
+    def _shard_options(self, assistant_id: uuid.UUID) -> dict:
+        if not self.shard_by_assistant or assistant_id in self.dedicated_assistants:
+            return {}
+        return {"shard_key_selector": str(assistant_id)}
+
+    async def _prepare(self, assistant_id: uuid.UUID, vector_size: int, create: bool = False) -> str | None:
+        """Check the assistant's collection and return its name.
+
+        With ``create`` (upserts) a missing dedicated collection or shard key is
+        created; otherwise None is returned for a dedicated collection that does
+        not exist yet.
+        """
+        name = self._collection_for(assistant_id)
+        if name == self.COLLECTION_NAME:
+            await self.ensure_collection(vector_size)
+            if self.shard_by_assistant and create:
+                await self._ensure_shard_key(str(assistant_id))
+        elif self._dedicated_sizes.get(name) != vector_size:
+            async with self._collection_lock:
+                if self._dedicated_sizes.get(name) != vector_size:
+                    if not create and name not in await self._collection_names():
+                        return None
+                    await self._ensure(name, vector_size)
+                    self._dedicated_sizes[name] = vector_size
+                    # Points written before the assistant was moved here are stale copies now.
+                    await self._drop_from_shared(assistant_id)
+        return name
+
+    async def _ensure_shard_key(self, shard_key: str) -> None:
+        if shard_key in self._shard_keys:
+            return
+        try:
+            await self.client.create_shard_key(self.COLLECTION_NAME, shard_key)
+        except UnexpectedResponse as exc:
+            if "already exists" not in str(exc):
+                raise
+        self._shard_keys.add(shard_key)
+
+    async def _drop_shard_key(self, shard_key: str) -> None:
+        try:
+            await self.client.delete_shard_key(self.COLLECTION_NAME, shard_key)
+        except UnexpectedResponse as exc:
+            if not self._missing_shard_key(exc):
+                raise
+        self._shard_keys.discard(shard_key)
+
+    async def _drop_from_shared(self, assistant_id: uuid.UUID) -> None:
+        """Remove every point of the assistant from the shared collection."""
+        if not await self._has_collection(self.COLLECTION_NAME):
+            return
+        if self.shard_by_assistant:
+            # Dropping the tenant's shard removes all of its points at once.
+            await self._drop_shard_key(str(assistant_id))
+        else:
+            await self.client.delete(
+                collection_name=self.COLLECTION_NAME,
+                points_selector=qdrant_models.FilterSelector(filter=self._assistant_filter(assistant_id)),
+            )
+
+    @staticmethod
+    def _missing_shard_key(exc: UnexpectedResponse) -> bool:
+        return "shard key" in str(exc).lower() and "not found" in str(exc).lower()
+
+    async def _upsert_points(self, assistant_id: uuid.UUID, points: list[ChunkPoint]) -> None:
+        name = await self._prepare(assistant_id, len(points[0][1]), create=True)
+        structs = [
+            qdrant_models.PointStruct(id=point_id, vector=vector, payload=payload)
+            for point_id, vector, payload in points
+        ]
+        for start in range(0, len(structs), self.upsert_batch_size):
+            await self.client.upsert(
+                collection_name=name,
+                points=structs[start : start + self.upsert_batch_size],
+                **self._shard_options(assistant_id),
+            )
+
+    async def search(
+        self, assistant_id: uuid.UUID, vector: list[float], limit: int = 5, with_vectors: bool = False
+    ) -> list[dict]:
+        name = await self._prepare(assistant_id, len(vector))
+        if name is None:
+            return []
+        try:
+            search_result = await self.client.search(
+                collection_name=name,
+                query_vector=vector,
+                limit=limit,
+                query_filter=self._assistant_filter(assistant_id),
+                search_params=self.search_params,
+                with_vectors=with_vectors,
+                **self._shard_options(assistant_id),
+            )
+        except UnexpectedResponse as exc:
+            # An assistant without any upserted points has no shard key yet.
+            if not self._missing_shard_key(exc):
+                raise
+            return []
+        results = [
             {
                 "id": point.id,
                 "score": point.score,
@@ -64,7 +362,141 @@ class VectorStore:
             }
             for point in search_result
         ]
+        if with_vectors:
+            for result, point in zip(results, search_result):
+                result["vector"] = point.vector
+        return results
+
+    async def delete_documents(self, assistant_id: uuid.UUID, document_ids: list[uuid.UUID]) -> None:
+        ids = [str(document_id) for document_id in document_ids]
+        for start in range(0, len(ids), self.DELETE_BATCH_SIZE):
+            condition = qdrant_models.FieldCondition(
+                key="document_id", match=qdrant_models.MatchAny(any=ids[start : start + self.DELETE_BATCH_SIZE])
+            )
+            await self._delete(assistant_id, self._assistant_filter(assistant_id, condition))
+
+    async def delete_points(self, assistant_id: uuid.UUID, point_ids: list[str]) -> None:
+        for start in range(0, len(point_ids), self.DELETE_BATCH_SIZE):
+            await self._delete(
+                assistant_id, qdrant_models.PointIdsList(points=point_ids[start : start + self.DELETE_BATCH_SIZE])
+            )
+
+    async def delete_assistant(self, assistant_id: uuid.UUID) -> None:
+        name = self._collection_for(assistant_id)
+        if name != self.COLLECTION_NAME:
+            if name in await self._collection_names():
+                await self.client.delete_collection(name)
+            self._dedicated_sizes.pop(name, None)
+        await self._drop_from_shared(assistant_id)
+
+    async def document_point_counts(self) -> dict[tuple[str, str], int]:
+        counts: dict[tuple[str, str], int] = {}
+        dedicated = {str(assistant_id) for assistant_id in self.dedicated_assistants}
+        names = [
+            name
+            for name in await self._collection_names()
+            if name == self.COLLECTION_NAME or name.startswith(f"{self.COLLECTION_NAME}__")
+        ]
+        for name in names:
+            offset = None
+            while True:
+                points, offset = await self.client.scroll(
+                    collection_name=name,
+                    limit=self.SCROLL_PAGE_SIZE,
+                    offset=offset,
+                    with_payload=["assistant_id", "document_id"],
+                    with_vectors=False,
+                )
+                for point in points:
+                    payload = point.payload or {}
+                    key = (payload.get("assistant_id", ""), payload.get("document_id", ""))
+                    if name == self.COLLECTION_NAME and key[0] in dedicated:
+                        # Left over from before the move; only the dedicated collection counts.
+                        continue
+                    counts[key] = counts.get(key, 0) + 1
+                if offset is None:
+                    break
+        return counts
+
+    async def _collection_names(self) -> set[str]:
+        collections = await self.client.get_collections()
+        return {collection.name for collection in collections.collections}
+
+    async def _has_collection(self, name: str) -> bool:
+        if name in self._dedicated_sizes or (name == self.COLLECTION_NAME and self._vector_size is not None):
+            return True
+        return name in await self._collection_names()
+
+    async def _delete(
+        self, assistant_id: uuid.UUID, selector: qdrant_models.Filter | qdrant_models.PointIdsList
+    ) -> None:
+        name = self._collection_for(assistant_id)
+        if not await self._has_collection(name):
+            return
+        try:
+            await self.client.delete(
+                collection_name=name,
+                points_selector=(
+                    qdrant_models.FilterSelector(filter=selector)
+                    if isinstance(selector, qdrant_models.Filter)
+                    else selector
+                ),
+                **self._shard_options(assistant_id),
+            )
+        except UnexpectedResponse as exc:
+            # No shard key means the assistant never stored a point.
+            if not self._missing_shard_key(exc):
+                raise
+
+    @staticmethod
+    def _assistant_filter(assistant_id: uuid.UUID, *conditions: qdrant_models.Condition) -> qdrant_models.Filter:
+        return qdrant_models.Filter(
+            must=[
+                qdrant_models.FieldCondition(
+                    key="assistant_id", match=qdrant_models.MatchValue(value=str(assistant_id))
+                ),
+                *conditions,
+            ]
+        )
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+_store: VectorStore | None = None
 
 
 async def get_vector_store() -> VectorStore:
-    return VectorStore()
+    """Return the process-wide vector store, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = _create_store()
+    return _store
+
+
+def _create_store() -> VectorStore:
+    settings = get_settings()
+    if settings.vector_store_backend == "qdrant":
+        return QdrantVectorStore()
+    if settings.vector_store_backend == "local":
+        # Imported lazily: the local backend module builds on the VectorStore interface above.
+        from app.services.local_vector_store import LocalVectorStore
+
+        return LocalVectorStore(settings.local_vector_store_path)
+    raise ValueError(f"Unknown vector store backend {settings.vector_store_backend!r}")
+
+
+async def init_vector_store() -> None:
+    """Validate the store once at startup; retried lazily on first use if the backend is down."""
+    store = await get_vector_store()
+    try:
+        await store.ensure_collection(get_settings().embedding_dimensions)
+    except Exception as exc:  # pragma: no cover - depends on backend availability
+        logger.warning("Vector store check failed at startup: %s", exc)
+
+
+async def close_vector_store() -> None:
+    global _store
+    if _store is not None:
+        await _store.aclose()
+        _store = None
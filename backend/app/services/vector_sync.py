@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.models import Assistant, KnowledgeDocument
+from app.services.openai_client import close_openai_client, get_openai_client
+from app.services.rag import RAGPipeline, content_hash
+from app.services.response_cache import bump_knowledge_version
+from app.services.vector_store import close_vector_store, get_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconcileReport:
+    documents: int = 0
+    points: int = 0
+    orphan_assistants: int = 0
+    orphan_documents: int = 0
+    stale_documents: int = 0
+    reindexed: int = 0
+    failed: int = 0
+    dry_run: bool = False
+    failed_ids: list[str] = field(default_factory=list)
+
+
+class VectorReconciler:
+    """Compare stored points with ``knowledge_documents`` rows and repair the differences.
+
+    - points of assistants that no longer exist are deleted per assistant;
+    - points of documents that no longer exist are deleted with batched
+      delete-by-filter requests;
+    - ready documents whose stored point count differs from ``chunk_count``
+      are re-ingested in batches (old points removed first).
+
+    Pending and failed documents are left to the ingestion queue.
+    """
+
+    def __init__(
+        self, db: AsyncSession, rag_pipeline: RAGPipeline, batch_size: int | None = None, dry_run: bool = False
+    ) -> None:
+        self.db = db
+        self.rag = rag_pipeline
+        self.batch_size = batch_size or get_settings().bulk_import_batch_size
+        self.dry_run = dry_run
+
+    async def run(self) -> ReconcileReport:
+        report = ReconcileReport(dry_run=self.dry_run)
+        assistant_ids = {str(assistant_id) for assistant_id in (await self.db.execute(select(Assistant.id))).scalars()}
+        rows = (
+            await self.db.execute(
+                select(
+                    KnowledgeDocument.id,
+                    KnowledgeDocument.assistant_id,
+                    KnowledgeDocument.chunk_count,
+                    KnowledgeDocument.status,
+                )
+            )
+        ).all()
+        point_counts = await self.rag.vector_store.document_point_counts()
+        report.documents = len(rows)
+        report.points = sum(point_counts.values())
+
+        known = {(str(row.assistant_id), str(row.id)) for row in rows}
+        orphans: dict[str, list[uuid.UUID]] = defaultdict(list)
+        for assistant_id, document_id in point_counts:
+            if (assistant_id, document_id) not in known:
+                orphans[assistant_id].append(uuid.UUID(document_id))
+        stale: dict[uuid.UUID, list[uuid.UUID]] = defaultdict(list)
+        for row in rows:
+            if row.status != KnowledgeDocument.STATUS_READY:
+                continue
+            if point_counts.get((str(row.assistant_id), str(row.id)), 0) != row.chunk_count:
+                stale[row.assistant_id].append(row.id)
+
+        for assistant_id, document_ids in orphans.items():
+            if assistant_id not in assistant_ids:
+                report.orphan_assistants += 1
+                if not self.dry_run:
+                    await self.rag.remove_assistant(uuid.UUID(assistant_id))
+                continue
+            report.orphan_documents += len(document_ids)
+            if not self.dry_run:
+                await self.rag.remove_documents(uuid.UUID(assistant_id), document_ids)
+
+        report.stale_documents = sum(len(document_ids) for document_ids in stale.values())
+        if not self.dry_run:
+            for assistant_id, document_ids in stale.items():
+                for start in range(0, len(document_ids), self.batch_size):
+                    await self._reindex(assistant_id, document_ids[start : start + self.batch_size], report)
+
+        logger.info("Vector reconciliation: %s", asdict(report))
+        return report
+
+    async def _reindex(self, assistant_id: uuid.UUID, document_ids: list[uuid.UUID], report: ReconcileReport) -> None:
+        stmt = select(KnowledgeDocument.id, KnowledgeDocument.title, KnowledgeDocument.content).where(
+            KnowledgeDocument.id.in_(document_ids)
+        )
+        documents = (await self.db.execute(stmt)).all()
+        try:
+            await self.rag.remove_documents(assistant_id, document_ids)
+            chunk_counts = await self.rag.ingest_documents(assistant_id, documents)
+        except Exception:
+            logger.exception("Re-indexing %d documents of assistant %s failed", len(documents), assistant_id)
+            report.failed += len(documents)
+            report.failed_ids.extend(str(document.id) for document in documents)
+            return
+        await self.db.execute(
+            update(KnowledgeDocument),
+            [
+                {
+                    "id": document.id,
+                    "vector_id": str(document.id),
+                    "chunk_count": chunk_counts.get(document.id, 0),
+                    "content_hash": content_hash(document.title, document.content),
+                }
+                for document in documents
+            ],
+        )
+        await bump_knowledge_version(self.db, assistant_id)
+        await self.db.commit()
+        report.reindexed += len(documents)
+
+
+async def main(argv: list[str] | None = None) -> ReconcileReport:
+    """Entry point for ``python -m app.services.vector_sync [--dry-run]``, run from ``backend/``."""
+    parser = argparse.ArgumentParser(description="Reconcile vector store points with Postgres documents.")
+    parser.add_argument("--dry-run", action="store_true", help="only report mismatches")
+    parser.add_argument("--batch-size", type=int, default=None, help="documents per re-index batch")
+    args = parser.parse_args(argv)
+
+    try:
+        pipeline = RAGPipeline(await get_vector_store(), await get_openai_client())
+        async with db_session.SessionLocal() as db:
+            return await VectorReconciler(db, pipeline, args.batch_size, args.dry_run).run()
+    finally:
+        await close_openai_client()
+        await close_vector_store()
+
+
+if __name__ == "__main__":  # pragma: no cover - command line entry point
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asdict(asyncio.run(main())), indent=2))
@@ -0,0 +1,142 @@
+"""Offline benchmark: memory footprint and recall@k of reduced/quantized vectors.
+
+Builds a synthetic corpus of topic-clustered unit vectors whose variance
+decays across dimensions (so leading dimensions carry most of the signal, as
+with ``text-embedding-3`` shortened embeddings) and compares each storage
+option against exact float32 search over the full vectors:
+
+- ``float32`` at the full and at reduced dimensions (truncate + re-normalize,
+  which is what the embeddings API ``dimensions`` parameter does);
+- ``int8`` scalar quantization with a 0.99 quantile, as Qdrant applies it,
+  with and without oversampled rescoring against the original vectors.
+
+Run from ``backend/``::
+
+    python scripts/quantization_benchmark.py --documents 20000 --reduced 768,512,256
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+
+def synthetic_corpus(
+    documents: int, queries: int, dimensions: int, topics: int, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    spectrum = (1.0 / np.sqrt(1.0 + np.arange(dimensions) / 64.0)).astype(np.float32)
+    centers = rng.standard_normal((topics, dimensions), dtype=np.float32) * spectrum
+    corpus = centers[rng.integers(topics, size=documents)]
+    corpus += 0.6 * rng.standard_normal((documents, dimensions), dtype=np.float32) * spectrum
+    # Queries are noisy paraphrases of random documents.
+    probe = corpus[rng.choice(documents, size=queries, replace=False)]
+    probe = probe + 0.4 * rng.standard_normal((queries, dimensions), dtype=np.float32) * spectrum
+    return _normalize(corpus), _normalize(probe)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def quantize_int8(matrix: np.ndarray, quantile: float = 0.99) -> tuple[np.ndarray, float, float]:
+    """Map values in the central ``quantile`` range onto 0..255 (outliers are clipped)."""
+    low, high = np.quantile(matrix, [(1 - quantile) / 2, (1 + quantile) / 2])
+    step = (high - low) / 255
+    codes = np.clip(np.rint((matrix - low) / step), 0, 255).astype(np.uint8)
+    return codes, float(low), float(step)
+
+
+def quantized_scores(queries: np.ndarray, codes: np.ndarray, low: float, step: float) -> np.ndarray:
+    # dot(q, low + step * c) = low * sum(q) + step * dot(q, c)
+    return low * queries.sum(axis=1, keepdims=True) + step * (queries @ codes.T.astype(np.float32))
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(row) & set(expected)) / k for row, expected in zip(found, truth)]))
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    corpus, queries = synthetic_corpus(args.documents, args.queries, args.dimensions, args.topics, args.seed)
+    truth = top_k(queries @ corpus.T, args.k)
+    candidates = max(args.k, int(args.k * args.oversampling))
+    results = []
+
+    for dimensions in [args.dimensions, *args.reduced]:
+        docs = _normalize(corpus[:, :dimensions])
+        probe = _normalize(queries[:, :dimensions])
+        float_bytes = docs.nbytes
+
+        started = time.perf_counter()
+        found = top_k(probe @ docs.T, args.k)
+        results.append(
+            {
+                "config": f"float32 d={dimensions}",
+                "ram_mb": float_bytes / 2**20,
+                "disk_mb": float_bytes / 2**20,
+                "recall": recall(found, truth),
+                "ms_per_query": 1000 * (time.perf_counter() - started) / args.queries,
+            }
+        )
+
+        codes, low, step = quantize_int8(docs)
+        started = time.perf_counter()
+        approximate = quantized_scores(probe, codes, low, step)
+        plain = top_k(approximate, args.k)
+        plain_ms = 1000 * (time.perf_counter() - started) / args.queries
+        shortlist = top_k(approximate, candidates)
+        exact = np.einsum("qd,qcd->qc", probe, docs[shortlist])
+        rescored = np.take_along_axis(shortlist, top_k(exact, args.k), axis=1)
+        rescored_ms = 1000 * (time.perf_counter() - started) / args.queries
+        # With rescoring the originals stay on disk and only the int8 codes are kept in RAM.
+        for label, found, elapsed in (
+            ("int8", plain, plain_ms),
+            (f"int8+rescore x{args.oversampling:g}", rescored, rescored_ms),
+        ):
+            results.append(
+                {
+                    "config": f"{label} d={dimensions}",
+                    "ram_mb": codes.nbytes / 2**20,
+                    "disk_mb": (codes.nbytes + float_bytes) / 2**20,
+                    "recall": recall(found, truth),
+                    "ms_per_query": elapsed,
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--reduced", default="768,512,256", help="comma-separated reduced dimensions")
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--oversampling", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.reduced = [int(value) for value in args.reduced.split(",") if value.strip()]
+
+    results = run(args)
+    print(f"{args.documents} documents, {args.queries} queries, recall@{args.k} vs float32 d={args.dimensions}")
+    print(f"{'config':<28}{'RAM MB':>10}{'disk MB':>10}{'recall':>9}{'ms/query':>10}")
+    for row in results:
+        print(
+            f"{row['config']:<28}{row['ram_mb']:>10.1f}{row['disk_mb']:>10.1f}"
+            f"{row['recall']:>9.3f}{row['ms_per_query']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
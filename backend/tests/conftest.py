@@ -6,6 +6,7 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app import main as app_main
 from app.db import session as db_session
@@ -13,26 +14,41 @@ from app.db import session as db_session
 from app.api.deps import get_db, get_openai_service, get_rag_pipeline, get_vector_service
 from app.db.base import Base
 from app.main import app
+from app.services.ingestion import get_ingestion_queue
+from app.services.local_embedder import HashingEmbedder
 
 
 class StubOpenAI:
-    async def complete(self, prompt: str, **_: object) -> str:
+    async def complete(self, prompt: str | list[dict], **_: object) -> str:
         return "Stubbed response"
 
-    async def embed(self, texts: list[str]) -> list[list[float]]:
-        return [[0.0] * 1536 for _ in texts]
+    async def stream_complete(self, prompt: str | list[dict], **_: object):
+        for token in ("Stubbed", " response"):
+            yield token
+
+    async def embed(self, texts: list[str], priority: int = 0, documents: bool = False) -> list[list[float]]:
+        return HashingEmbedder(1536).embed(texts)
+
+    def metrics(self) -> dict:
+        return {"pool": {"connections": 0, "requests_total": 0}}
 
 
 class StubVectorStore:
     async def ensure_collection(self, vector_size: int = 1536) -> None:  # pragma: no cover - no-op
         return None
 
-    async def upsert_document(self, *args, **kwargs) -> str:  # pragma: no cover - no-op
-        return str(uuid.uuid4())
+    async def upsert_chunks(self, *args, **kwargs) -> list[str]:  # pragma: no cover - no-op
+        return [str(uuid.uuid4())]
 
     async def search(self, *args, **kwargs) -> list[dict]:
         return []
 
+    async def delete_documents(self, *args, **kwargs) -> None:
+        return None
+
+    async def delete_assistant(self, *args, **kwargs) -> None:
+        return None
+
 
 class StubRAG:
     def __init__(self) -> None:
@@ -42,12 +58,24 @@ class StubRAG:
     async def ingest_document(self, *args, **kwargs):  # pragma: no cover - no-op
         return None
 
+    async def ingest_documents(self, assistant_id, documents) -> dict:
+        return {document.id: 1 for document in documents}
+
     async def retrieve_context(self, *args, **kwargs) -> list[str]:
         return []
 
+    async def retrieve(self, *args, **kwargs) -> list:
+        return []
+
     async def bootstrap_assistant(self, *args, **kwargs):  # pragma: no cover - no-op
         return None
 
+    async def remove_documents(self, assistant_id, document_ids) -> None:
+        await self.vector_store.delete_documents(assistant_id, document_ids)
+
+    async def remove_assistant(self, assistant_id) -> None:
+        await self.vector_store.delete_assistant(assistant_id)
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> AsyncGenerator[asyncio.AbstractEventLoop, None]:
@@ -57,8 +85,11 @@ def event_loop() -> AsyncGenerator[asyncio.AbstractEventLoop, None]:
 
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
-async def setup_database() -> None:
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+async def setup_database(tmp_path_factory: pytest.TempPathFactory) -> None:
+    # A file database with one connection per session lets background workers
+    # and request handlers run concurrently, as they would against Postgres.
+    database_path = tmp_path_factory.mktemp("db") / "test.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", future=True, poolclass=NullPool)
     TestingSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
 
     db_session.engine = engine
@@ -77,6 +108,11 @@ async def setup_database() -> None:
     app.dependency_overrides[get_vector_service] = lambda: StubVectorStore()
     app.dependency_overrides[get_rag_pipeline] = lambda: StubRAG()
 
+    async def _stub_pipeline() -> StubRAG:
+        return StubRAG()
+
+    get_ingestion_queue().pipeline_factory = _stub_pipeline
+
 
 @pytest.fixture()
 def client() -> AsyncGenerator[TestClient, None]:
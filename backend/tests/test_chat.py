@@ -1,3 +1,5 @@
+import json
+import uuid
 from http import HTTPStatus
 
 
@@ -12,3 +14,39 @@ def test_chat_flow(client):
     data = chat_resp.json()
     assert data["assistant_message"] == "Stubbed response"
     assert data["session"]["assistant_id"] == assistant_id
+    assert data["token_breakdown"]["total"] <= data["token_breakdown"]["budget"]
+    assert {"history", "retrieval", "completion", "persist"} <= set(data["stage_timings_ms"])
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_streaming_chat_flow(client):
+    assistant_resp = client.post("/api/v1/assistants/", json={"name": "Streaming Assistant"})
+    assistant_id = assistant_resp.json()["id"]
+
+    stream_resp = client.post(f"/api/v1/chat/assistants/{assistant_id}/stream", json={"user_message": "Hi"})
+    assert stream_resp.status_code == HTTPStatus.OK
+    assert stream_resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(stream_resp.text)
+    assert [name for name, _ in events] == ["session", "token", "token", "done"]
+    done = events[-1][1]
+    assert done["assistant_message"] == "Stubbed response"
+
+    session_id = done["session"]["id"]
+    follow_up = client.post(
+        f"/api/v1/chat/assistants/{assistant_id}/sessions/{session_id}/stream",
+        json={"user_message": "Again"},
+    )
+    assert _parse_sse(follow_up.text)[-1][0] == "done"
+
+    missing = client.post(
+        f"/api/v1/chat/assistants/{assistant_id}/sessions/{uuid.uuid4()}/stream",
+        json={"user_message": "Nope"},
+    )
+    assert missing.status_code == HTTPStatus.NOT_FOUND
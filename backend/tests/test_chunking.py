@@ -0,0 +1,91 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.chunking import TextChunker
+from app.services.rag import RAGPipeline
+
+
+def test_chunks_respect_size_and_paragraphs():
+    text = "Alpha beta gamma. Delta epsilon.\n\nSecond paragraph here.\n\n" + "word " * 120
+    chunks = TextChunker(chunk_size=80, chunk_overlap=20).split(text)
+
+    assert chunks[0] == "Alpha beta gamma. Delta epsilon.\n\nSecond paragraph here."
+    assert all(len(chunk) <= 80 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "").count("word") == 120
+
+
+def test_overlap_carries_trailing_sentences():
+    text = " ".join(f"Sentence number {i}." for i in range(10))
+    chunks = TextChunker(chunk_size=60, chunk_overlap=25).split(text)
+
+    assert len(chunks) > 1
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.startswith(previous.split(". ")[-1])
+
+
+def test_invalid_overlap_rejected():
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=10, chunk_overlap=10)
+
+
+class RecordingEmbedder:
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    async def embed(self, texts: list[str], priority: int = 0, documents: bool = False) -> list[list[float]]:
+        self.batches.append(len(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+
+class RecordingStore:
+    async def upsert_chunks(self, assistant_id, document_id, vectors, payloads):
+        self.payloads = payloads
+        return [str(uuid.uuid4()) for _ in vectors]
+
+
+class FakeSession:
+    async def flush(self) -> None:
+        return None
+
+
+@pytest.mark.asyncio
+async def test_ingest_document_stores_one_point_per_chunk():
+    embedder, store = RecordingEmbedder(), RecordingStore()
+    rag = RAGPipeline(store, embedder, chunker=TextChunker(chunk_size=40, chunk_overlap=0))
+    rag.embedding_batch_size = 2
+    document = SimpleNamespace(
+        id=uuid.uuid4(),
+        title="Guide",
+        content=" ".join(f"Fact {i} is true." for i in range(10)),
+        vector_id=None,
+        chunk_count=0,
+    )
+
+    await rag.ingest_document(FakeSession(), uuid.uuid4(), document)
+
+    assert document.chunk_count == len(store.payloads) > 1
+    assert sum(embedder.batches) == document.chunk_count
+    assert max(embedder.batches) == 2
+    assert all(payload["title"] == "Guide" for payload in store.payloads)
+
+
+class RecordingBatchStore:
+    async def upsert_documents(self, assistant_id, documents):
+        self.documents = documents
+        return []
+
+
+@pytest.mark.asyncio
+async def test_ingest_documents_shares_embedding_batches():
+    embedder, store = RecordingEmbedder(), RecordingBatchStore()
+    rag = RAGPipeline(store, embedder, chunker=TextChunker(chunk_size=40, chunk_overlap=0))
+    rag.embedding_batch_size = 4
+    documents = [SimpleNamespace(id=uuid.uuid4(), title=f"Doc {i}", content="Short note.") for i in range(6)]
+
+    counts = await rag.ingest_documents(uuid.uuid4(), documents)
+
+    assert counts == {document.id: 1 for document in documents}
+    assert embedder.batches == [4, 2]
+    assert [doc_id for doc_id, _, _ in store.documents] == [document.id for document in documents]
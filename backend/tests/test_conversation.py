@@ -0,0 +1,112 @@
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from app.db import session as db_session
+from app.models import Assistant
+from app.services.conversation import ConversationService
+from app.services.timing import StageTimings
+
+
+@pytest.mark.asyncio
+async def test_history_window_loads_only_recent_messages():
+    async with db_session.SessionLocal() as db:
+        assistant = Assistant(id=uuid.uuid4(), name="History Assistant")
+        db.add(assistant)
+        await db.flush()
+        service = ConversationService(db, assistant, rag_pipeline=None, openai_client=None)
+        session = await service.create_session()
+        for index in range(25):
+            await service.add_message(session, "user", f"message {index}")
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db_session.engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            history = await service.load_history(session, limit=4)
+        finally:
+            event.remove(db_session.engine.sync_engine, "before_cursor_execute", _record)
+
+        assert [message.content for message in history] == [f"message {i}" for i in range(21, 25)]
+        assert len(statements) == 1
+        assert "LIMIT" in statements[0].upper()
+        await db.rollback()
+
+
+def _assistant() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        system_prompt=None,
+        hybrid_retrieval=False,
+        vector_weight=1.0,
+        lexical_weight=1.0,
+        response_cache_enabled=False,
+    )
+
+
+class SlowRAG:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    async def retrieve_context(self, assistant_id, query, **options):
+        await asyncio.sleep(self.delay)
+        return ["context"]
+
+
+@pytest.mark.asyncio
+async def test_history_and_retrieval_run_concurrently():
+    assistant = _assistant()
+    service = ConversationService(db=None, assistant=assistant, rag_pipeline=SlowRAG(0.2), openai_client=None)
+
+    async def slow_history(session, limit=None, db=None):
+        await asyncio.sleep(0.2)
+        return []
+
+    service.load_history = slow_history
+    timings = StageTimings(metrics=None)
+    started = time.perf_counter()
+    messages, _ = await service._build_prompt(SimpleNamespace(id=uuid.uuid4(), summary=None), "Hello", timings)
+
+    assert time.perf_counter() - started < 0.35
+    assert "[1] context" in messages[-2]["content"]
+    assert {"history", "retrieval", "prompt"} <= set(timings.durations)
+
+
+@pytest.mark.asyncio
+async def test_retrieval_timeout_degrades_to_no_context():
+    assistant = _assistant()
+    service = ConversationService(db=None, assistant=assistant, rag_pipeline=SlowRAG(1.0), openai_client=None)
+    service.retrieval_timeout = 0.05
+
+    async def no_history(session, limit=None, db=None):
+        return []
+
+    service.load_history = no_history
+    session = SimpleNamespace(id=uuid.uuid4(), summary=None)
+    messages, _ = await service._build_prompt(session, "Hello", StageTimings(metrics=None))
+
+    assert not any("Relevant Knowledge" in message["content"] for message in messages)
+
+
+@pytest.mark.asyncio
+async def test_history_timeout_degrades_to_no_history():
+    service = ConversationService(db=None, assistant=_assistant(), rag_pipeline=SlowRAG(0.0), openai_client=None)
+    service.history_timeout = 0.05
+
+    async def stuck_history(session, limit=None, db=None):
+        await asyncio.sleep(1.0)
+        return [SimpleNamespace(role="user", content="never loaded")]
+
+    service.load_history = stuck_history
+    session = SimpleNamespace(id=uuid.uuid4(), summary=None)
+    messages, breakdown = await service._build_prompt(session, "Hello", StageTimings(metrics=None))
+
+    assert [message["role"] for message in messages] == ["system", "system", "user"]
+    assert breakdown.history_messages_used == 0
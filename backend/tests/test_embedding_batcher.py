@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class CountingEmbedder:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call():
+    embedder = CountingEmbedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_size=16, max_wait=0.01)
+
+    results = await asyncio.gather(*(batcher.embed(["x" * i]) for i in range(1, 6)))
+
+    assert len(embedder.calls) == 1
+    assert results == [[[float(i)]] for i in range(1, 6)]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 5
+    assert stats["max_batch_size"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting():
+    embedder = CountingEmbedder()
+    batcher = EmbeddingBatcher(embedder, max_batch_size=2, max_wait=10)
+
+    results = await asyncio.wait_for(asyncio.gather(batcher.embed(["a"]), batcher.embed(["bb"])), timeout=1)
+
+    assert results == [[[1.0]], [[2.0]]]
+    assert embedder.calls == [["a", "bb"]]
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_waiter():
+    async def failing(texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("upstream down")
+
+    batcher = EmbeddingBatcher(failing, max_batch_size=8, max_wait=0.001)
+    results = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["b"]), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,37 @@
+from array import array
+
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+@pytest.mark.asyncio
+async def test_persistent_tier_survives_new_instance():
+    cache = EmbeddingCache("test-model", max_entries=4)
+    assert await cache.get_many(["hello"]) == [None]
+
+    await cache.set_many(["hello"], [[0.5, 0.25]])
+    assert await cache.get_many(["hello"]) == [[0.5, 0.25]]
+    assert cache.stats()["memory_hits"] == 1
+
+    fresh = EmbeddingCache("test-model", max_entries=4)
+    assert await fresh.get_many(["hello", "other"]) == [[0.5, 0.25], None]
+    assert fresh.stats()["persistent_hits"] == 1
+    assert fresh.stats()["misses"] == 1
+
+    other_model = EmbeddingCache("another-model")
+    assert await other_model.get_many(["hello"]) == [None]
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_size_bounded():
+    cache = EmbeddingCache("lru-model", max_entries=2, persistent=False)
+    await cache.set_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+
+    assert await cache.get_many(["a", "b", "c"]) == [None, [2.0], [3.0]]
+    assert cache.stats()["memory_evictions"] == 1
+    # Entries are held as packed float32 and handed out as fresh lists.
+    assert all(isinstance(vector, array) and vector.typecode == "f" for vector in cache._memory.values())
+    (vector,) = await cache.get_many(["c"])
+    vector.append(0.0)
+    assert await cache.get_many(["c"]) == [[3.0]]
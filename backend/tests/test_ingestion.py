@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+
+from app.db import session as db_session
+from app.models import Assistant, IngestionJob, KnowledgeDocument
+from app.services.ingestion import IngestionQueue
+
+
+class FlakyPipeline:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    async def ingest_document(self, session, assistant_id, document):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("embedding service unavailable")
+        document.chunk_count = 1
+        await session.flush()
+        return document
+
+
+async def _create_document() -> KnowledgeDocument:
+    async with db_session.SessionLocal() as db:
+        assistant = Assistant(id=uuid.uuid4(), name="Ingestion Assistant")
+        document = KnowledgeDocument(id=uuid.uuid4(), assistant_id=assistant.id, title="Doc", content="Text")
+        db.add_all([assistant, document])
+        await db.commit()
+        return document
+
+
+async def _run(queue: IngestionQueue, document: KnowledgeDocument) -> tuple[IngestionJob, KnowledgeDocument]:
+    await queue.start()
+    try:
+        async with db_session.SessionLocal() as db:
+            document = await db.get(KnowledgeDocument, document.id)
+            (job,) = await queue.submit(db, [document])
+        await queue.join()
+    finally:
+        await queue.stop()
+    async with db_session.SessionLocal() as db:
+        return await db.get(IngestionJob, job.id), await db.get(KnowledgeDocument, document.id)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_until_success():
+    pipeline = FlakyPipeline(failures=1)
+
+    async def factory():
+        return pipeline
+
+    queue = IngestionQueue(concurrency=2, max_attempts=3, pipeline_factory=factory)
+    job, document = await _run(queue, await _create_document())
+
+    assert job.status == IngestionJob.STATUS_COMPLETED
+    assert job.attempts == 2
+    assert document.status == KnowledgeDocument.STATUS_READY
+    assert document.chunk_count == 1
+    assert queue.stats()["retried"] == 1
+
+
+@pytest.mark.asyncio
+async def test_job_fails_after_max_attempts():
+    async def factory():
+        return FlakyPipeline(failures=10)
+
+    queue = IngestionQueue(concurrency=1, max_attempts=2, pipeline_factory=factory)
+    job, document = await _run(queue, await _create_document())
+
+    assert job.status == IngestionJob.STATUS_FAILED
+    assert job.attempts == 2
+    assert "unavailable" in job.error
+    assert document.status == KnowledgeDocument.STATUS_FAILED
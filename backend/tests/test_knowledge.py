@@ -1,5 +1,11 @@
+import json
+import time
 from http import HTTPStatus
 
+import pytest
+
+from app.services.bulk_import import iter_lines
+
 
 def test_add_knowledge_document(client):
     assistant_payload = {"name": "Doc Assistant"}
@@ -19,3 +25,109 @@ def test_add_knowledge_document(client):
     assert list_resp.status_code == HTTPStatus.OK
     docs = list_resp.json()
     assert len(docs) == 1
+
+
+def _wait_for_document(client, assistant_id: str, document_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        document = client.get(f"/api/v1/assistants/{assistant_id}/knowledge/{document_id}").json()
+        if document["status"] != "pending":
+            return document
+        assert time.monotonic() < deadline, document
+        time.sleep(0.02)
+
+
+def test_document_is_ingested_in_background(client):
+    assistant_id = client.post("/api/v1/assistants/", json={"name": "Queue Assistant"}).json()["id"]
+
+    response = client.post(
+        f"/api/v1/assistants/{assistant_id}/knowledge/",
+        json={"title": "Policy", "content": "Refunds within 30 days."},
+    )
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()["status"] == "pending"
+
+    document = _wait_for_document(client, assistant_id, response.json()["id"])
+    assert document["status"] == "ready"
+
+    (job,) = client.get(f"/api/v1/assistants/{assistant_id}/knowledge/jobs/").json()
+    assert job["document_id"] == document["id"]
+    assert job["attempts"] == 1
+    assert client.get(f"/api/v1/assistants/{assistant_id}").json()["knowledge_version"] == 1
+    job_resp = client.get(f"/api/v1/assistants/{assistant_id}/knowledge/jobs/{job['id']}")
+    assert job_resp.json()["status"] == "completed"
+
+
+def test_bulk_import_ndjson_body(client):
+    assistant_id = client.post("/api/v1/assistants/", json={"name": "Bulk Assistant"}).json()["id"]
+    lines = [json.dumps({"title": f"Doc {i}", "content": f"Fact number {i}."}) for i in range(5)]
+    lines.insert(2, "{not json")
+    body = ("\n".join(lines) + "\n").encode()
+
+    response = client.post(
+        f"/api/v1/assistants/{assistant_id}/knowledge/bulk",
+        content=iter([body[:17], body[17:60], body[60:]]),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    result = response.json()
+    assert result["imported"] == 5
+    assert result["rejected"] == 1
+    assert result["errors"][0]["line"] == 3
+    assert result["docs_per_second"] >= 0
+
+    docs = client.get(f"/api/v1/assistants/{assistant_id}/knowledge/").json()
+    assert {doc["title"] for doc in docs} == {f"Doc {i}" for i in range(5)}
+    assert all(doc["status"] == "ready" and doc["chunk_count"] == 1 for doc in docs)
+
+
+def test_bulk_import_rejects_overlong_titles_per_line(client):
+    assistant_id = client.post("/api/v1/assistants/", json={"name": "Title Assistant"}).json()["id"]
+    lines = [json.dumps({"title": "T" * 300, "content": "Too long."}), json.dumps({"title": "Ok", "content": "Fine."})]
+
+    response = client.post(
+        f"/api/v1/assistants/{assistant_id}/knowledge/bulk",
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    result = response.json()
+    assert (result["imported"], result["rejected"], result["errors"][0]["line"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_buffers_only_the_tail_and_skips_oversized_lines():
+    async def chunks():
+        for chunk in (b"first\nsec", b"ond\n", b"x" * 6, b"x" * 6, b"\nlast"):
+            yield chunk
+
+    lines = [item async for item in iter_lines(chunks(), max_line_bytes=8)]
+
+    assert lines == [(1, b"first"), (2, b"second"), (3, None), (4, b"last")]
+
+
+def test_bulk_import_multipart_file(client):
+    assistant_id = client.post("/api/v1/assistants/", json={"name": "Upload Assistant"}).json()["id"]
+    body = "\n".join(json.dumps({"title": f"Doc {i}", "content": "Text."}) for i in range(3))
+
+    response = client.post(
+        f"/api/v1/assistants/{assistant_id}/knowledge/bulk",
+        files={"file": ("docs.ndjson", body.encode(), "application/x-ndjson")},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["imported"] == 3
+
+
+def test_search_knowledge_returns_scored_chunks(client):
+    assistant_id = client.post(
+        "/api/v1/assistants/", json={"name": "Hybrid Assistant", "hybrid_retrieval": True, "lexical_weight": 2}
+    ).json()["id"]
+
+    response = client.post(f"/api/v1/assistants/{assistant_id}/knowledge/search", json={"query": "SKU-1"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == []
+    assistant = client.get(f"/api/v1/assistants/{assistant_id}").json()
+    assert assistant["hybrid_retrieval"] is True
+    assert assistant["lexical_weight"] == 2
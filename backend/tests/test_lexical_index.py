@@ -0,0 +1,137 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.lexical_index import BM25Index, LexicalIndex
+from app.services.rag import RAGPipeline
+from app.services.vector_store import VectorStore
+
+
+def _point(document_id: uuid.UUID, index: int, text: str):
+    return (
+        VectorStore.chunk_point_id(document_id, index),
+        text,
+        {"document_id": str(document_id), "chunk_index": index, "title": "Doc", "content": text},
+    )
+
+
+def test_bm25_ranks_exact_identifiers_first():
+    index = BM25Index()
+    doc = uuid.uuid4()
+    index.add(
+        [
+            _point(doc, 0, "Warranty terms for all products."),
+            _point(doc, 1, "Product SKU-4411 ships with a two year warranty."),
+            _point(doc, 2, "Shipping is free over 50 euros."),
+        ]
+    )
+
+    results = index.search("warranty for sku-4411", limit=2)
+
+    assert [result["payload"]["chunk_index"] for result in results] == [1, 0]
+
+
+def test_bm25_remove_documents():
+    index = BM25Index()
+    kept, removed = uuid.uuid4(), uuid.uuid4()
+    index.add([_point(kept, 0, "alpha beta"), _point(removed, 0, "alpha gamma")])
+
+    index.remove_documents({str(removed)})
+
+    assert [result["payload"]["document_id"] for result in index.search("alpha", 5)] == [str(kept)]
+    assert "gamma" not in index.postings
+
+
+@pytest.mark.asyncio
+async def test_lexical_index_loads_once_until_stale():
+    lexical = LexicalIndex(refresh_seconds=60)
+    assistant_id, doc = uuid.uuid4(), uuid.uuid4()
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        return [_point(doc, 0, "refund policy")]
+
+    await lexical.search(assistant_id, "refund", 5, loader)
+    lexical.add(assistant_id, [_point(doc, 1, "refund window is 30 days")])
+    results = await lexical.search(assistant_id, "refund", 5, loader)
+
+    assert loads == 1
+    assert len(results) == 2
+
+    lexical.refresh_seconds = -1
+    await lexical.search(assistant_id, "refund", 5, loader)
+    await lexical.wait_for_refreshes()
+    assert loads == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_index_is_served_while_reloading_in_background():
+    lexical = LexicalIndex(refresh_seconds=60)
+    assistant_id, doc = uuid.uuid4(), uuid.uuid4()
+    release = asyncio.Event()
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        if loads > 1:
+            await release.wait()
+        return [_point(doc, 0, "refund policy"), _point(doc, 1, "shipping times")]
+
+    await lexical.search(assistant_id, "refund", 5, loader)
+    lexical.refresh_seconds = 0
+
+    # The reload blocks, yet queries answer from the stale index and only one reload runs.
+    for _ in range(3):
+        assert len(await lexical.search(assistant_id, "refund", 5, loader)) == 1
+    assert (loads, lexical.stats()["refreshing"]) == (2, 1)
+
+    # Changes made during the reload survive the swap.
+    lexical.add(assistant_id, [_point(doc, 2, "refund window is 30 days")])
+    lexical.refresh_seconds = 60
+    release.set()
+    await lexical.wait_for_refreshes()
+
+    assert len(await lexical.search(assistant_id, "refund", 5, loader)) == 2
+    assert len(await lexical.search(assistant_id, "shipping", 5, loader)) == 1
+    assert lexical.stats()["refreshing"] == 0
+
+
+class FixedEmbedder:
+    async def embed(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+class FixedVectorStore:
+    def __init__(self, results):
+        self.results = results
+
+    async def search(self, assistant_id, vector, limit=5, with_vectors=False):
+        return self.results[:limit]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieval_fuses_ranks():
+    doc = uuid.uuid4()
+    points = [_point(doc, i, text) for i, text in enumerate(["general intro", "order A-77 status", "misc"])]
+    vector_results = [
+        {"id": point_id, "score": 0.9 - i / 10, "payload": payload} for i, (point_id, _, payload) in enumerate(points)
+    ]
+    lexical = LexicalIndex()
+
+    async def loader():
+        return points
+
+    rag = RAGPipeline(FixedVectorStore(vector_results), FixedEmbedder(), lexical_index=lexical)
+    rag._load_lexical_points = lambda assistant_id: loader()
+
+    plain = await rag.retrieve(uuid.uuid4(), "A-77", limit=2)
+    fused = await rag.retrieve(uuid.uuid4(), "A-77", limit=2, hybrid=True, vector_weight=1.0, lexical_weight=2.0)
+
+    assert [chunk.content for chunk in plain] == ["general intro", "order A-77 status"]
+    assert fused[0].content == "order A-77 status"
+    assert fused[0].vector_rank == 2 and fused[0].lexical_rank == 1
+    assert fused[0].score == pytest.approx(1 / 62 + 2 / 61)
@@ -0,0 +1,68 @@
+"""Regression benchmark: resolving an assistant must not scale with its history."""
+
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.db import session as db_session
+from app.models import ConversationSession, KnowledgeDocument, Message
+
+
+@contextmanager
+def count_queries():
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+async def _seed(assistant_id: uuid.UUID, sessions: int) -> None:
+    async with db_session.SessionLocal() as db:
+        for index in range(sessions):
+            session = ConversationSession(id=uuid.uuid4(), assistant_id=assistant_id, title=f"Session {index}")
+            db.add(session)
+            db.add(Message(session_id=session.id, role="user", content="question " * 50))
+            db.add(Message(session_id=session.id, role="assistant", content="answer " * 50))
+        db.add(KnowledgeDocument(assistant_id=assistant_id, title=f"Doc {sessions}", content="body " * 2000))
+        await db.commit()
+
+
+def _measure(client, assistant_id: str) -> dict[str, tuple[int, int]]:
+    paths = {
+        "detail": f"/api/v1/assistants/{assistant_id}",
+        "list": "/api/v1/assistants/",
+        "sessions": f"/api/v1/assistants/{assistant_id}/sessions/?limit=20",
+        "knowledge": f"/api/v1/assistants/{assistant_id}/knowledge/?limit=1",
+    }
+    results = {}
+    for name, path in paths.items():
+        with count_queries() as statements:
+            response = client.get(path)
+        assert response.status_code == 200
+        results[name] = (len(statements), len(response.content))
+    return results
+
+
+def test_query_count_and_payload_constant_as_sessions_grow(client, event_loop):
+    assistant_id = client.post("/api/v1/assistants/", json={"name": "Busy Assistant"}).json()["id"]
+    event_loop.run_until_complete(_seed(uuid.UUID(assistant_id), sessions=25))
+    baseline = _measure(client, assistant_id)
+
+    event_loop.run_until_complete(_seed(uuid.UUID(assistant_id), sessions=2000))
+    grown = _measure(client, assistant_id)
+
+    assert {name: queries for name, (queries, _) in grown.items()} == {
+        name: queries for name, (queries, _) in baseline.items()
+    }
+    assert grown["detail"][1] == baseline["detail"][1]
+    assert grown["knowledge"][1] == baseline["knowledge"][1]
+    # Session titles grow by a digit or two; the page size itself is fixed.
+    assert abs(grown["sessions"][1] - baseline["sessions"][1]) < 100
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.services.local_embedder import HashingEmbedder
+
+
+def _cosine(a, b) -> float:
+    return float(np.dot(a, b))
+
+
+def test_vectors_are_normalized_and_deterministic():
+    embedder = HashingEmbedder(dimensions=256)
+    first = embedder.embed_array(["Refunds are processed within 30 days."])
+    second = HashingEmbedder(dimensions=256).embed_array(["Refunds are processed within 30 days."])
+
+    assert first.shape == (1, 256)
+    assert np.linalg.norm(first[0]) == pytest.approx(1.0, abs=1e-5)
+    assert np.array_equal(first, second)
+
+
+def test_similar_texts_score_higher_than_unrelated():
+    embedder = HashingEmbedder(dimensions=512)
+    query, related, unrelated = embedder.embed_array(
+        ["How long do refunds take?", "Refunds take up to 30 days to process.", "Our office is closed on Fridays."]
+    )
+
+    assert _cosine(query, related) > _cosine(query, unrelated) + 0.1
+
+
+def test_anagrams_do_not_collide():
+    embedder = HashingEmbedder(dimensions=512)
+    listen, silent = embedder.embed_array(["listen", "silent"])
+
+    assert _cosine(listen, silent) < 0.5
+
+
+def test_batch_matches_individual_embeddings():
+    embedder = HashingEmbedder(dimensions=128)
+    texts = ["alpha beta", "", "gamma SKU-4411 delta"]
+
+    batch = embedder.embed_array(texts)
+    single = np.vstack([embedder.embed_array([text]) for text in texts])
+
+    assert np.allclose(batch, single)
+    assert not batch[1].any()
+
+
+def test_idf_downweights_common_grams():
+    embedder = HashingEmbedder(dimensions=512, use_idf=True)
+    embedder.embed_array([f"common words here doc{i}" for i in range(50)], learn=True)
+    weighted = embedder.embed_array(["common words here SKU4411"])[0]
+
+    unweighted = HashingEmbedder(dimensions=512).embed_array(["common words here SKU4411"])[0]
+    code = HashingEmbedder(dimensions=512).embed_array(["SKU4411"])[0]
+    assert _cosine(weighted, code) > _cosine(unweighted, code)
+
+
+def test_query_embeddings_do_not_change_idf_statistics():
+    embedder = HashingEmbedder(dimensions=256, use_idf=True)
+    embedder.embed_array(["refund policy", "shipping times"], learn=True)
+
+    first = embedder.embed_array(["refund window"])
+    embedder.embed_array(["refund refund refund"] * 20)
+    assert np.array_equal(embedder.embed_array(["refund window"]), first)
+
+    embedder.embed_array(["refund window details"], learn=True)
+    assert not np.array_equal(embedder.embed_array(["refund window"]), first)
@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+
+from app.services.local_vector_store import LocalVectorStore
+
+
+def _payloads(count: int) -> list[dict]:
+    return [{"content": f"chunk {i}"} for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_search_returns_top_k_by_cosine(tmp_path):
+    store = LocalVectorStore(tmp_path)
+    assistant_id, document_id = uuid.uuid4(), uuid.uuid4()
+    vectors = [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7], [-1.0, 0.0]]
+    await store.upsert_chunks(assistant_id, document_id, vectors, _payloads(4))
+
+    results = await store.search(assistant_id, [2.0, 0.1], limit=2)
+
+    assert [result["payload"]["content"] for result in results] == ["chunk 0", "chunk 2"]
+    assert results[0]["score"] == pytest.approx(0.9988, abs=1e-3)
+    assert results[0]["payload"]["document_id"] == str(document_id)
+    assert await store.search(uuid.uuid4(), [1.0, 0.0]) == []
+
+
+@pytest.mark.asyncio
+async def test_upsert_replaces_points_and_grows_capacity(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.local_vector_store.INITIAL_CAPACITY", 2)
+    store = LocalVectorStore(tmp_path)
+    assistant_id, document_id = uuid.uuid4(), uuid.uuid4()
+    await store.upsert_chunks(assistant_id, document_id, [[1.0, 0.0]] * 3, _payloads(3))
+    await store.upsert_chunks(assistant_id, document_id, [[0.0, 1.0]] * 5, _payloads(5))
+
+    results = await store.search(assistant_id, [0.0, 1.0], limit=10)
+
+    assert len(results) == 5
+    assert all(result["score"] == pytest.approx(1.0) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_delete_and_reload_from_disk(tmp_path):
+    store = LocalVectorStore(tmp_path)
+    assistant_id, kept, removed = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await store.upsert_documents(
+        assistant_id,
+        [(kept, [[1.0, 0.0]], _payloads(1)), (removed, [[0.9, 0.1], [0.8, 0.2]], _payloads(2))],
+    )
+
+    await store.delete_documents(assistant_id, [removed])
+    reopened = LocalVectorStore(tmp_path)
+    results = await reopened.search(assistant_id, [1.0, 0.0], limit=5)
+
+    assert [result["payload"]["document_id"] for result in results] == [str(kept)]
+
+    await reopened.delete_assistant(assistant_id)
+    assert await reopened.search(assistant_id, [1.0, 0.0]) == []
+    assert not (tmp_path / str(assistant_id)).exists()
+
+
+@pytest.mark.asyncio
+async def test_dimension_mismatch_is_rejected(tmp_path):
+    store = LocalVectorStore(tmp_path)
+    assistant_id = uuid.uuid4()
+    await store.upsert_chunks(assistant_id, uuid.uuid4(), [[1.0, 0.0]], _payloads(1))
+
+    with pytest.raises(ValueError):
+        await store.search(assistant_id, [1.0, 0.0, 0.0])
+
+
+@pytest.mark.asyncio
+async def test_metadata_changes_are_appended_and_compacted(tmp_path, monkeypatch):
+    store = LocalVectorStore(tmp_path)
+    assistant_id = uuid.uuid4()
+    documents = [uuid.uuid4() for _ in range(4)]
+    await store.upsert_chunks(assistant_id, documents[0], [[1.0, 0.0]], _payloads(1))
+    snapshot = (tmp_path / str(assistant_id) / "meta.json").read_text()
+
+    # Later mutations only append to the log; the snapshot is not rewritten.
+    for document_id in documents[1:]:
+        await store.upsert_chunks(assistant_id, document_id, [[0.0, 1.0], [0.6, 0.8]], _payloads(2))
+    await store.delete_documents(assistant_id, [documents[1]])
+    await store.upsert_chunks(assistant_id, documents[1], [[0.0, 1.0]], _payloads(1))
+    assert (tmp_path / str(assistant_id) / "meta.json").read_text() == snapshot
+
+    expected = await store.search(assistant_id, [0.0, 1.0], limit=10)
+    reopened = LocalVectorStore(tmp_path)
+    assert await reopened.search(assistant_id, [0.0, 1.0], limit=10) == expected
+    assert len(expected) == 6
+
+    # Once the log outgrows the snapshot it is folded into it.
+    monkeypatch.setattr("app.services.local_vector_store.META_COMPACT_MIN_BYTES", 0)
+    await reopened.delete_documents(assistant_id, [documents[2]])
+    directory = tmp_path / str(assistant_id)
+    assert [path.name for path in directory.glob("meta*")] == ["meta.json"]
+    assert len(await LocalVectorStore(tmp_path).search(assistant_id, [0.0, 1.0], limit=10)) == 4
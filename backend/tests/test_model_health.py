@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import openai_client
+from app.services.model_health import CircuitBreaker, LatencyWindow
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes_after_recovery():
+    breaker = CircuitBreaker("gpt", failure_threshold=2, recovery_seconds=0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.STATE_HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.STATE_CLOSED
+    stats = breaker.stats()
+    assert stats["transitions"] == {
+        "closed->open": 1,
+        "open->half_open": 2,
+        "half_open->open": 1,
+        "half_open->closed": 1,
+    }
+    assert stats["rejected"] == 1
+
+
+def test_open_circuit_rejects_until_recovery():
+    breaker = CircuitBreaker("gpt", failure_threshold=1, recovery_seconds=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+
+
+def test_latency_window_percentiles():
+    window = LatencyWindow(size=100, min_samples=10)
+    assert window.percentile(95) is None
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+    assert window.percentile(95) == pytest.approx(0.09505)
+    assert window.stats()["samples"] == 100
+
+
+def _client(handler, **settings):
+    client = openai_client.OpenAIClient()
+    client.settings = client.settings.model_copy(
+        update={"openai_api_key": "test-key", "openai_model": "primary", "openai_fallback_model": "backup", **settings}
+    )
+    client._single_flight = None
+    client._http_client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+    return client
+
+
+def _answer(model: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": model}}]})
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    primary_cancelled = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        if model == "primary":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                primary_cancelled.set()
+                raise
+        return _answer(model)
+
+    client = _client(handler, openai_hedging_enabled=True, openai_hedge_min_delay_seconds=0.01)
+    assert await client.complete("hi") == "backup"
+    await asyncio.wait_for(primary_cancelled.wait(), timeout=1)
+
+    metrics = client.metrics()
+    assert metrics["hedging"] == {"enabled": True, "hedged": 1, "fallback_wins": 1}
+    assert metrics["models"]["primary"]["circuit"]["state"] == "closed"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failing_primary_is_skipped_once_circuit_opens():
+    calls: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        calls.append(model)
+        return httpx.Response(503) if model == "primary" else _answer(model)
+
+    client = _client(handler, openai_circuit_failure_threshold=2, openai_circuit_recovery_seconds=60)
+    client._scheduler.max_retries = 0
+    for _ in range(3):
+        assert await client.complete("hi") == "backup"
+
+    assert calls == ["primary", "backup", "primary", "backup", "backup"]
+    assert client.metrics()["models"]["primary"]["circuit"]["state"] == "open"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(400, json={"error": {"code": "context_length_exceeded"}}),
+        httpx.Response(429, json={"error": {"code": "rate_limit_exceeded"}}),
+        httpx.Response(503, headers={"retry-after": "1"}),
+    ],
+    ids=["invalid", "rate-limited", "overloaded-with-retry-after"],
+)
+async def test_request_and_rate_limit_errors_do_not_trip_the_circuit_or_fall_back(response):
+    calls: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["model"])
+        return response
+
+    client = _client(handler, openai_circuit_failure_threshold=2)
+    client._scheduler.max_retries = 0
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.complete("hi")
+
+    assert calls == ["primary"] * 3
+    circuit = client.metrics()["models"]["primary"]["circuit"]
+    assert (circuit["state"], circuit["consecutive_failures"]) == ("closed", 0)
+    await client.aclose()
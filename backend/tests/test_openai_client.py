@@ -0,0 +1,101 @@
+import json
+
+import httpx
+import pytest
+
+from app.services import openai_client
+
+
+@pytest.mark.asyncio
+async def test_openai_client_is_shared_until_closed():
+    first = await openai_client.get_openai_client()
+    second = await openai_client.get_openai_client()
+    assert first is second
+
+    stats = first.pool_stats()
+    assert stats["max_connections"] == first.settings.openai_max_connections
+    assert stats["requests_in_flight"] == 0
+    assert stats["closed"] is False
+
+    await openai_client.close_openai_client()
+    assert first.is_closed
+    third = await openai_client.get_openai_client()
+    assert third is not first
+    await openai_client.close_openai_client()
+
+
+def test_metrics_endpoint(client):
+    response = client.get("/api/v1/metrics/")
+    assert response.status_code == 200
+    assert "pool" in response.json()["openai"]
+
+
+@pytest.mark.asyncio
+async def test_stream_complete_parses_sse_deltas():
+    chunks = [
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+        'data: {"choices": [{"delta": {"content": "lo"}}]}',
+        'data: {"choices": [], "usage": {"prompt_tokens": 10, "prompt_tokens_details": {"cached_tokens": 0}}}',
+        "data: [DONE]",
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        assert payload["stream"] is True
+        assert payload["stream_options"] == {"include_usage": True}
+        return httpx.Response(200, text="\n\n".join(chunks) + "\n\n")
+
+    client = openai_client.OpenAIClient()
+    client.settings = client.settings.model_copy(update={"openai_api_key": "test-key"})
+    client._http_client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+
+    tokens = [token async for token in client.stream_complete("Say hello")]
+
+    assert tokens == ["Hel", "lo"]
+    assert client.usage_stats()["prompt_tokens"] == 10
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_complete_sends_messages_and_records_cached_tokens():
+    messages = [
+        {"role": "system", "content": "You answer billing questions."},
+        {"role": "user", "content": "Refund time?"},
+    ]
+    usage = {"prompt_tokens": 1200, "completion_tokens": 20, "prompt_tokens_details": {"cached_tokens": 1024}}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["messages"] == messages
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Five days."}}], "usage": usage})
+
+    client = openai_client.OpenAIClient()
+    client.settings = client.settings.model_copy(update={"openai_api_key": "test-key"})
+    client._http_client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+
+    assert await client.complete(messages) == "Five days."
+
+    stats = client.metrics()["usage"]
+    assert (stats["prompt_tokens"], stats["cached_tokens"], stats["completion_tokens"]) == (1200, 1024, 20)
+    assert stats["cached_ratio"] == round(1024 / 1200, 4)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_embed_requests_reduced_dimensions():
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        assert payload["dimensions"] == 256
+        return httpx.Response(200, json={"data": [{"embedding": [0.1] * 256} for _ in payload["input"]]})
+
+    client = openai_client.OpenAIClient()
+    client.settings = client.settings.model_copy(
+        update={"openai_api_key": "test-key", "embedding_dimensions": 256, "embedding_request_dimensions": True}
+    )
+    client._http_client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+
+    vectors = await client._embed_upstream(["hello"])
+
+    assert len(vectors[0]) == 256
+    assert client._embedding_cache_key() == f"{client.settings.embedding_model}:256"
+    await client.aclose()
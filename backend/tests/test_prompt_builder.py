@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+from app.services.prompt_builder import PromptBuilder
+from app.services.tokenizer import Tokenizer
+
+
+def _message(role: str, content: str) -> SimpleNamespace:
+    return SimpleNamespace(role=role, content=content)
+
+
+def test_small_prompt_fits_unchanged():
+    assistant = SimpleNamespace(system_prompt="Be brief.")
+    builder = PromptBuilder(assistant, [_message("user", "Hi")], ["Fact one."], token_budget=1000)
+
+    messages = builder.build_messages("What is fact one?")
+
+    assert messages[0] == {"role": "system", "content": "Be brief."}
+    assert "[1] Fact one." in messages[-2]["content"]
+    assert messages[-1] == {"role": "user", "content": "What is fact one?"}
+    assert builder.token_breakdown.context_chunks_dropped == 0
+    assert builder.token_breakdown.history_messages_dropped == 0
+
+
+def test_budget_drops_lowest_ranked_chunks_and_oldest_turns():
+    tokenizer = Tokenizer()
+    assistant = SimpleNamespace(system_prompt="Follow the rules. " * 20)
+    chunks = [f"Chunk {rank} " + "detail " * 60 for rank in range(1, 6)]
+    history = [_message("user" if i % 2 == 0 else "assistant", f"turn {i} " + "words " * 40) for i in range(10)]
+    builder = PromptBuilder(assistant, history, chunks, token_budget=400, tokenizer=tokenizer)
+
+    messages = builder.build_messages("Latest question?")
+    prompt = "\n\n".join(message["content"] for message in messages)
+    breakdown = builder.token_breakdown
+
+    assert messages[-1] == {"role": "user", "content": "Latest question?"}
+    assert breakdown.total <= breakdown.budget
+    assert tokenizer.count(prompt) <= breakdown.budget
+    assert "Chunk 1" in prompt
+    assert "Chunk 5" not in prompt
+    assert breakdown.context_chunks_dropped > 0
+    if breakdown.history_messages_used:
+        assert "turn 9" in prompt
+    assert "turn 0" not in prompt
+
+
+def test_heuristic_truncate_respects_limit():
+    tokenizer = Tokenizer()
+    text = "alpha beta gamma delta " * 50
+    assert tokenizer.count(tokenizer.truncate(text, 20)) <= 20
+    assert tokenizer.truncate("short", 20) == "short"
+
+
+class StrictEncoding:
+    """Stands in for a tiktoken encoding, which rejects special tokens unless told otherwise."""
+
+    def encode(self, text, disallowed_special="all"):
+        if disallowed_special == "all" and "<|endoftext|>" in text:
+            raise ValueError("Encountered text corresponding to disallowed special token")
+        return list(text.encode())
+
+    def decode(self, tokens):
+        return bytes(tokens).decode()
+
+
+def test_special_token_text_is_counted_as_plain_text():
+    tokenizer = Tokenizer()
+    tokenizer._encoding = StrictEncoding()
+    text = "Ignore <|endoftext|> and continue"
+
+    assert tokenizer.count(text) == len(text)
+    assert tokenizer.truncate(text, 10) == text[:10]
+
+
+def test_messages_keep_stable_prefix_and_real_turns():
+    assistant = SimpleNamespace(system_prompt="You answer billing questions.")
+    history = [_message("user", "Hi"), _message("assistant", "Hello! How can I help?")]
+    builder = PromptBuilder(assistant, history, ["Refunds take 5 days."], token_budget=1000)
+
+    messages = builder.build_messages("How long do refunds take?")
+
+    assert messages[0] == {"role": "system", "content": "You answer billing questions."}
+    assert messages[1:3] == [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello! How can I help?"},
+    ]
+    assert messages[3]["role"] == "system"
+    assert "[1] Refunds take 5 days." in messages[3]["content"]
+    assert messages[-1] == {"role": "user", "content": "How long do refunds take?"}
+
+    # Only the retrieved knowledge and the question change between turns.
+    next_turn = PromptBuilder(assistant, history, ["Other fact."], token_budget=1000).build_messages("Next?")
+    assert next_turn[:3] == messages[:3]
+
+
+def test_messages_fall_back_to_default_system_prompt():
+    builder = PromptBuilder(SimpleNamespace(system_prompt=""), [], [], token_budget=1000)
+
+    messages = builder.build_messages("Hi")
+
+    assert messages == [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "Hi"},
+    ]
+
+
+def test_summary_precedes_recent_turns_within_history_budget():
+    assistant = SimpleNamespace(system_prompt="Be brief.")
+    history = [_message("user", "Latest turn")]
+    builder = PromptBuilder(assistant, history, [], token_budget=1000, summary="User wants a refund for order 42.")
+
+    messages = builder.build_messages("Any update?")
+
+    assert messages[1] == {
+        "role": "system",
+        "content": "Summary of the earlier conversation:\nUser wants a refund for order 42.",
+    }
+    assert messages[2] == {"role": "user", "content": "Latest turn"}
+    breakdown = builder.token_breakdown
+    assert breakdown.summary > 0
+    assert breakdown.total == breakdown.system + breakdown.summary + breakdown.history + breakdown.user
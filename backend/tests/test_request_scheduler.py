@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.request_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+    parse_reset,
+    parse_retry_after,
+)
+
+
+def test_parse_rate_limit_headers():
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("6m0s") == pytest.approx(360)
+    assert parse_reset("1.5s") == pytest.approx(1.5)
+    assert parse_reset(None) is None
+    assert parse_retry_after(httpx.Headers({"retry-after": "3"})) == 3
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "250", "retry-after": "3"})) == 0.25
+    assert parse_retry_after(httpx.Headers({})) is None
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_the_queue():
+    scheduler = RequestScheduler(max_concurrency=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot():
+            await release.wait()
+
+    async def run(name: str, priority: int):
+        async with scheduler.slot(priority):
+            order.append(name)
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.ensure_future(run("ingest-1", PRIORITY_BACKGROUND)),
+        asyncio.ensure_future(run("ingest-2", PRIORITY_BACKGROUND)),
+        asyncio.ensure_future(run("chat", PRIORITY_INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    stats = scheduler.stats()
+    assert stats["queue_depth"] == 3
+    assert stats["queued_background"] == 2
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+    assert order == ["chat", "ingest-1", "ingest-2"]
+    assert scheduler.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_requests_back_off_and_shrink_concurrency():
+    scheduler = RequestScheduler(max_concurrency=8, backoff_base=0.001)
+    responses = [
+        httpx.Response(429, headers={"retry-after-ms": "10"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"ok": True}),
+    ]
+
+    async def send():
+        return responses.pop(0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    response = await scheduler.send(send)
+
+    assert response.status_code == 200
+    assert loop.time() - started >= 0.01
+    stats = scheduler.stats()
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 2
+    assert stats["concurrency_limit"] == 4
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded():
+    scheduler = RequestScheduler(max_retries=1, backoff_base=0.001)
+    calls = 0
+
+    async def send():
+        nonlocal calls
+        calls += 1
+        return httpx.Response(500)
+
+    response = await scheduler.send(send)
+    assert response.status_code == 500
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_token_budget_holds_dispatch_until_reset():
+    scheduler = RequestScheduler()
+    scheduler.observe(
+        httpx.Response(
+            200, headers={"x-ratelimit-remaining-tokens": "100", "x-ratelimit-reset-tokens": "50ms"}
+        )
+    )
+    assert scheduler.stats()["remaining_tokens"] == 100
+
+    loop = asyncio.get_running_loop()
+    async with scheduler.slot(tokens=80):
+        pass
+    started = loop.time()
+    async with scheduler.slot(tokens=80):
+        pass
+    assert loop.time() - started >= 0.04
@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+
+from app.schemas import RetrievedChunk
+from app.services.rag import RAGPipeline
+from app.services.reranking import Reranker, lexical_overlap
+
+
+def _chunk(content: str, score: float, vector_score: float | None = None) -> RetrievedChunk:
+    return RetrievedChunk(
+        id=str(uuid.uuid4()),
+        content=content,
+        score=score,
+        vector_score=score if vector_score is None else vector_score,
+    )
+
+
+def test_mmr_skips_near_duplicates():
+    reranker = Reranker(mmr_lambda=0.5)
+    candidates = [_chunk("refund policy", 0.95), _chunk("refund policy copy", 0.94), _chunk("shipping", 0.80)]
+    vectors = [[1.0, 0.0], [1.0, 0.01], [0.0, 1.0]]
+
+    result = reranker.rerank("refunds", candidates, vectors, limit=2)
+
+    assert [chunk.content for chunk in result] == ["refund policy", "shipping"]
+    assert result[0].rerank_score == pytest.approx(1.0)
+
+
+def test_min_score_drops_weak_vector_hits_but_keeps_lexical_hits():
+    reranker = Reranker(min_score=0.5)
+    lexical_only = RetrievedChunk(id="x", content="SKU-9", score=0.02, lexical_rank=1, lexical_score=3.0)
+    candidates = [_chunk("strong", 0.03, vector_score=0.8), _chunk("weak", 0.025, vector_score=0.2), lexical_only]
+
+    result = reranker.rerank("SKU-9", candidates, [[1.0, 0.0], [0.0, 1.0], None], limit=5)
+
+    assert [chunk.content for chunk in result] == ["strong", "SKU-9"]
+
+
+def test_negative_similarities_are_kept_without_a_floor():
+    candidates = [_chunk("opposite", -0.2, vector_score=-0.2), _chunk("orthogonal", -0.05, vector_score=-0.05)]
+
+    result = Reranker().rerank("query", candidates, [[1.0, 0.0], [0.0, 1.0]], limit=5)
+
+    assert sorted(chunk.content for chunk in result) == ["opposite", "orthogonal"]
+
+
+def test_lexical_rescoring_promotes_term_matches():
+    reranker = Reranker(mmr_lambda=1.0, lexical_weight=0.6)
+    candidates = [_chunk("general shipping info", 0.9), _chunk("order A-77 was shipped", 0.7)]
+
+    result = reranker.rerank("where is order A-77", candidates, [None, None], limit=1)
+
+    assert result[0].content == "order A-77 was shipped"
+    assert lexical_overlap("order A-77", "A-77 order") == 1.0
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def search(self, assistant_id, vector, limit=5, with_vectors=False):
+        self.calls.append((limit, with_vectors))
+        return [
+            {"id": str(i), "score": 0.9, "payload": {"content": "same text"}, "vector": [1.0, 0.0]} for i in range(3)
+        ] + [{"id": "3", "score": 0.6, "payload": {"content": "other"}, "vector": [0.0, 1.0]}]
+
+
+class Embedder:
+    async def embed(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_overfetches_and_diversifies():
+    store = RecordingStore()
+    rag = RAGPipeline(store, Embedder(), reranker=Reranker(mmr_lambda=0.5, overfetch=4))
+
+    chunks = await rag.retrieve(uuid.uuid4(), "question", limit=2)
+
+    assert store.calls == [(8, True)]
+    assert [chunk.content for chunk in chunks] == ["same text", "other"]
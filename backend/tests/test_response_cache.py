@@ -0,0 +1,54 @@
+import uuid
+from http import HTTPStatus
+
+from app.services.response_cache import SemanticResponseCache
+
+
+def test_hit_requires_similarity_and_matching_fingerprint():
+    cache = SemanticResponseCache(threshold=0.9)
+    assistant_id = uuid.uuid4()
+    cache.set(assistant_id, "v1", [1.0, 0.0], "Refunds take 30 days.")
+
+    assert cache.get(assistant_id, "v1", [0.99, 0.05]) == "Refunds take 30 days."
+    assert cache.get(assistant_id, "v1", [0.5, 0.5]) is None
+    assert cache.get(assistant_id, "v2", [1.0, 0.0]) is None
+    assert cache.get(uuid.uuid4(), "v1", [1.0, 0.0]) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_lru_and_invalidation():
+    cache = SemanticResponseCache(threshold=0.9, max_entries=2)
+    first, second = uuid.uuid4(), uuid.uuid4()
+    cache.set(first, "v", [1.0, 0.0], "a")
+    cache.set(first, "v", [0.0, 1.0], "b")
+    assert cache.get(first, "v", [1.0, 0.0]) == "a"
+    cache.set(second, "v", [1.0, 0.0], "c")
+
+    assert cache.get(first, "v", [0.0, 1.0]) is None
+    assert cache.get(first, "v", [1.0, 0.0]) == "a"
+
+    cache.invalidate(first)
+    assert cache.get(first, "v", [1.0, 0.0]) is None
+    assert cache.stats()["entries"] == 1
+
+    cache.ttl_seconds = -1
+    assert cache.get(second, "v", [1.0, 0.0]) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_chat_reuses_cached_answer_until_assistant_changes(client):
+    assistant_id = client.post(
+        "/api/v1/assistants/", json={"name": "FAQ Assistant", "response_cache_enabled": True}
+    ).json()["id"]
+    question = {"user_message": "What is the refund window?"}
+
+    first = client.post(f"/api/v1/chat/assistants/{assistant_id}", json=question).json()
+    second = client.post(f"/api/v1/chat/assistants/{assistant_id}", json=question).json()
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["assistant_message"] == first["assistant_message"]
+
+    response = client.put(f"/api/v1/assistants/{assistant_id}", json={"system_prompt": "Be brief."})
+    assert response.status_code == HTTPStatus.OK
+    third = client.post(f"/api/v1/chat/assistants/{assistant_id}", json=question).json()
+    assert third["cache_hit"] is False
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import openai_client
+from app.services.single_flight import SingleFlight, payload_key
+
+
+def test_payload_key_ignores_key_order():
+    assert payload_key({"a": 1, "b": [1, 2]}) == payload_key({"b": [1, 2], "a": 1})
+    assert payload_key({"a": 1}) != payload_key({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "answer"
+
+    waiters = [asyncio.ensure_future(flight.do("key", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["answer"] * 5
+    assert calls == 1
+    assert flight.stats() == {"calls": 5, "upstream_calls": 1, "deduplicated": 4, "in_flight": 0}
+
+    assert await flight.do("key", fetch) == "answer"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["upstream_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "answer"
+
+    first = asyncio.ensure_future(flight.do("key", fetch))
+    second = asyncio.ensure_future(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "answer"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_identical_completions_are_coalesced():
+    requests = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        await asyncio.sleep(0.01)
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"re: {prompt}"}}]})
+
+    client = openai_client.OpenAIClient()
+    client.settings = client.settings.model_copy(update={"openai_api_key": "test-key"})
+    client._http_client = httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(handler))
+
+    answers = await asyncio.gather(*(client.complete("hours?") for _ in range(4)), client.complete("refunds?"))
+
+    assert answers == ["re: hours?"] * 4 + ["re: refunds?"]
+    assert requests == 2
+    assert client.metrics()["single_flight"]["deduplicated"] == 3
+    await client.aclose()
@@ -0,0 +1,165 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from app.db import session as db_session
+from app.models import Assistant, ConversationSession, Message
+from app.models.assistant import utcnow
+from app.services.conversation import ConversationService
+from app.services.request_scheduler import PRIORITY_BACKGROUND
+from app.services.summarizer import ConversationSummarizer
+
+
+class RecordingClient:
+    def __init__(self) -> None:
+        self.prompts: list[list[dict]] = []
+        self.priorities: list[int] = []
+
+    async def complete(self, prompt, priority=0, **_: object) -> str:
+        self.prompts.append(prompt)
+        self.priorities.append(priority)
+        return f"summary {len(self.prompts)}"
+
+
+async def _seed_session(messages: int) -> uuid.UUID:
+    async with db_session.SessionLocal() as db:
+        assistant = Assistant(id=uuid.uuid4(), name="Summary Assistant")
+        session = ConversationSession(id=uuid.uuid4(), assistant_id=assistant.id)
+        db.add_all([assistant, session])
+        await _add_messages(db, session.id, 0, messages)
+        await db.commit()
+        return session.id
+
+
+async def _add_messages(db, session_id: uuid.UUID, start: int, count: int) -> None:
+    base = utcnow()
+    db.add_all(
+        Message(
+            session_id=session_id,
+            role="user" if index % 2 == 0 else "assistant",
+            content=f"message {index}",
+            created_at=base + timedelta(milliseconds=index),
+        )
+        for index in range(start, start + count)
+    )
+
+
+def _summarizer(client: RecordingClient) -> ConversationSummarizer:
+    async def factory() -> RecordingClient:
+        return client
+
+    return ConversationSummarizer(history_window=10, trigger=5, batch_size=12, client_factory=factory)
+
+
+@pytest.mark.asyncio
+async def test_compaction_folds_overflow_incrementally():
+    session_id = await _seed_session(40)
+    client = RecordingClient()
+
+    folded = await _summarizer(client).compact(session_id)
+
+    # 30 messages beyond the window, folded 12 + 12 + 6; each call extends the previous summary.
+    assert folded == 30
+    assert len(client.prompts) == 3
+    assert "Current summary:\n(none)" in client.prompts[0][1]["content"]
+    assert "Current summary:\nsummary 1" in client.prompts[1][1]["content"]
+    assert "User: message 24" in client.prompts[2][1]["content"]
+    assert "message 30" not in client.prompts[2][1]["content"]
+    assert set(client.priorities) == {PRIORITY_BACKGROUND}
+
+    async with db_session.SessionLocal() as db:
+        session = await db.get(ConversationSession, session_id)
+        assert (session.summary, session.summarized_messages) == ("summary 3", 30)
+        service = ConversationService(db, assistant=None, rag_pipeline=None, openai_client=None)
+        history = await service.load_history(session)
+        assert [message.content for message in history] == [f"message {i}" for i in range(30, 40)]
+
+
+@pytest.mark.asyncio
+async def test_compaction_waits_for_trigger_and_only_sends_new_turns():
+    session_id = await _seed_session(15)
+    client = RecordingClient()
+    summarizer = _summarizer(client)
+
+    assert await summarizer.compact(session_id) == 0
+    assert client.prompts == []
+
+    async with db_session.SessionLocal() as db:
+        await _add_messages(db, session_id, 15, 1)
+        await db.commit()
+    assert await summarizer.compact(session_id) == 6
+
+    async with db_session.SessionLocal() as db:
+        await _add_messages(db, session_id, 16, 6)
+        await db.commit()
+    assert await summarizer.compact(session_id) == 6
+    second = client.prompts[-1][1]["content"]
+    assert "Current summary:\nsummary 1" in second
+    assert "message 5" not in second
+    assert "message 6" in second and "message 11" in second
+
+
+@pytest.mark.asyncio
+async def test_background_worker_deduplicates_scheduled_sessions():
+    session_id = await _seed_session(20)
+    client = RecordingClient()
+    summarizer = _summarizer(client)
+
+    summarizer.schedule(session_id)  # ignored until started
+    await summarizer.start()
+    try:
+        summarizer.schedule(session_id)
+        summarizer.schedule(session_id)
+        assert summarizer.stats()["queued"] == 1
+        await summarizer.join()
+    finally:
+        await summarizer.stop()
+
+    stats = summarizer.stats()
+    assert (stats["batches"], stats["summarized_messages"], stats["running"]) == (1, 10, False)
+
+
+@pytest.mark.asyncio
+async def test_messages_sharing_the_boundary_timestamp_are_not_lost():
+    session_id = await _seed_session(0)
+    created_at = utcnow()
+    async with db_session.SessionLocal() as db:
+        db.add_all(
+            Message(session_id=session_id, role="user", content=f"same instant {index:02d}", created_at=created_at)
+            for index in range(16)
+        )
+        await db.commit()
+    client = RecordingClient()
+
+    assert await _summarizer(client).compact(session_id) == 6
+
+    async with db_session.SessionLocal() as db:
+        session = await db.get(ConversationSession, session_id)
+        service = ConversationService(db, assistant=None, rag_pipeline=None, openai_client=None)
+        history = await service.load_history(session, limit=50)
+    folded = client.prompts[0][1]["content"]
+    assert len(history) == 10
+    assert not any(message.content in folded for message in history)
+
+
+@pytest.mark.asyncio
+async def test_history_window_widens_only_while_compaction_is_due():
+    session_id = await _seed_session(0)
+    client = RecordingClient()
+    summarizer = _summarizer(client)
+    async with db_session.SessionLocal() as db:
+        session = await db.get(ConversationSession, session_id)
+        service = ConversationService(db, assistant=None, rag_pipeline=None, openai_client=None, summarizer=summarizer)
+        window = service.history_window
+
+        assert service.history_limit(session) == window
+
+        await summarizer.start()
+        try:
+            summarizer.schedule(session_id)
+            assert service.history_limit(session) == window + service.summary_trigger
+            await summarizer.join()
+        finally:
+            await summarizer.stop()
+        assert service.history_limit(session) == window
@@ -0,0 +1,267 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+from app.services import vector_store
+from app.services.vector_store import QdrantVectorStore
+
+
+class FakeQdrant:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.collections: dict[str, int] = {}
+        self.options: dict[str, dict] = {}
+        self.payload_indexes: dict[str, list[str]] = {}
+        self.shard_keys: set[str] = set()
+        self.points: dict[str, list[SimpleNamespace]] = {}
+
+    def _check_shard_key(self, shard_key_selector=None) -> None:
+        if shard_key_selector is not None and shard_key_selector not in self.shard_keys:
+            content = f'{{"status": {{"error": "Shard key {shard_key_selector} not found"}}}}'.encode()
+            raise UnexpectedResponse(404, "Not Found", content, {})
+
+    async def get_collections(self):
+        self.calls.append("get_collections")
+        return SimpleNamespace(collections=[SimpleNamespace(name=name) for name in self.collections])
+
+    async def get_collection(self, name):
+        self.calls.append("get_collection")
+        params = SimpleNamespace(
+            vectors=SimpleNamespace(size=self.collections[name]),
+            sharding_method=self.options.get(name, {}).get("sharding_method"),
+        )
+        return SimpleNamespace(config=SimpleNamespace(params=params))
+
+    async def create_collection(self, name, vectors_config, **options):
+        self.calls.append("create_collection")
+        self.collections[name] = vectors_config.size
+        self.options[name] = options
+
+    async def update_collection(self, name, **options):
+        self.calls.append("update_collection")
+        self.options.setdefault(name, {}).update(options)
+
+    async def create_payload_index(self, name, field_name, field_schema):
+        self.calls.append("create_payload_index")
+        self.payload_indexes.setdefault(name, []).append(field_name)
+
+    async def create_shard_key(self, name, shard_key):
+        self.calls.append("create_shard_key")
+        self.shard_keys.add(shard_key)
+
+    async def delete_shard_key(self, name, shard_key):
+        self.calls.append("delete_shard_key")
+        self._check_shard_key(shard_key)
+        self.shard_keys.discard(shard_key)
+
+    async def delete_collection(self, name):
+        self.calls.append("delete_collection")
+        self.collections.pop(name, None)
+
+    async def search(self, **kwargs):
+        self.calls.append("search")
+        self._check_shard_key(kwargs.get("shard_key_selector"))
+        self.last_search = kwargs
+        return []
+
+    async def upsert(self, collection_name, points, shard_key_selector=None):
+        self.calls.append("upsert")
+        self._check_shard_key(shard_key_selector)
+        self.points.setdefault(collection_name, []).extend(points)
+
+    async def delete(self, collection_name, points_selector, shard_key_selector=None):
+        self.calls.append("delete")
+        self._check_shard_key(shard_key_selector)
+        assistant_id = points_selector.filter.must[0].match.value
+        self.points[collection_name] = [
+            point for point in self.points.get(collection_name, []) if point.payload["assistant_id"] != assistant_id
+        ]
+
+    async def scroll(self, collection_name, offset=None, **_):
+        return list(self.points.get(collection_name, [])), None
+
+
+@pytest.mark.asyncio
+async def test_collection_is_checked_once():
+    store = QdrantVectorStore()
+    store.client = FakeQdrant()
+
+    await store.search(uuid.uuid4(), [0.0] * 8)
+    await store.search(uuid.uuid4(), [0.0] * 8)
+
+    assert store.client.calls == [
+        "get_collections",
+        "create_collection",
+        "create_payload_index",
+        "create_payload_index",
+        "search",
+        "search",
+    ]
+    assert store.vector_size == 8
+    assert store.client.payload_indexes[QdrantVectorStore.COLLECTION_NAME] == ["assistant_id", "document_id"]
+
+
+@pytest.mark.asyncio
+async def test_vector_size_mismatch_requires_recreate():
+    store = QdrantVectorStore()
+    store.client = FakeQdrant()
+    store.client.collections[QdrantVectorStore.COLLECTION_NAME] = 4
+
+    with pytest.raises(ValueError):
+        await store.ensure_collection(8)
+
+    await store.recreate_collection(8)
+    assert store.client.collections[QdrantVectorStore.COLLECTION_NAME] == 8
+    assert store.vector_size == 8
+
+
+@pytest.mark.asyncio
+async def test_upsert_documents_sends_batched_point_lists():
+    store = QdrantVectorStore()
+    store.client = FakeQdrant()
+    store.upsert_batch_size = 3
+    batches: list[int] = []
+
+    async def upsert(collection_name, points):
+        batches.append(len(points))
+
+    store.client.upsert = upsert
+    documents = [(uuid.uuid4(), [[1.0, 0.0]] * 4, [{"content": f"chunk {i}"} for i in range(4)]) for _ in range(2)]
+
+    ids = await store.upsert_documents(uuid.uuid4(), documents)
+
+    assert batches == [3, 3, 2]
+    assert len(set(ids)) == 8
+
+
+@pytest.mark.asyncio
+async def test_delete_documents_filters_by_assistant_and_document():
+    store = QdrantVectorStore()
+    store.client = FakeQdrant()
+    await store.ensure_collection(2)
+    deletes = []
+
+    async def delete(collection_name, points_selector):
+        deletes.append(points_selector.filter)
+
+    store.client.delete = delete
+    assistant_id, document_id = uuid.uuid4(), uuid.uuid4()
+
+    await store.delete_documents(assistant_id, [document_id])
+
+    (points_filter,) = deletes
+    assert [condition.key for condition in points_filter.must] == ["assistant_id", "document_id"]
+    assert points_filter.must[1].match.any == [str(document_id)]
+
+
+def _store(monkeypatch, **overrides) -> QdrantVectorStore:
+    settings = vector_store.get_settings().model_copy(update=overrides)
+    monkeypatch.setattr(vector_store, "get_settings", lambda: settings)
+    store = QdrantVectorStore()
+    store.client = FakeQdrant()
+    return store
+
+
+@pytest.mark.asyncio
+async def test_hnsw_and_search_parameters_come_from_settings(monkeypatch):
+    store = _store(
+        monkeypatch, qdrant_hnsw_m=32, qdrant_hnsw_ef_construct=200, qdrant_search_ef=128, qdrant_exact_search=True
+    )
+
+    await store.search(uuid.uuid4(), [0.0] * 4)
+
+    hnsw = store.client.options[QdrantVectorStore.COLLECTION_NAME]["hnsw_config"]
+    assert (hnsw.m, hnsw.ef_construct, hnsw.payload_m) == (32, 200, None)
+    params = store.client.last_search["search_params"]
+    assert (params.hnsw_ef, params.exact) == (128, True)
+
+    per_tenant = _store(monkeypatch, qdrant_hnsw_per_tenant=True).hnsw_config
+    assert (per_tenant.m, per_tenant.payload_m) == (0, 32)
+
+
+def _point(assistant_id: uuid.UUID, document_id: uuid.UUID) -> SimpleNamespace:
+    return SimpleNamespace(payload={"assistant_id": str(assistant_id), "document_id": str(document_id)})
+
+
+@pytest.mark.asyncio
+async def test_dedicated_assistants_get_their_own_collection(monkeypatch):
+    large, document_id = uuid.uuid4(), uuid.uuid4()
+    store = _store(monkeypatch, qdrant_dedicated_assistants=f"{large}, ")
+    dedicated = f"{QdrantVectorStore.COLLECTION_NAME}__{large.hex}"
+    # Points written while the assistant still lived in the shared collection.
+    await store.ensure_collection(2)
+    store.client.points[QdrantVectorStore.COLLECTION_NAME] = [_point(large, document_id)]
+
+    # Searching does not create the collection, and the shared copies no longer count.
+    assert await store.search(large, [0.0] * 2) == []
+    assert dedicated not in store.client.collections
+    assert await store.document_point_counts() == {}
+
+    # Re-ingesting creates the dedicated collection and drops the shared copies.
+    await store.upsert_chunks(large, document_id, [[1.0, 0.0]], [{"content": "chunk"}])
+    assert store.client.payload_indexes[dedicated] == ["assistant_id", "document_id"]
+    assert store.client.points[QdrantVectorStore.COLLECTION_NAME] == []
+    assert await store.document_point_counts() == {(str(large), str(document_id)): 1}
+
+    await store.search(large, [0.0] * 2)
+    assert store.client.last_search["collection_name"] == dedicated
+    await store.search(uuid.uuid4(), [0.0] * 2)
+    assert store.client.last_search["collection_name"] == QdrantVectorStore.COLLECTION_NAME
+
+    await store.delete_assistant(large)
+    assert dedicated not in store.client.collections
+
+
+@pytest.mark.asyncio
+async def test_shard_key_partitioning_routes_by_assistant(monkeypatch):
+    store = _store(monkeypatch, qdrant_partitioning="shard_key")
+    assistant_id, empty = uuid.uuid4(), uuid.uuid4()
+
+    await store.upsert_chunks(assistant_id, uuid.uuid4(), [[1.0, 0.0]], [{"content": "chunk"}])
+    await store.search(assistant_id, [0.0] * 2)
+
+    options = store.client.options[QdrantVectorStore.COLLECTION_NAME]
+    assert options["sharding_method"] == "custom"
+    assert store.client.last_search["shard_key_selector"] == str(assistant_id)
+
+    # Reads and deletes for an assistant without points never create a shard key.
+    assert await store.search(empty, [0.0] * 2) == []
+    await store.delete_documents(empty, [uuid.uuid4()])
+    await store.delete_assistant(empty)
+    assert store.client.shard_keys == {str(assistant_id)}
+
+    await store.delete_assistant(assistant_id)
+    assert store.client.shard_keys == set()
+
+
+@pytest.mark.asyncio
+async def test_shard_key_partitioning_rejects_auto_sharded_collection(monkeypatch):
+    store = _store(monkeypatch, qdrant_partitioning="shard_key")
+    store.client.collections[QdrantVectorStore.COLLECTION_NAME] = 4
+
+    with pytest.raises(ValueError, match="auto sharding"):
+        await store.ensure_collection(4)
+
+    await store.recreate_collection(4)
+    assert store.client.options[QdrantVectorStore.COLLECTION_NAME]["sharding_method"] == "custom"
+
+
+@pytest.mark.asyncio
+async def test_int8_quantization_with_rescoring(monkeypatch):
+    store = _store(monkeypatch, qdrant_quantization="int8", qdrant_vectors_on_disk=True, qdrant_oversampling=3.0)
+    store.client.collections[QdrantVectorStore.COLLECTION_NAME] = 4
+
+    await store.search(uuid.uuid4(), [0.0] * 4)
+
+    # Existing collections are quantized in place.
+    assert "update_collection" in store.client.calls
+    scalar = store.client.options[QdrantVectorStore.COLLECTION_NAME]["quantization_config"].scalar
+    assert (scalar.type, scalar.quantile, scalar.always_ram) == ("int8", 0.99, True)
+    quantization = store.client.last_search["search_params"].quantization
+    assert (quantization.rescore, quantization.oversampling) == (True, 3.0)
+
+    with pytest.raises(ValueError):
+        _store(monkeypatch, qdrant_quantization="binary")
@@ -0,0 +1,152 @@
+import uuid
+from http import HTTPStatus
+
+import pytest
+
+from app.db import session as db_session
+from app.models import Assistant, KnowledgeDocument
+from app.schemas import KnowledgeDocumentCreate, KnowledgeDocumentUpdate
+from app.services.assistants import AssistantService
+from app.services.lexical_index import LexicalIndex
+from app.services.local_vector_store import LocalVectorStore
+from app.services.rag import RAGPipeline
+from app.services.vector_sync import VectorReconciler
+from tests.conftest import StubOpenAI
+
+
+class CountingOpenAI(StubOpenAI):
+    def __init__(self) -> None:
+        self.embedded = 0
+
+    async def embed(self, texts, priority=0, documents=False):
+        self.embedded += len(texts)
+        return await super().embed(texts)
+
+
+def _pipeline(tmp_path) -> RAGPipeline:
+    return RAGPipeline(LocalVectorStore(tmp_path), CountingOpenAI(), lexical_index=LexicalIndex())
+
+
+async def _counts(rag: RAGPipeline, assistant_id: uuid.UUID) -> dict[str, int]:
+    return {
+        document_id: count
+        for (owner, document_id), count in (await rag.vector_store.document_point_counts()).items()
+        if owner == str(assistant_id)
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_reindexes_only_changed_content_and_deletes_remove_points(tmp_path):
+    rag = _pipeline(tmp_path)
+    async with db_session.SessionLocal() as db:
+        service = AssistantService(db, rag)
+        assistant = Assistant(name="Lifecycle")
+        db.add(assistant)
+        await db.commit()
+        long_text = "\n\n".join(f"Paragraph {i} " + "word " * 200 for i in range(4))
+        document = await service.add_document(assistant, KnowledgeDocumentCreate(title="Guide", content=long_text))
+        assert (await _counts(rag, assistant.id))[str(document.id)] == document.chunk_count > 1
+
+        embedded = rag.openai_client.embedded
+        await service.update_document(assistant, document, KnowledgeDocumentUpdate(content=long_text))
+        assert rag.openai_client.embedded == embedded
+
+        await service.update_document(assistant, document, KnowledgeDocumentUpdate(content="Short now."))
+        assert rag.openai_client.embedded == embedded + 1
+        assert await _counts(rag, assistant.id) == {str(document.id): 1}
+
+        await service.delete_document(assistant, document)
+        assert await _counts(rag, assistant.id) == {}
+
+        await service.add_document(assistant, KnowledgeDocumentCreate(title="Other", content="Still here."))
+        await service.delete_assistant(assistant)
+        assert await _counts(rag, assistant.id) == {}
+
+
+@pytest.mark.asyncio
+async def test_reconciler_purges_orphans_and_reindexes_stale_documents(tmp_path):
+    rag = _pipeline(tmp_path)
+    async with db_session.SessionLocal() as db:
+        # The test database is shared, so compare against what other tests left behind.
+        baseline = await VectorReconciler(db, rag, dry_run=True).run()
+        assistant = Assistant(name="Reconcile")
+        db.add(assistant)
+        await db.flush()
+        indexed = KnowledgeDocument(assistant_id=assistant.id, title="Kept", content="In sync.")
+        missing = KnowledgeDocument(
+            assistant_id=assistant.id, title="Lost", content="Vectors lost.", status="ready", chunk_count=1
+        )
+        db.add_all([indexed, missing])
+        await db.flush()
+        await rag.ingest_document(db, assistant.id, indexed)
+        indexed.status = KnowledgeDocument.STATUS_READY
+        await db.commit()
+
+        deleted_document = uuid.uuid4()
+        deleted_assistant = uuid.uuid4()
+        vector = (await rag.openai_client.embed(["orphan"]))[0]
+        await rag.vector_store.upsert_chunks(assistant.id, deleted_document, [vector], [{"content": "orphan"}])
+        await rag.vector_store.upsert_chunks(deleted_assistant, uuid.uuid4(), [vector], [{"content": "orphan"}])
+
+        report = await VectorReconciler(db, rag, dry_run=True).run()
+        assert report.orphan_assistants == baseline.orphan_assistants + 1
+        assert report.orphan_documents == baseline.orphan_documents + 1
+        assert report.stale_documents == baseline.stale_documents + 1
+        assert report.reindexed == 0
+
+        report = await VectorReconciler(db, rag).run()
+        assert report.reindexed == baseline.stale_documents + 1
+        assert await _counts(rag, assistant.id) == {str(indexed.id): 1, str(missing.id): 1}
+        assert await _counts(rag, deleted_assistant) == {}
+
+        report = await VectorReconciler(db, rag).run()
+        assert (report.orphan_assistants, report.orphan_documents, report.stale_documents) == (0, 0, 0)
+
+
+def test_update_and_delete_document_routes(client):
+    assistant_id = client.post("/api/v1/assistants/", json={"name": "Editable"}).json()["id"]
+    document_id = client.post(
+        f"/api/v1/assistants/{assistant_id}/knowledge/", json={"title": "Policy", "content": "Old text."}
+    ).json()["id"]
+
+    response = client.put(
+        f"/api/v1/assistants/{assistant_id}/knowledge/{document_id}", json={"content": "New text."}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["content"] == "New text."
+    assert response.json()["title"] == "Policy"
+
+    response = client.delete(f"/api/v1/assistants/{assistant_id}/knowledge/{document_id}")
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    response = client.get(f"/api/v1/assistants/{assistant_id}/knowledge/{document_id}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+class FailingOpenAI(CountingOpenAI):
+    fail = False
+
+    async def embed(self, texts, priority=0, documents=False):
+        if self.fail:
+            raise RuntimeError("embeddings unavailable")
+        return await super().embed(texts)
+
+
+@pytest.mark.asyncio
+async def test_failed_reindex_keeps_previous_version_searchable(tmp_path):
+    rag = RAGPipeline(LocalVectorStore(tmp_path), FailingOpenAI(), lexical_index=LexicalIndex())
+    async with db_session.SessionLocal() as db:
+        service = AssistantService(db, rag)
+        assistant = Assistant(name="Failing re-index")
+        db.add(assistant)
+        await db.commit()
+        document = await service.add_document(assistant, KnowledgeDocumentCreate(title="Guide", content="Version one."))
+        assistant_id, document_id = assistant.id, document.id
+
+        rag.openai_client.fail = True
+        with pytest.raises(RuntimeError):
+            await service.update_document(assistant, document, KnowledgeDocumentUpdate(content="Version two."))
+
+    async with db_session.SessionLocal() as db:
+        stored = await db.get(KnowledgeDocument, document_id)
+        assert (stored.content, stored.status, stored.chunk_count) == ("Version one.", "ready", 1)
+    assert await _counts(rag, assistant_id) == {str(document_id): 1}
@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import type { Assistant, ChatResponse, KnowledgeDocument, Message } from "@/lib/api";
+import type { Assistant, ChatResponse, KnowledgeDocumentSummary, Message } from "@/lib/api";
 import { addKnowledge, chatExistingSession, chatNewSession, listKnowledge } from "@/lib/api";
 
 interface ChatPanelProps {
@@ -12,7 +12,7 @@ export function ChatPanel({ assistant }: ChatPanelProps) {
   const [messages, setMessages] = useState<Message[]>([]);
   const [sessionId, setSessionId] = useState<string | null>(null);
   const [input, setInput] = useState("");
-  const [knowledge, setKnowledge] = useState<KnowledgeDocument[]>([]);
+  const [knowledge, setKnowledge] = useState<KnowledgeDocumentSummary[]>([]);
   const [knowledgeTitle, setKnowledgeTitle] = useState("");
   const [knowledgeContent, setKnowledgeContent] = useState("");
   const [loadingKnowledge, setLoadingKnowledge] = useState(false);
@@ -61,7 +61,19 @@ export function ChatPanel({ assistant }: ChatPanelProps) {
   const handleAddKnowledge = async () => {
     if (!assistant || !knowledgeTitle.trim() || !knowledgeContent.trim()) return;
     const doc = await addKnowledge(assistant.id, { title: knowledgeTitle, content: knowledgeContent });
-    setKnowledge((prev) => [...prev, doc]);
+    setKnowledge((prev) => [
+      ...prev,
+      {
+        id: doc.id,
+        assistant_id: assistant.id,
+        title: doc.title,
+        preview: doc.content.slice(0, 200),
+        content_length: doc.content.length,
+        chunk_count: doc.chunk_count ?? 0,
+        status: doc.status ?? "pending",
+        created_at: doc.created_at ?? new Date().toISOString(),
+      },
+    ]);
     setKnowledgeTitle("");
     setKnowledgeContent("");
   };
@@ -109,8 +121,8 @@ export function ChatPanel({ assistant }: ChatPanelProps) {
             <li key={doc.id} className="rounded border border-slate-800 bg-slate-950 p-3">
               <p className="font-semibold">{doc.title}</p>
               <p className="text-xs text-slate-400">
-                {doc.content.slice(0, 180)}
-                {doc.content.length > 180 ? "..." : ""}
+                {doc.preview.slice(0, 180)}
+                {doc.content_length > 180 ? "..." : ""}
               </p>
             </li>
           ))}
@@ -5,6 +5,11 @@ export interface Assistant {
   name: string;
   description?: string;
   system_prompt?: string;
+  hybrid_retrieval?: boolean;
+  vector_weight?: number;
+  lexical_weight?: number;
+  response_cache_enabled?: boolean;
+  knowledge_version?: number;
   created_at: string;
   updated_at: string;
 }
@@ -14,12 +19,28 @@ export interface KnowledgeDocument {
   assistant_id?: string;
   title: string;
   content: string;
+  chunk_count?: number;
+  status?: "pending" | "ready" | "failed";
+  created_at?: string;
+}
+
+export interface KnowledgeDocumentSummary {
+  id: string;
+  assistant_id: string;
+  title: string;
+  preview: string;
+  content_length: number;
+  chunk_count: number;
+  status: "pending" | "ready" | "failed";
+  created_at: string;
 }
 
 export interface ConversationSession {
   id: string;
   assistant_id: string;
   title: string;
+  summary?: string | null;
+  summarized_messages?: number;
   created_at: string;
 }
 
@@ -31,10 +52,28 @@ export interface Message {
   session_id: string;
 }
 
+export interface PromptTokenBreakdown {
+  budget: number;
+  system: number;
+  knowledge: number;
+  history: number;
+  user: number;
+  total: number;
+  summary?: number;
+  context_chunks_used: number;
+  context_chunks_dropped: number;
+  history_messages_used: number;
+  history_messages_dropped: number;
+  exact: boolean;
+}
+
 export interface ChatResponse {
   assistant_message: string;
   session: ConversationSession;
   messages: Message[];
+  token_breakdown?: PromptTokenBreakdown | null;
+  stage_timings_ms?: Record<string, number> | null;
+  cache_hit?: boolean;
 }
 
 async function request<T>(path: string, options?: RequestInit): Promise<T> {
@@ -75,8 +114,12 @@ export async function deleteAssistant(id: string): Promise<void> {
   await request<void>(`/assistants/${id}`, { method: "DELETE" });
 }
 
-export async function listKnowledge(assistantId: string): Promise<KnowledgeDocument[]> {
-  return request<KnowledgeDocument[]>(`/assistants/${assistantId}/knowledge/`);
+export async function listKnowledge(assistantId: string): Promise<KnowledgeDocumentSummary[]> {
+  return request<KnowledgeDocumentSummary[]>(`/assistants/${assistantId}/knowledge/`);
+}
+
+export async function getKnowledge(assistantId: string, documentId: string): Promise<KnowledgeDocument> {
+  return request<KnowledgeDocument>(`/assistants/${assistantId}/knowledge/${documentId}`);
 }
 
 export async function addKnowledge(
@@ -89,6 +132,21 @@ export async function addKnowledge(
   });
 }
 
+export async function updateKnowledge(
+  assistantId: string,
+  documentId: string,
+  payload: { title?: string; content?: string }
+): Promise<KnowledgeDocument> {
+  return request<KnowledgeDocument>(`/assistants/${assistantId}/knowledge/${documentId}`, {
+    method: "PUT",
+    body: JSON.stringify(payload),
+  });
+}
+
+export async function deleteKnowledge(assistantId: string, documentId: string): Promise<void> {
+  await request<void>(`/assistants/${assistantId}/knowledge/${documentId}`, { method: "DELETE" });
+}
+
 export async function chatNewSession(
   assistantId: string,
   payload: { user_message: string }